@@ -8,6 +8,9 @@ Soubor: argumentparser.py
 import argparse
 import sys
 import os
+import signal
+from input_reader import InputReader
+from errors import InputFileError
 
 
 class ArgumentParser(argparse.ArgumentParser):
@@ -22,6 +25,18 @@ class ArgumentParser(argparse.ArgumentParser):
         self.input = None
         self.stats_file = None
         self.stats = []
+        self.engine = None
+        self.optimize = 0
+        self.inline_threshold = 0
+        self.cache_dir = None
+        self.output = None
+        self.profile = None
+        self.sample = None
+        self.sample_every = 1000
+        self.sample_timer = None
+        self.stats_format = "text"
+        self.timings = None
+        self.serve = None
 
     def set_parser(self) -> None:
         """Metoda pro astaveni ocekavanych argumentu a jejich popisu v napovede"""
@@ -45,6 +60,52 @@ class ArgumentParser(argparse.ArgumentParser):
                           help="Writes passed string to stats file")
         self.add_argument("--eol", action="store_true", required=False,
                           help="Writes end of line to stats file")
+        self.add_argument("--stats-format", choices=["text", "json"], default="text", required=False,
+                          help="Format of the stats file (text - selected statistics in argument order,\n"
+                               "json - all metrics including stack depths, string sizes and times;\n"
+                               "the program is then executed instruction by instruction)")
+        self.add_argument("--timings", nargs="?", const="time", choices=["time", "memory"], required=False,
+                          help="Print the duration of interpreter phases (startup, parse, decode, execute)\n"
+                               "to stderr, --timings=memory also the peak memory of each phase (tracemalloc);\n"
+                               "the phases are also part of --stats-format=json")
+        self.add_argument("--serve", metavar="socket", nargs="?", const="", required=False,
+                          help="Run as a worker executing many programs: requests are JSON lines\n"
+                               '{"source": xml, "input": text, "engine": ..., "optimize": N, "stats": bool}\n'
+                               "read from stdin, or from connections to a Unix socket if a path is given;\n"
+                               "each response is a JSON line with exit_code, stdout and stats")
+        self.add_argument("--engine", choices=["interpreted", "compiled", "blocks", "tracing"], default="interpreted",
+                          required=False,
+                          help="Execution engine (interpreted - instruction by instruction,\n"
+                               "compiled - program translated to specialized closures,\n"
+                               "blocks - basic blocks translated to generated Python code,\n"
+                               "tracing - instruction by instruction, hot loops translated to Python code)")
+        self.add_argument("--optimize", metavar="N", type=int, choices=[0, 1, 2], default=0, required=False,
+                          help="Optimization level of the loaded program (0 - none, 1 - constant folding and\n"
+                               "jump chains, 2 - also unreachable code and unused labels); statistics then\n"
+                               "refer to the optimized program")
+        self.add_argument("--inline-threshold", metavar="N", type=self.__positive(int), required=False,
+                          help="Inline calls of functions with at most N instructions (CREATEFRAME ... PUSHFRAME,\n"
+                               "CALL, POPFRAME call sites of non-recursive functions); statistics then count\n"
+                               "the inlined instructions, but not CALL, RETURN and the frame instructions")
+        self.add_argument("--profile", metavar="file", required=False,
+                          help="Profile the program instruction by instruction (the selected engine is not used),\n"
+                               "writes a report of instruction and function (CALL label) times to file\n"
+                               "and the same data as JSON to file.json")
+        self.add_argument("--sample", metavar="file", required=False,
+                          help="Sample the IPPcode23 call stack and write it to file in folded stack format\n"
+                               "(for flame graph tools)")
+        self.add_argument("--sample-every", metavar="N", type=self.__positive(int), required=False,
+                          help="Take a sample every N executed instructions (default 1000, the selected\n"
+                               "engine is not used)")
+        self.add_argument("--sample-timer", metavar="ms", type=self.__positive(float), required=False,
+                          help="Take a sample every ms milliseconds of CPU time instead (works with every engine)")
+        self.add_argument("--output", metavar="file", required=False,
+                          help="File to write program output to (if not specified, writes to stdout)")
+        self.add_argument("--cache-dir", metavar="dir", required=False,
+                          help="Directory for checked and decoded programs, a program with unchanged\n"
+                               "source is loaded from it without parsing the XML again (the directory\n"
+                               "must be trusted, only files of the current user that nobody else can\n"
+                               "modify are loaded)")
         self.epilog = "Note: At least one of the arguments --source=file or --input=file must be specified."
 
     def parse(self) -> None:
@@ -53,37 +114,75 @@ class ArgumentParser(argparse.ArgumentParser):
         self.source = self.args.source
         self.input = self.args.input
         self.stats_file = self.args.stats
+        self.stats_format = self.args.stats_format
+        self.timings = self.args.timings
+        self.serve = self.args.serve
+        self.engine = self.args.engine
+        self.optimize = self.args.optimize
+        if self.args.inline_threshold is not None:
+            self.inline_threshold = self.args.inline_threshold
+        self.cache_dir = self.args.cache_dir
+        self.output = self.args.output
+        self.profile = self.args.profile
+        self.sample = self.args.sample
+        if self.args.sample_every is not None:
+            self.sample_every = self.args.sample_every
+        self.sample_timer = self.args.sample_timer
+        self.__check_sampling(self.args)
         self.__set_stats(self.args)
         if self.args.help and len(sys.argv) > 2:
             self.error("Invalid arguments.")
         elif self.args.help:
             self.print_help()
             sys.exit(0)
-        if self.input is None and self.source is None:
+        if self.serve is not None:
+            if self.input is not None or self.source is not None or self.stats_file is not None or \
+                    self.profile is not None or self.sample is not None or self.output is not None:
+                self.error("Error: Invalid argument combination.")
+        elif self.input is None and self.source is None:
             self.error("Either source or input has to be specified.")
 
     def __valid_file(self, filename) -> str:
         """Metoda pro kontrolu existence vstupnich souboru"""
         if not os.path.isfile(filename):
             print(f"{filename} is not a valid file.", file=sys.stderr)
-            sys.exit(11)
+            raise InputFileError()
         return filename
 
-    def read_source(self) -> str:
-        """Metoda pro nacteni vstupniho XML"""
+    def open_source(self):
+        """Metoda pro otevreni vstupniho XML, ktere se pak cte postupne po castech"""
         if self.source is None:
-            return sys.stdin.read()
-        src = open(self.source, "r")
-        return src.read()
+            return sys.stdin.buffer
+        return open(self.source, "rb")
 
-    def read_input(self):
-        """Metoda pro nacteni uzivatelskeho vstupu"""
-        if self.input is None:
-            return "stdin"
-        inp = open(self.input, "r")
-        inp = inp.readlines()
-        inp = [i.strip() for i in inp]
-        return inp
+    def read_input(self) -> InputReader:
+        """Metoda pro otevreni uzivatelskeho vstupu, ktery se cte postupne instrukcemi READ"""
+        return InputReader(self.input)
+
+    def __positive(self, convert):
+        """Metoda vracejici kontrolu kladne ciselne hodnoty argumentu"""
+        def check(value):
+            try:
+                number = convert(value)
+            except ValueError:
+                raise argparse.ArgumentTypeError(f"invalid value: {value}")
+            if number <= 0:
+                raise argparse.ArgumentTypeError(f"value must be positive: {value}")
+            return number
+        return check
+
+    def __check_sampling(self, args) -> None:
+        """Metoda pro kontrolu kombinace argumentu vzorkovani, profilovani a formatu statistik"""
+        if self.sample is None and (args.sample_every is not None or args.sample_timer is not None):
+            self.error("Error: Invalid argument combination.")
+        if self.sample is not None and (self.profile is not None or
+                                        (args.sample_every is not None and args.sample_timer is not None)):
+            self.error("Error: Invalid argument combination.")
+        if self.stats_format == "json" and (self.stats_file is None or self.profile is not None or
+                                            (self.sample is not None and self.sample_timer is None)):
+            self.error("Error: Invalid argument combination.")
+        if self.sample_timer is not None and not hasattr(signal, "setitimer"):
+            self.error("Error: Timer sampling is not supported on this platform.")
 
     def __set_stats(self, args) -> None:
         """Metoda pro nastaveni statistik"""
@@ -0,0 +1,111 @@
+"""
+FIT VUT IPP 2023
+Projekt 2 - Interpret XML reprezentace jazyka IPPcode23
+Autor: Jaroslav Streit (xstrei06)
+Soubor: cache.py
+"""
+
+import hashlib
+import io
+import os
+import pickle
+import stat
+import sys
+import tempfile
+from instruction import Instruction
+from operand import Operand
+from nil_type import Nil
+
+# Verze formatu souboru (hlavicka a ulozene polozky), pri jeho zmene je nutne ji zvysit
+VERSION = 2
+
+# Tridy ukladanych objektu, zmena zdrojoveho kodu jejich modulu zneplatni ulozene programy
+PICKLED = (Instruction, Operand, Nil)
+
+MAGIC = b"IPPC"  # hlavicka souboru s predzpracovanym programem
+CHUNK = 1 << 16  # velikost bloku pri cteni zdrojoveho XML
+
+
+def layout() -> str:
+    """Funkce vracejici hash zdrojoveho kodu modulu s ukladanymi tridami (PICKLED)
+    Zmena atributu instrukci nebo operandu tak nevyzaduje rucni zvyseni verze"""
+    digest = hashlib.sha256()
+    for cls in PICKLED:
+        with open(sys.modules[cls.__module__].__file__, "rb") as file:
+            digest.update(file.read())
+    return digest.hexdigest()
+
+
+class ProgramCache:
+    """Trida pro ukladani zkontrolovanych a dekodovanych programu (--cache-dir)
+    Soubor je pojmenovan podle hashe zdrojoveho XML a verze interpretu, obsahuje hlavicku
+    s touto verzi a hashem a serializovany seznam instrukci, tabulku navesti a sloty GF.
+    Nacteni souboru (pickle) muze spustit libovolny kod, adresar proto musi byt duveryhodny:
+    nacitaji se pouze soubory aktualniho uzivatele v jeho adresari, do nichz nikdo jiny
+    nemuze zapisovat."""
+    def __init__(self, directory):
+        self.directory = directory
+        self.digest = None  # hash zdrojoveho XML a verze interpretu
+
+    def key(self, source):
+        """Metoda pro vypocet hashe zdrojoveho XML, vraci proud, ze ktereho lze XML znovu cist
+        Standardni vstup nelze precist dvakrat, proto se jeho obsah uchova v pameti"""
+        digest = hashlib.sha256(f"{VERSION}:{sys.implementation.cache_tag}:{layout()}:".encode())
+        if source is sys.stdin.buffer:
+            source = io.BytesIO(source.read())
+        for chunk in iter(lambda: source.read(CHUNK), b""):
+            digest.update(chunk)
+        source.seek(0)
+        self.digest = digest.hexdigest()
+        return source
+
+    def path(self) -> str:
+        return os.path.join(self.directory, self.digest + ".ippc")
+
+    def load(self, xml_parser) -> bool:
+        """Metoda pro nacteni predzpracovaneho programu do XMLParseru
+        Vraci False, pokud soubor neexistuje, je poskozeny nebo nesouhlasi verze ci hash"""
+        try:
+            with open(self.path(), "rb") as file:
+                if not self.__trusted(file) or file.read(len(MAGIC)) != MAGIC:
+                    return False
+                version, digest, instructions, labels, global_slots = pickle.load(file)
+        except (OSError, EOFError, ValueError, TypeError, AttributeError, ImportError, pickle.UnpicklingError):
+            return False
+        if version != VERSION or digest != self.digest:
+            return False
+        xml_parser.instructions = instructions
+        xml_parser.labels = labels
+        xml_parser.global_slots = global_slots
+        return True
+
+    def __trusted(self, file) -> bool:
+        """Metoda pro kontrolu, ze adresar i soubor patri aktualnimu uzivateli a ostatni do nich nemohou zapisovat"""
+        if not hasattr(os, "getuid"):  # vlastnika souboru nelze zjistit (Windows)
+            return True
+        for status in (os.stat(self.directory), os.fstat(file.fileno())):
+            if status.st_uid != os.getuid() or status.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+                return False
+        return True
+
+    def store(self, xml_parser) -> None:
+        """Metoda pro ulozeni predzpracovaneho programu, soubor se nahradi atomicky
+        Chyba pri zapisu neni chybou interpretace, program se pouze priste zpracuje znovu"""
+        tmp = None
+        try:
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as file:
+                file.write(MAGIC)
+                pickle.dump((VERSION, self.digest, xml_parser.instructions, xml_parser.labels,
+                             xml_parser.global_slots), file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self.path())
+            tmp = None
+        except (OSError, pickle.PicklingError, RecursionError, TypeError, AttributeError):
+            pass
+        finally:
+            if tmp is not None:  # neuplny docasny soubor
+                try:
+                    os.unlink(tmp)
+                except OSError:
+                    pass
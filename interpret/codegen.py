@@ -0,0 +1,389 @@
+"""
+FIT VUT IPP 2023
+Projekt 2 - Interpret XML reprezentace jazyka IPPcode23
+Autor: Jaroslav Streit (xstrei06)
+Soubor: codegen.py
+"""
+
+from nil_type import Nil
+from frame import UNDEFINED
+from compiler import Compiler, equals
+from string_buffer import StringBuffer
+from errors import MissingFrameError, fail
+
+# Instrukce, ktere ukoncuji zakladni blok (meni tok rizeni)
+TERMINATORS = {'JUMP', 'JUMPIFEQ', 'JUMPIFNEQ', 'CALL', 'RETURN', 'EXIT', 'JUMPIFEQS', 'JUMPIFNEQS'}
+
+# Typy literalu, ktere lze primo vlozit do generovaneho kodu
+SOURCE_LITERALS = (int, bool, str)
+
+
+class BlockCompiler:
+    """Trida pro preklad zakladnich bloku programu na generovany kod jazyka Python (--engine=blocks)
+    Kazdy blok je preveden na jednu funkci, ktera vraci index nasledujiciho bloku
+    Instrukce bez primeho prekladu volaji uzavery tridy Compiler"""
+    def __init__(self, m):
+        self.m = m
+        self.compiler = Compiler(m)
+        self.starts = []  # indexy prvnich instrukci jednotlivych bloku
+        self.block_of = []  # index bloku pro kazdou instrukci, ktera zacina blok (jinak -1)
+        self.constants = {}  # literaly, ktere nelze zapsat primo do zdrojoveho kodu
+        self.temps = 0
+        self.emit_method = {  # slovnik metod generujicich kod podle opcode instrukce
+            'MOVE': self.__move,
+            'ADD': self.__arithmetic,
+            'SUB': self.__arithmetic,
+            'MUL': self.__arithmetic,
+            'IDIV': self.__idiv,
+            'DIV': self.__div,
+            'LT': self.__relational,
+            'GT': self.__relational,
+            'EQ': self.__eq,
+            'AND': self.__logical,
+            'OR': self.__logical,
+            'NOT': self.__not,
+            'CONCAT': self.__concat,
+            'STRLEN': self.__strlen,
+            'GETCHAR': self.__getchar,
+            'STRI2INT': self.__stri2int,
+            'INT2CHAR': self.__int2char,
+            'INT2FLOAT': self.__int2float,
+            'FLOAT2INT': self.__float2int,
+            'PUSHS': self.__pushs,
+            'POPS': self.__pops,
+            'LABEL': self.__label,
+            'JUMP': self.__jump,
+            'JUMPIFEQ': self.__jumpifeq,
+            'JUMPIFNEQ': self.__jumpifeq,
+            'CALL': self.__call,
+            'RETURN': self.__return,
+        }
+        self.counting = False
+
+    def split_blocks(self) -> None:
+        """Metoda pro rozdeleni programu na zakladni bloky podle navesti a skokovych instrukci"""
+        instructions = self.m.instructions
+        count = len(instructions)
+        self.block_of = [-1] * (count + 1)
+        for i, ins in enumerate(instructions):
+            if i == 0 or ins.opcode == 'LABEL' or instructions[i - 1].opcode in TERMINATORS:
+                self.block_of[i] = len(self.starts)
+                self.starts.append(i)
+        self.block_of[count] = len(self.starts)  # konec programu
+
+    def generate(self) -> str:
+        """Metoda pro vygenerovani zdrojoveho kodu vsech bloku"""
+        instructions = self.m.instructions
+        source = []
+        for block, start in enumerate(self.starts):
+            end = self.starts[block + 1] if block + 1 < len(self.starts) else len(instructions)
+            source.append(f"def block_{block}():")
+            for i in range(start, end):
+                source.extend("    " + line for line in self.emit(instructions[i], i))
+            if instructions[end - 1].opcode not in TERMINATORS:
+                source.append(f"    return {block + 1}")
+            source.append("")
+        source.append("blocks = [" + ", ".join(f"block_{block}" for block in range(len(self.starts))) + "]")
+        return "\n".join(source) + "\n"
+
+    def namespace(self, code) -> dict:
+        """Metoda pro vytvoreni prostredi, ve kterem bezi vygenerovany kod"""
+        m = self.m
+        count = len(m.instructions)
+        end = len(self.starts)
+
+        def lf():
+            if m.frame_stack[-1] is None:
+                raise MissingFrameError()
+            return m.frame_stack[-1].frame
+
+        def tf():
+            if m.temporary_frame is None:
+                raise MissingFrameError()
+            return m.temporary_frame.frame
+
+        def block_at(ip):
+            return end if ip >= count else self.block_of[ip]
+
+        namespace = {
+            'm': m, 'G': m.global_frame.values, 'U': UNDEFINED, 'S': m.data_stack, 'CS': m.call_stack,
+            'lf': lf, 'tf': tf, 'fail': fail, 'Nil': Nil, 'equals': equals, 'SB': StringBuffer,
+            'c': code, 'B': self.block_of, 'block_at': block_at, 'counts': self.compiler.counts,
+        }
+        namespace.update(self.constants)
+        return namespace
+
+    def compile(self) -> list:
+        """Metoda pro preklad programu na seznam funkci jednotlivych bloku"""
+        self.split_blocks()
+        code = self.compiler.compile()
+        source = self.generate()
+        namespace = self.namespace(code)
+        exec(compile(source, "<ippcode23>", "exec"), namespace)
+        return namespace['blocks']
+
+    def run(self) -> None:
+        """Metoda pro provedeni prelozeneho programu"""
+        m = self.m
+        self.compiler.counts = m.stats.start(m.instructions)
+        self.counting = self.compiler.counts is not None
+        blocks = self.compile()
+        end = len(blocks)
+        block = 0
+        while block < end:
+            block = blocks[block]()
+        m.stats.update(m)
+
+    def emit(self, ins, i) -> list:
+        """Metoda pro vygenerovani kodu jedne instrukce"""
+        lines = [f"counts[{i}] += 1"] if self.counting else []
+        if ins.opcode in self.emit_method and not ins.buffers:
+            lines.extend(self.emit_method[ins.opcode](ins, i))
+        elif ins.opcode in TERMINATORS:
+            lines.append(f"return block_at(c[{i}]())")
+        else:
+            lines.append(f"c[{i}]()")
+        return lines
+
+    # Pomocne metody pro generovani pristupu k operandum
+    def __temp(self) -> str:
+        self.temps += 1
+        return f"v{self.temps}"
+
+    def __literal(self, val) -> str:
+        """Metoda vracejici zapis literalu ve zdrojovem kodu"""
+        if type(val) in SOURCE_LITERALS:
+            return repr(val)
+        name = f"k{len(self.constants)}"
+        self.constants[name] = val
+        return name
+
+    @staticmethod
+    def __frame(arg) -> str:
+        """Vyraz pro ziskani slovniku promennych LF nebo TF"""
+        return "lf()" if arg.frame == 'LF' else "tf()"
+
+    def static_type(self, arg, ins):
+        """Metoda vracejici typ operandu znamy v dobe prekladu (typ literalu nebo odvozeny typ
+        promenne GF pred instrukci ins, jinak None)"""
+        return self.compiler.types.type_of(ins, arg)
+
+    def read(self, arg, allow_none=False, ins=None) -> tuple:
+        """Metoda generujici cteni operandu, vraci radky kodu a vyraz s hodnotou
+        Promenna GF se znamym typem pred instrukci ins se cte bez kontrol"""
+        if arg.type != 'var':
+            return [], self.__literal(arg.val)
+        temp = self.__temp()
+        if ins is not None and arg.var not in self.m.buffered and self.static_type(arg, ins) is not None:
+            return [f"{temp} = G[{arg.slot}]"], temp
+        if arg.frame == 'GF':
+            lines = [f"{temp} = G[{arg.slot}]",
+                     f"if {temp} is U:",
+                     "    fail(54)"]
+        else:
+            lines = ["try:",
+                     f"    {temp} = {self.__frame(arg)}[{arg.var!r}]",
+                     "except KeyError:",
+                     "    fail(54)"]
+        if not allow_none:
+            lines += [f"if {temp} is None:",
+                      "    fail(56)"]
+        if arg.var in self.m.buffered:  # promenna muze obsahovat StringBuffer
+            lines += [f"if type({temp}) is SB:",
+                      f"    {temp} = {temp}.value()"]
+        return lines, temp
+
+    def dest(self, arg, ins=None) -> tuple:
+        """Metoda generujici kontrolu cilove promenne, vraci radky kodu a jmeno promenne s ramcem"""
+        if arg.frame == 'GF':
+            if ins is not None and self.compiler.types.defined(ins, arg):
+                return [], "G"
+            return [f"if G[{arg.slot}] is U:",
+                    "    fail(54)"], "G"
+        temp = self.__temp()
+        return [f"{temp} = {self.__frame(arg)}",
+                f"if {arg.var!r} not in {temp}:",
+                "    fail(54)"], temp
+
+    def operands(self, ins, count) -> tuple:
+        """Metoda generujici nacteni cile a zdrojovych operandu instrukce"""
+        lines, frame = self.dest(ins.args['arg1'], ins)
+        values = []
+        for tag in ('arg2', 'arg3')[:count]:
+            read_lines, value = self.read(ins.args[tag], ins=ins)
+            lines += read_lines
+            values.append(value)
+        return lines, frame, values
+
+    def type_check(self, values, types, allowed) -> list:
+        """Metoda generujici kontrolu, ze operandy maji shodne typy z mnoziny allowed (jinak 53)"""
+        known = [t for t in types if t is not None]
+        if known:
+            if any(t not in allowed for t in known) or any(t != known[0] for t in known):
+                return ["fail(53)"]
+            unknown = [v for v, t in zip(values, types) if t is None]
+            if not unknown:
+                return []
+            return [f"if {' or '.join(f'type({v}) is not {known[0].__name__}' for v in unknown)}:",
+                    "    fail(53)"]
+        conditions = [" and ".join(f"type({v}) is {t.__name__}" for v in values) for t in allowed]
+        return [f"if not ({' or '.join(f'({c})' for c in conditions)}):",
+                "    fail(53)"]
+
+    def __assign(self, ins, frame, expr) -> str:
+        return f"{frame}[{ins.args['arg1'].key!r}] = {expr}"
+
+    # Nasleduji metody pro generovani kodu jednotlivych instrukci
+    def __move(self, ins, i) -> list:
+        lines, frame, (a,) = self.operands(ins, 1)
+        return lines + [self.__assign(ins, frame, a)]
+
+    def __arithmetic(self, ins, i) -> list:
+        operator = {'ADD': '+', 'SUB': '-', 'MUL': '*'}[ins.opcode]
+        lines, frame, (a, b) = self.operands(ins, 2)
+        types = [self.static_type(ins.args['arg2'], ins), self.static_type(ins.args['arg3'], ins)]
+        lines += self.type_check([a, b], types, (int, float))
+        return lines + [self.__assign(ins, frame, f"{a} {operator} {b}")]
+
+    def __idiv(self, ins, i) -> list:
+        lines, frame, (a, b) = self.operands(ins, 2)
+        types = [self.static_type(ins.args['arg2'], ins), self.static_type(ins.args['arg3'], ins)]
+        lines += self.type_check([a, b], types, (int,))
+        lines += [f"if {b} == 0:", "    fail(57)"]
+        return lines + [self.__assign(ins, frame, f"{a} // {b}")]
+
+    def __div(self, ins, i) -> list:
+        lines, frame, (a, b) = self.operands(ins, 2)
+        types = [self.static_type(ins.args['arg2'], ins), self.static_type(ins.args['arg3'], ins)]
+        lines += self.type_check([a, b], types, (float,))
+        lines += [f"if {b} == 0:", "    fail(57)"]
+        return lines + [self.__assign(ins, frame, f"{a} / {b}")]
+
+    def __relational(self, ins, i) -> list:
+        operator = '<' if ins.opcode == 'LT' else '>'
+        lines, frame, (a, b) = self.operands(ins, 2)
+        types = [self.static_type(ins.args['arg2'], ins), self.static_type(ins.args['arg3'], ins)]
+        lines += self.type_check([a, b], types, (int, float, str, bool))
+        return lines + [self.__assign(ins, frame, f"{a} {operator} {b}")]
+
+    def __eq(self, ins, i) -> list:
+        lines, frame, (a, b) = self.operands(ins, 2)
+        lines += self.__equality(ins, a, b)
+        return lines + [self.__assign(ins, frame, f"{a} == {b}" if self.__simple_eq(ins) else f"equals({a}, {b})")]
+
+    def __simple_eq(self, ins) -> bool:
+        """Porovnani lze zapsat primo operatorem ==, pokud je jeden z operandu literal jineho typu nez nil"""
+        types = {self.static_type(ins.args['arg2'], ins), self.static_type(ins.args['arg3'], ins)} - {None}
+        return len(types) == 1 and Nil not in types
+
+    def __equality(self, ins, a, b) -> list:
+        """Kontrola typu pro porovnani, kdy je jeden z operandu literal (jinak ji provede funkce equals)"""
+        if not self.__simple_eq(ins):
+            return []
+        known = (self.static_type(ins.args['arg2'], ins) or self.static_type(ins.args['arg3'], ins)).__name__
+        unknown = [v for v, tag in ((a, 'arg2'), (b, 'arg3')) if self.static_type(ins.args[tag], ins) is None]
+        if not unknown:
+            return []
+        return [f"if type({unknown[0]}) is not {known} and type({unknown[0]}) is not Nil:",
+                "    fail(53)"]
+
+    def __logical(self, ins, i) -> list:
+        operator = 'and' if ins.opcode == 'AND' else 'or'
+        lines, frame, (a, b) = self.operands(ins, 2)
+        types = [self.static_type(ins.args['arg2'], ins), self.static_type(ins.args['arg3'], ins)]
+        lines += self.type_check([a, b], types, (bool,))
+        return lines + [self.__assign(ins, frame, f"{a} {operator} {b}")]
+
+    def __not(self, ins, i) -> list:
+        lines, frame, (a,) = self.operands(ins, 1)
+        lines += self.type_check([a], [self.static_type(ins.args['arg2'], ins)], (bool,))
+        return lines + [self.__assign(ins, frame, f"not {a}")]
+
+    def __concat(self, ins, i) -> list:
+        lines, frame, (a, b) = self.operands(ins, 2)
+        types = [self.static_type(ins.args['arg2'], ins), self.static_type(ins.args['arg3'], ins)]
+        lines += self.type_check([a, b], types, (str,))
+        return lines + [self.__assign(ins, frame, f"{a} + {b}")]
+
+    def __strlen(self, ins, i) -> list:
+        lines, frame, (a,) = self.operands(ins, 1)
+        lines += self.type_check([a], [self.static_type(ins.args['arg2'], ins)], (str,))
+        return lines + [self.__assign(ins, frame, f"len({a})")]
+
+    def __string_index(self, ins) -> tuple:
+        """Spolecne generovani pro GETCHAR a STRI2INT"""
+        lines, frame, (a, b) = self.operands(ins, 2)
+        lines += self.type_check([a], [self.static_type(ins.args['arg2'], ins)], (str,))
+        lines += self.type_check([b], [self.static_type(ins.args['arg3'], ins)], (int,))
+        lines += [f"if {b} < 0 or {b} >= len({a}):", "    fail(58)"]
+        return lines, frame, a, b
+
+    def __getchar(self, ins, i) -> list:
+        lines, frame, a, b = self.__string_index(ins)
+        return lines + [self.__assign(ins, frame, f"{a}[{b}]")]
+
+    def __stri2int(self, ins, i) -> list:
+        lines, frame, a, b = self.__string_index(ins)
+        return lines + [self.__assign(ins, frame, f"ord({a}[{b}])")]
+
+    def __int2char(self, ins, i) -> list:
+        lines, frame, (a,) = self.operands(ins, 1)
+        lines += self.type_check([a], [self.static_type(ins.args['arg2'], ins)], (int,))
+        lines += [f"if {a} < 0 or {a} > 1114111:", "    fail(58)"]
+        return lines + [self.__assign(ins, frame, f"chr({a})")]
+
+    def __int2float(self, ins, i) -> list:
+        lines, frame, (a,) = self.operands(ins, 1)
+        lines += self.type_check([a], [self.static_type(ins.args['arg2'], ins)], (int,))
+        return lines + [self.__assign(ins, frame, f"float({a})")]
+
+    def __float2int(self, ins, i) -> list:
+        lines, frame, (a,) = self.operands(ins, 1)
+        lines += self.type_check([a], [self.static_type(ins.args['arg2'], ins)], (float,))
+        return lines + [self.__assign(ins, frame, f"int({a})")]
+
+    def __pushs(self, ins, i) -> list:
+        lines, a = self.read(ins.args['arg1'], ins=ins)
+        return lines + [f"S.append({a})"]
+
+    def __pops(self, ins, i) -> list:
+        lines, frame = self.dest(ins.args['arg1'], ins)
+        return lines + ["if not S:", "    fail(56)",
+                        self.__assign(ins, frame, "S.pop()")]
+
+    def __label(self, ins, i) -> list:
+        return []
+
+    def __jump(self, ins, i) -> list:
+        if ins.target is None:
+            return ["fail(52)"]
+        return [f"return {self.block_of[ins.target]}"]
+
+    def condition(self, ins) -> tuple:
+        """Metoda generujici vyhodnoceni podminky JUMPIFEQ/JUMPIFNEQ, vraci radky kodu a vyraz podminky skoku"""
+        lines, a = self.read(ins.args['arg2'], ins=ins)
+        read_lines, b = self.read(ins.args['arg3'], ins=ins)
+        lines += read_lines
+        if ins.target is None:
+            lines += ["fail(52)"]
+        lines += self.__equality(ins, a, b)
+        expr = f"{a} == {b}" if self.__simple_eq(ins) else f"equals({a}, {b})"
+        return lines, expr if ins.opcode == 'JUMPIFEQ' else f"not {expr}"
+
+    def __jumpifeq(self, ins, i) -> list:
+        lines, expr = self.condition(ins)
+        if ins.target is None:
+            return lines
+        return lines + [f"if {expr}:",
+                        f"    return {self.block_of[ins.target]}",
+                        f"return {self.block_of[i + 1]}"]
+
+    def __call(self, ins, i) -> list:
+        if ins.target is None:
+            return ["fail(52)"]
+        return [f"CS.append({i})",
+                f"return {self.block_of[ins.target]}"]
+
+    def __return(self, ins, i) -> list:
+        return ["if CS[-1] is None:", "    fail(56)",
+                "return B[CS.pop() + 1]"]
@@ -0,0 +1,771 @@
+"""
+FIT VUT IPP 2023
+Projekt 2 - Interpret XML reprezentace jazyka IPPcode23
+Autor: Jaroslav Streit (xstrei06)
+Soubor: compiler.py
+"""
+
+from frame import Frame, UNDEFINED
+from nil_type import Nil
+from fusion import Fusion
+from string_buffer import StringBuffer
+from errors import (BadValueError, MissingFrameError, MissingValueError, OperandTypeError, SemanticError,
+                    StringError, UndefinedVariableError)
+
+
+class Compiler:
+    """Trida pro preklad seznamu instrukci na seznam specializovanych uzaveru (--engine=compiled)
+    Kazdy uzaver ma operandy a ramce navazane predem a vraci index dalsi instrukce"""
+    def __init__(self, m):
+        self.m = m
+        self.compile_method = {  # slovnik specializovanych prekladu podle opcode instrukce
+            'MOVE': self.__move,
+            'CREATEFRAME': self.__createframe,
+            'PUSHFRAME': self.__pushframe,
+            'POPFRAME': self.__popframe,
+            'DEFVAR': self.__defvar,
+            'CALL': self.__call,
+            'RETURN': self.__return,
+            'PUSHS': self.__pushs,
+            'POPS': self.__pops,
+            'ADD': self.__add,
+            'SUB': self.__sub,
+            'MUL': self.__mul,
+            'IDIV': self.__idiv,
+            'LT': self.__lt,
+            'GT': self.__gt,
+            'EQ': self.__eq,
+            'AND': self.__and,
+            'OR': self.__or,
+            'NOT': self.__not,
+            'INT2CHAR': self.__int2char,
+            'STRI2INT': self.__stri2int,
+            'WRITE': self.__write,
+            'CONCAT': self.__concat,
+            'STRLEN': self.__strlen,
+            'GETCHAR': self.__getchar,
+            'SETCHAR': self.__setchar,
+            'TYPE': self.__type,
+            'LABEL': self.__label,
+            'JUMP': self.__jump,
+            'JUMPIFEQ': self.__jumpifeq,
+            'JUMPIFNEQ': self.__jumpifneq,
+            'INT2FLOAT': self.__int2float,
+            'FLOAT2INT': self.__float2int,
+            'DIV': self.__div,
+        }
+        self.fuse_method = {  # slovnik prekladu slozenych instrukci podle jmena vzoru (viz Fusion)
+            'compare_jump': self.__compare_jump,
+            'arithmetic_jump': self.__arithmetic_jump,
+            'stack_operation': self.__stack_operation,
+            'defvar_move': self.__defvar_move,
+        }
+        self.counts = None  # pocty provedeni jednotlivych instrukci (pouze pokud jsou potreba)
+        self.types = m.program.types()  # odvozene typy promennych GF (TypeInference)
+
+    def compile(self, fuse=False) -> list:
+        """Metoda pro preklad vsech instrukci programu
+        Pri fuse=True se vybrane posloupnosti instrukci prelozi jako jeden uzaver (superinstrukce),
+        ktery vraci index instrukce za celou posloupnosti"""
+        code = [self.__compile(ins, i) for i, ins in enumerate(self.m.instructions)]
+        if fuse:
+            for i, (pattern, length) in Fusion(self.m.instructions).find().items():
+                code[i] = self.__fused(self.fuse_method[pattern](i), i, length)
+        return code
+
+    def __compile(self, ins, i):
+        if ins.opcode in self.compile_method:
+            return self.compile_method[ins.opcode](ins, i)
+        return self.__generic(ins, i)
+
+    def run(self) -> None:
+        """Metoda pro provedeni prelozeneho programu"""
+        m = self.m
+        self.counts = m.stats.start(m.instructions)
+        code = self.compile(fuse=True)
+        end = len(code)
+        ip = 0
+        if self.counts is None:
+            while ip < end:
+                ip = code[ip]()
+            return
+        # Pocitani provedenych instrukci pro statistiky a instrukci BREAK
+        counts = self.counts
+        while ip < end:
+            counts[ip] += 1
+            ip = code[ip]()
+        m.stats.update(m)
+
+    # Pomocne metody pro pristup k promennym
+    # Promenne globalniho ramce se ctou primo ze seznamu slotu, lokalni a docasny ramec jsou slovniky
+    def __frame_getter(self, frame):
+        """Metoda vracejici funkci pro ziskani slovniku promennych LF nebo TF (55 pro neexistujici ramec)"""
+        m = self.m
+        if frame == 'TF':
+            def get_tf():
+                if m.temporary_frame is None:
+                    raise MissingFrameError()
+                return m.temporary_frame.frame
+            return get_tf
+
+        def get_lf():
+            if m.frame_stack[-1] is None:
+                raise MissingFrameError()
+            return m.frame_stack[-1].frame
+        return get_lf
+
+    def reader(self, arg, allow_none=False, keep=False, ins=None):
+        """Metoda vracejici funkci pro cteni hodnoty operandu
+        Promenne, ktere mohou obsahovat StringBuffer, se ctou jako retezec (pokud neni keep)
+        Pokud je u instrukce ins znamy typ promenne GF, cte se bez kontrol"""
+        if arg.type != 'var':
+            val = arg.val
+            return lambda: val
+        if ins is not None and arg.var not in self.m.buffered and self.types.type_of(ins, arg) is not None:
+            values = self.m.global_frame.values
+            slot = arg.slot
+            return lambda: values[slot]
+        if arg.var in self.m.buffered and not keep:
+            read_buffer = self.reader(arg, allow_none, True)
+
+            def read_value():
+                val = read_buffer()
+                if type(val) is StringBuffer:
+                    return val.value()
+                return val
+            return read_value
+        if arg.frame == 'GF':
+            values = self.m.global_frame.values
+            slot = arg.slot
+
+            def read_global():
+                val = values[slot]
+                if val is UNDEFINED:
+                    raise UndefinedVariableError()
+                if val is None and not allow_none:
+                    raise MissingValueError()
+                return val
+            return read_global
+        name = arg.var
+        get_frame = self.__frame_getter(arg.frame)
+
+        def read():
+            frame = get_frame()
+            if name not in frame:
+                raise UndefinedVariableError()
+            val = frame[name]
+            if val is None and not allow_none:
+                raise MissingValueError()
+            return val
+        return read
+
+    def dest(self, arg, ins=None):
+        """Metoda vracejici funkci pro ziskani ramce cilove promenne (kontrola existence promenne)
+        Vraceny ramec se indexuje klicem operandu (Operand.key)"""
+        if arg.frame == 'GF':
+            values = self.m.global_frame.values
+            slot = arg.slot
+            if ins is not None and self.types.defined(ins, arg):
+                return lambda: values
+
+            def dest_global():
+                if values[slot] is UNDEFINED:
+                    raise UndefinedVariableError()
+                return values
+            return dest_global
+        name = arg.var
+        get_frame = self.__frame_getter(arg.frame)
+
+        def dest():
+            frame = get_frame()
+            if name not in frame:
+                raise UndefinedVariableError()
+            return frame
+        return dest
+
+    def __generic(self, ins, i):
+        """Preklad instrukce bez specializace - provedeni metodou tridy Instruction"""
+        m = self.m
+
+        def run():
+            m.ins_pointer = i
+            ins.perform(m)
+            return m.ins_pointer + 1
+        return run
+
+    def __binary(self, ins, i, operation):
+        """Spolecny preklad instrukci ve tvaru <var> <symb1> <symb2>
+        Pri znamych typech operandu se pouzije operace bez kontroly typu (TypeInference)"""
+        dest = self.dest(ins.args['arg1'], ins)
+        name = ins.args['arg1'].key
+        read2 = self.reader(ins.args['arg2'], keep=ins.buffers, ins=ins)
+        read3 = self.reader(ins.args['arg3'], ins=ins)
+        operation = self.types.unchecked(ins) or operation
+        nxt = i + 1
+
+        def run():
+            frame = dest()
+            frame[name] = operation(read2(), read3())
+            return nxt
+        return run
+
+    def __unary(self, ins, i, operation):
+        """Spolecny preklad instrukci ve tvaru <var> <symb>"""
+        dest = self.dest(ins.args['arg1'], ins)
+        name = ins.args['arg1'].key
+        read2 = self.reader(ins.args['arg2'], keep=ins.buffers, ins=ins)
+        operation = self.types.unchecked(ins) or operation
+        nxt = i + 1
+
+        def run():
+            frame = dest()
+            frame[name] = operation(read2())
+            return nxt
+        return run
+
+    @staticmethod
+    def __undefined_label():
+        """Preklad skoku na nedefinovane navesti"""
+        def run():
+            raise SemanticError()
+        return run
+
+    def __count_vars(self, run):
+        """Metoda pro doplneni pocitani dostupnych promennych, pouze pokud je pozadovano (--vars)"""
+        if not self.m.stats.vars:
+            return run
+        count_available_vars = self.m.count_available_vars
+
+        def counted():
+            nxt = run()
+            count_available_vars()
+            return nxt
+        return counted
+
+    # Slozene instrukce (superinstrukce)
+    def __fused(self, run, i, length):
+        """Metoda pro zapocitani vsech spojenych instrukci do statistik"""
+        if self.counts is None:
+            return run
+        counts = self.counts
+        members = range(i + 1, i + length)
+
+        def counted():
+            for j in members:
+                counts[j] += 1
+            return run()
+        return counted
+
+    def __compare_jump(self, i):
+        """LT/GT/EQ a podmineny skok podle vysledku porovnani"""
+        compare, jump = self.m.instructions[i:i + 2]
+        operation = OPERATIONS[compare.opcode]
+        dest = self.dest(compare.args['arg1'])
+        name = compare.args['arg1'].key
+        read2 = self.reader(compare.args['arg2'])
+        read3 = self.reader(compare.args['arg3'])
+        literal = jump.args['arg3'] if jump.args['arg3'].type == 'bool' else jump.args['arg2']
+        jump_on = literal.val if jump.opcode == 'JUMPIFEQ' else not literal.val
+        target = jump.target
+        nxt = i + 2
+
+        def run():
+            frame = dest()
+            result = operation(read2(), read3())
+            frame[name] = result
+            if target is None:
+                raise SemanticError()
+            return target if result is jump_on else nxt
+        return run
+
+    def __arithmetic_jump(self, i):
+        """ADD/SUB/MUL a nepodmineny skok"""
+        arithmetic = self.__compile(self.m.instructions[i], i)
+        target = self.m.instructions[i + 1].target
+
+        def run():
+            arithmetic()
+            if target is None:
+                raise SemanticError()
+            return target
+        return run
+
+    def __stack_operation(self, i):
+        """Vlozeni dvou hodnot na zasobnik a zasobnikova operace - vysledek se vlozi na zasobnik primo"""
+        first, second, stack_op = self.m.instructions[i:i + 3]
+        stack = self.m.data_stack
+        read_first = self.reader(first.args['arg1'])
+        read_second = self.reader(second.args['arg1'])
+        operation = OPERATIONS[stack_op.opcode[:-1]]
+        nxt = i + 3
+
+        def run():
+            a = read_first()
+            b = read_second()
+            stack.append(operation(a, b))
+            return nxt
+        return run
+
+    def __defvar_move(self, i):
+        """Definice promenne a jeji inicializace"""
+        defvar = self.__compile(self.m.instructions[i], i)
+        move = self.__compile(self.m.instructions[i + 1], i + 1)
+
+        def run():
+            defvar()
+            return move()
+        return run
+
+    # Nasleduji metody pro preklad jednotlivych instrukci
+    # Zakladni instrukce
+    def __move(self, ins, i):
+        return self.__unary(ins, i, lambda a: a)
+
+    def __createframe(self, ins, i):
+        m = self.m
+        nxt = i + 1
+
+        def run():
+            m.temporary_frame = Frame()
+            return nxt
+        return run
+
+    def __pushframe(self, ins, i):
+        m = self.m
+        nxt = i + 1
+
+        def run():
+            if m.temporary_frame is None:
+                raise MissingFrameError()
+            m.frame_stack.append(m.temporary_frame)
+            m.temporary_frame = None
+            return nxt
+        return run
+
+    def __popframe(self, ins, i):
+        m = self.m
+        nxt = i + 1
+
+        def run():
+            if m.frame_stack[-1] is None:
+                raise MissingFrameError()
+            m.temporary_frame = m.frame_stack.pop()
+            return nxt
+        return self.__count_vars(run)
+
+    def __defvar(self, ins, i):
+        m = self.m
+        name = ins.args['arg1'].key
+        nxt = i + 1
+        if ins.args['arg1'].frame == 'GF':
+            def run_global():
+                m.global_frame.add_var(name)
+                return nxt
+            return self.__count_vars(run_global)
+        get_frame = self.__frame_getter(ins.args['arg1'].frame)
+
+        def run():
+            frame = get_frame()
+            if name in frame:
+                raise SemanticError()
+            frame[name] = None
+            return nxt
+        return self.__count_vars(run)
+
+    def __call(self, ins, i):
+        m = self.m
+        if ins.target is None:
+            return self.__undefined_label()
+        target = ins.target
+
+        def run():
+            m.call_stack.append(i)
+            return target
+        return run
+
+    def __return(self, ins, i):
+        m = self.m
+
+        def run():
+            if m.call_stack[-1] is None:
+                raise MissingValueError()
+            return m.call_stack.pop() + 1
+        return run
+
+    def __pushs(self, ins, i):
+        m = self.m
+        read1 = self.reader(ins.args['arg1'])
+        nxt = i + 1
+
+        def run():
+            m.data_stack.append(read1())
+            return nxt
+        return run
+
+    def __pops(self, ins, i):
+        m = self.m
+        dest = self.dest(ins.args['arg1'])
+        name = ins.args['arg1'].key
+        nxt = i + 1
+
+        def run():
+            frame = dest()
+            if not m.data_stack:
+                raise MissingValueError()
+            frame[name] = m.data_stack.pop()
+            return nxt
+        return run
+
+    def __add(self, ins, i):
+        return self.__binary(ins, i, add)
+
+    def __sub(self, ins, i):
+        return self.__binary(ins, i, sub)
+
+    def __mul(self, ins, i):
+        return self.__binary(ins, i, mul)
+
+    def __idiv(self, ins, i):
+        return self.__binary(ins, i, idiv)
+
+    def __lt(self, ins, i):
+        return self.__binary(ins, i, lt)
+
+    def __gt(self, ins, i):
+        return self.__binary(ins, i, gt)
+
+    def __eq(self, ins, i):
+        return self.__binary(ins, i, equals)
+
+    def __and(self, ins, i):
+        return self.__binary(ins, i, and_)
+
+    def __or(self, ins, i):
+        return self.__binary(ins, i, or_)
+
+    def __not(self, ins, i):
+        return self.__unary(ins, i, not_)
+
+    def __int2char(self, ins, i):
+        return self.__unary(ins, i, int2char)
+
+    def __stri2int(self, ins, i):
+        return self.__binary(ins, i, stri2int)
+
+    def __write(self, ins, i):
+        read1 = self.reader(ins.args['arg1'])
+        write = self.m.output.write
+        nxt = i + 1
+
+        def run():
+            val = read1()
+            if type(val) is str:
+                write(val)
+            elif type(val) is Nil:
+                pass
+            elif val is True:
+                write("true")
+            elif val is False:
+                write("false")
+            elif type(val) == float:
+                write(float.hex(val))
+            else:
+                write(str(val))
+            return nxt
+        return run
+
+    def __concat(self, ins, i):
+        if not ins.buffers:
+            return self.__binary(ins, i, concat)
+        # CONCAT do stejne promenne - pripojeni k StringBuffer v promenne
+        dest = self.dest(ins.args['arg1'])
+        name = ins.args['arg1'].key
+        read2 = self.reader(ins.args['arg2'], keep=True)
+        read3 = self.reader(ins.args['arg3'])
+        nxt = i + 1
+
+        def run():
+            frame = dest()
+            string = read2()
+            text = read3()
+            if type(string) is StringBuffer and type(text) is str:
+                string.append(text)
+            else:
+                string = StringBuffer(concat(string, text))
+                frame[name] = string
+            return nxt
+        return run
+
+    def __strlen(self, ins, i):
+        return self.__unary(ins, i, strlen)
+
+    def __getchar(self, ins, i):
+        return self.__binary(ins, i, getchar)
+
+    def __setchar(self, ins, i):
+        dest = self.dest(ins.args['arg1'])
+        name = ins.args['arg1'].key
+        read2 = self.reader(ins.args['arg2'])
+        read3 = self.reader(ins.args['arg3'])
+        nxt = i + 1
+
+        def run():
+            frame = dest()
+            string = frame[name]
+            index = read2()
+            char = read3()
+            if string is None:
+                raise MissingValueError()
+            if (type(string) != str and type(string) is not StringBuffer) or type(index) != int or \
+                    type(char) != str:
+                raise OperandTypeError()
+            if index >= len(string) or index < 0 or len(char) == 0:
+                raise StringError()
+            if type(string) is str:  # promenna od ted obsahuje buffer
+                string = StringBuffer(string)
+                frame[name] = string
+            string.setchar(index, char[0])
+            return nxt
+        return run
+
+    def __type(self, ins, i):
+        def type_(a):
+            if type(a) == int:
+                return 'int'
+            elif type(a) == float:
+                return 'float'
+            elif type(a) == str:
+                return 'string'
+            elif type(a) == bool:
+                return 'bool'
+            elif type(a) == Nil:
+                return 'nil'
+            return ''
+        dest = self.dest(ins.args['arg1'])
+        name = ins.args['arg1'].key
+        read2 = self.reader(ins.args['arg2'], allow_none=True)
+        nxt = i + 1
+
+        def run():
+            frame = dest()
+            frame[name] = type_(read2())
+            return nxt
+        return run
+
+    def __label(self, ins, i):
+        nxt = i + 1
+        return lambda: nxt
+
+    def __jump(self, ins, i):
+        if ins.target is None:
+            return self.__undefined_label()
+        target = ins.target
+        return lambda: target
+
+    def __jumpifeq(self, ins, i):
+        read2 = self.reader(ins.args['arg2'], ins=ins)
+        read3 = self.reader(ins.args['arg3'], ins=ins)
+        target = ins.target
+        nxt = i + 1
+        if target is not None and self.__same_types(ins):
+            return lambda: target if read2() == read3() else nxt
+
+        def run():
+            a = read2()
+            b = read3()
+            if target is None:
+                raise SemanticError()
+            return target if equals(a, b) else nxt
+        return run
+
+    def __jumpifneq(self, ins, i):
+        read2 = self.reader(ins.args['arg2'], ins=ins)
+        read3 = self.reader(ins.args['arg3'], ins=ins)
+        target = ins.target
+        nxt = i + 1
+        if target is not None and self.__same_types(ins):
+            return lambda: nxt if read2() == read3() else target
+
+        def run():
+            a = read2()
+            b = read3()
+            if target is None:
+                raise SemanticError()
+            return nxt if equals(a, b) else target
+        return run
+
+    def __same_types(self, ins) -> bool:
+        """Metoda pro zjisteni, zda maji porovnavane operandy skoku zarucene stejny typ"""
+        a = self.types.type_of(ins, ins.args['arg2'])
+        return a is not None and a is self.types.type_of(ins, ins.args['arg3'])
+
+    # Instrukce specificke pro rozsireni FLOAT
+    def __int2float(self, ins, i):
+        return self.__unary(ins, i, int2float)
+
+    def __float2int(self, ins, i):
+        return self.__unary(ins, i, float2int)
+
+    def __div(self, ins, i):
+        return self.__binary(ins, i, div)
+
+
+def equals(a, b) -> bool:
+    """Funkce pro porovnani dvou hodnot (EQ, JUMPIFEQ, JUMPIFNEQ) vcetne kontroly typu"""
+    if type(a) is not type(b) and type(a) is not Nil and type(b) is not Nil:
+        raise OperandTypeError()
+    if type(a) is Nil and type(b) is Nil:
+        return True
+    return a == b
+
+
+def add(a, b):
+    """Operace ADD, ADDS vcetne kontroly typu operandu"""
+    if not ((type(a) == int and type(b) == int) or (type(a) == float and type(b) == float)):
+        raise OperandTypeError()
+    return a + b
+
+
+def sub(a, b):
+    """Operace SUB, SUBS vcetne kontroly typu operandu"""
+    if not ((type(a) == int and type(b) == int) or (type(a) == float and type(b) == float)):
+        raise OperandTypeError()
+    return a - b
+
+
+def mul(a, b):
+    """Operace MUL, MULS vcetne kontroly typu operandu"""
+    if not ((type(a) == int and type(b) == int) or (type(a) == float and type(b) == float)):
+        raise OperandTypeError()
+    return a * b
+
+
+def idiv(a, b):
+    """Operace IDIV, IDIVS vcetne kontroly typu operandu"""
+    if type(a) != int or type(b) != int:
+        raise OperandTypeError()
+    if b == 0:
+        raise BadValueError()
+    return a // b
+
+
+def lt(a, b):
+    """Operace LT, LTS vcetne kontroly typu operandu"""
+    if type(a) is not type(b) or type(a) is Nil:
+        raise OperandTypeError()
+    return a < b
+
+
+def gt(a, b):
+    """Operace GT, GTS vcetne kontroly typu operandu"""
+    if type(a) is not type(b) or type(a) is Nil:
+        raise OperandTypeError()
+    return a > b
+
+
+def and_(a, b):
+    """Operace AND, ANDS vcetne kontroly typu operandu"""
+    if type(a) != bool or type(b) != bool:
+        raise OperandTypeError()
+    return a and b
+
+
+def or_(a, b):
+    """Operace OR, ORS vcetne kontroly typu operandu"""
+    if type(a) != bool or type(b) != bool:
+        raise OperandTypeError()
+    return a or b
+
+
+def not_(a):
+    """Operace NOT vcetne kontroly typu operandu"""
+    if type(a) != bool:
+        raise OperandTypeError()
+    return not a
+
+
+def int2char(a):
+    """Operace INT2CHAR vcetne kontroly typu operandu"""
+    if type(a) != int:
+        raise OperandTypeError()
+    if a < 0 or a > 1114111:
+        raise StringError()
+    return chr(a)
+
+
+def stri2int(a, b):
+    """Operace STRI2INT vcetne kontroly typu operandu"""
+    if type(a) != str or type(b) != int:
+        raise OperandTypeError()
+    if b < 0 or b >= len(a):
+        raise StringError()
+    return ord(a[b])
+
+
+def concat(a, b):
+    """Operace CONCAT vcetne kontroly typu operandu"""
+    if type(a) != str or type(b) != str:
+        raise OperandTypeError()
+    return a + b
+
+
+def strlen(a):
+    """Operace STRLEN vcetne kontroly typu operandu (retezec nebo StringBuffer)"""
+    if type(a) != str and type(a) is not StringBuffer:
+        raise OperandTypeError()
+    return len(a)
+
+
+def getchar(a, b):
+    """Operace GETCHAR vcetne kontroly typu operandu (retezec nebo StringBuffer)"""
+    if (type(a) != str and type(a) is not StringBuffer) or type(b) != int:
+        raise OperandTypeError()
+    if b < 0 or b >= len(a):
+        raise StringError()
+    return a[b]
+
+
+def int2float(a):
+    """Operace INT2FLOAT vcetne kontroly typu operandu"""
+    if type(a) != int:
+        raise OperandTypeError()
+    return float(a)
+
+
+def float2int(a):
+    """Operace FLOAT2INT vcetne kontroly typu operandu"""
+    if type(a) != float:
+        raise OperandTypeError()
+    return int(a)
+
+
+def div(a, b):
+    """Operace DIV vcetne kontroly typu operandu"""
+    if type(a) != float or type(b) != float:
+        raise OperandTypeError()
+    if b == 0:
+        raise BadValueError()
+    return a / b
+
+
+# Operace podle opcode instrukce (pouzivaji se i pro slozene instrukce a optimalizace)
+OPERATIONS = {
+    'ADD': add,
+    'SUB': sub,
+    'MUL': mul,
+    'IDIV': idiv,
+    'LT': lt,
+    'GT': gt,
+    'EQ': equals,
+    'AND': and_,
+    'OR': or_,
+    'NOT': not_,
+    'INT2CHAR': int2char,
+    'STRI2INT': stri2int,
+    'CONCAT': concat,
+    'STRLEN': strlen,
+    'GETCHAR': getchar,
+    'INT2FLOAT': int2float,
+    'FLOAT2INT': float2int,
+    'DIV': div,
+}
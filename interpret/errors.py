@@ -0,0 +1,77 @@
+"""
+FIT VUT IPP 2023
+Projekt 2 - Interpret XML reprezentace jazyka IPPcode23
+Autor: Jaroslav Streit (xstrei06)
+Soubor: errors.py
+"""
+
+
+class IPPError(Exception):
+    """Zakladni trida chyb interpretu, atribut code je navratovy kod podle zadani"""
+    code = 99
+
+    def __init__(self, message=None):
+        super().__init__(message or self.__doc__)
+
+
+class InputFileError(IPPError):
+    """Chyba pri otevirani vstupniho souboru"""
+    code = 11
+
+
+class OutputFileError(IPPError):
+    """Chyba pri otevirani vystupniho souboru"""
+    code = 12
+
+
+class XMLFormatError(IPPError):
+    """Chybny XML format vstupniho souboru"""
+    code = 31
+
+
+class XMLStructureError(IPPError):
+    """Neocekavana struktura XML nebo lexikalni ci syntakticka chyba"""
+    code = 32
+
+
+class SemanticError(IPPError):
+    """Semanticka chyba (nedefinovane navesti, redefinice promenne nebo navesti)"""
+    code = 52
+
+
+class OperandTypeError(IPPError):
+    """Spatne typy operandu"""
+    code = 53
+
+
+class UndefinedVariableError(IPPError):
+    """Pristup k neexistujici promenne"""
+    code = 54
+
+
+class MissingFrameError(IPPError):
+    """Ramec neexistuje"""
+    code = 55
+
+
+class MissingValueError(IPPError):
+    """Chybejici hodnota (v promenne, na datovem zasobniku nebo v zasobniku volani)"""
+    code = 56
+
+
+class BadValueError(IPPError):
+    """Spatna hodnota operandu (deleni nulou, spatna navratova hodnota EXIT)"""
+    code = 57
+
+
+class StringError(IPPError):
+    """Chybna prace s retezcem"""
+    code = 58
+
+
+ERRORS = {error.code: error for error in IPPError.__subclasses__()}  # trida chyby podle navratoveho kodu
+
+
+def fail(code):
+    """Funkce pro vyvolani chyby podle navratoveho kodu (pro generovany kod)"""
+    raise ERRORS[code]()
@@ -5,7 +5,7 @@ Autor: Jaroslav Streit (xstrei06)
 Soubor: frame.py
 """
 
-import sys
+from errors import SemanticError, UndefinedVariableError
 
 
 class Frame:
@@ -16,17 +16,59 @@ class Frame:
     def add_var(self, var) -> None:
         """Metoda pro pridani nove promenne do ramce (DEFVAR)"""
         if var in self.frame:
-            sys.exit(52)
+            raise SemanticError()
         self.frame[var] = None
 
     def change_var(self, var, value) -> None:
         """Metoda pro zmenu hodnoty promenne"""
         if var not in self.frame:
-            sys.exit(54)
+            raise UndefinedVariableError()
         self.frame[var] = value
 
     def get_var(self, var) -> str:
         """Metoda pro ziskani hodnoty promenne"""
         if var not in self.frame:
-            sys.exit(54)
+            raise UndefinedVariableError()
         return self.frame[var]
+
+    def __len__(self) -> int:
+        """Pocet definovanych promennych v ramci"""
+        return len(self.frame)
+
+
+UNDEFINED = object()  # hodnota slotu, jehoz promenna jeste nebyla definovana (DEFVAR)
+
+
+class SlotFrame(Frame):
+    """Trida pro reprezentaci globalniho ramce
+    Jmena promennych jsou pri nacitani programu prevedena na indexy (sloty), promenne se tak
+    misto slovniku ukladaji do seznamu s pevnou velikosti"""
+    def __init__(self, names):
+        self.names = names  # jmena promennych podle indexu slotu
+        self.values = [UNDEFINED] * len(names)
+        self.count = 0  # pocet definovanych promennych
+
+    @property
+    def frame(self) -> dict:
+        """Obsah ramce ve tvaru slovniku (pro vypis instrukci BREAK)"""
+        return {name: val for name, val in zip(self.names, self.values) if val is not UNDEFINED}
+
+    def add_var(self, slot) -> None:
+        if self.values[slot] is not UNDEFINED:
+            raise SemanticError()
+        self.values[slot] = None
+        self.count += 1
+
+    def change_var(self, slot, value) -> None:
+        if self.values[slot] is UNDEFINED:
+            raise UndefinedVariableError()
+        self.values[slot] = value
+
+    def get_var(self, slot) -> str:
+        val = self.values[slot]
+        if val is UNDEFINED:
+            raise UndefinedVariableError()
+        return val
+
+    def __len__(self) -> int:
+        return self.count
@@ -0,0 +1,89 @@
+"""
+FIT VUT IPP 2023
+Projekt 2 - Interpret XML reprezentace jazyka IPPcode23
+Autor: Jaroslav Streit (xstrei06)
+Soubor: fusion.py
+"""
+
+# Zasobnikove instrukce, ktere lze spojit s dvojici predchazejicich PUSHS
+STACK_OPERATIONS = {'ADDS', 'SUBS', 'MULS', 'IDIVS', 'LTS', 'GTS', 'EQS', 'ANDS', 'ORS'}
+
+
+class Fusion:
+    """Trida pro vyhledani posloupnosti instrukci, ktere lze provest jako jednu slozenou instrukci
+    (superinstrukci). Posloupnost se spoji pouze tehdy, pokud do jejiho stredu nelze skocit."""
+    def __init__(self, instructions):
+        self.instructions = instructions
+        self.patterns = {  # slovnik vzoru podle jmena slozene instrukce
+            'compare_jump': self.__compare_jump,
+            'arithmetic_jump': self.__arithmetic_jump,
+            'stack_operation': self.__stack_operation,
+            'defvar_move': self.__defvar_move,
+        }
+
+    def find(self) -> dict:
+        """Metoda pro nalezeni slozenych instrukci
+        Vraci slovnik {index prvni instrukce: (jmeno vzoru, pocet instrukci)}"""
+        fused = {}
+        i = 0
+        while i < len(self.instructions):
+            for name, pattern in self.patterns.items():
+                length = pattern(i)
+                if length and not any(self.__entry(j) for j in range(i + 1, i + length)):
+                    fused[i] = (name, length)
+                    i += length
+                    break
+            else:
+                i += 1
+        return fused
+
+    def __entry(self, i) -> bool:
+        """Metoda pro zjisteni, zda lze na instrukci skocit (navesti nebo navrat z CALL)"""
+        return self.instructions[i].opcode == 'LABEL' or self.instructions[i - 1].opcode == 'CALL'
+
+    def __opcodes(self, i, length) -> list:
+        if i + length > len(self.instructions):
+            return []
+        return [ins.opcode for ins in self.instructions[i:i + length]]
+
+    @staticmethod
+    def same_var(first, second) -> bool:
+        """Metoda pro zjisteni, zda dva operandy oznacuji stejnou promennou"""
+        return first.type == 'var' and second.type == 'var' and \
+            first.frame == second.frame and first.var == second.var
+
+    # Nasleduji vzory slozenych instrukci, kazdy vraci pocet spojenych instrukci (0 pokud vzor nesedi)
+    def __compare_jump(self, i) -> int:
+        """LT/GT/EQ <var> ... nasledovane JUMPIFEQ/JUMPIFNEQ <label> <var> bool@..."""
+        opcodes = self.__opcodes(i, 2)
+        if not opcodes or opcodes[0] not in ('LT', 'GT', 'EQ') or opcodes[1] not in ('JUMPIFEQ', 'JUMPIFNEQ'):
+            return 0
+        result = self.instructions[i].args['arg1']
+        jump = self.instructions[i + 1]
+        first, second = jump.args['arg2'], jump.args['arg3']
+        if (self.same_var(result, first) and second.type == 'bool') or \
+                (self.same_var(result, second) and first.type == 'bool'):
+            return 2
+        return 0
+
+    def __arithmetic_jump(self, i) -> int:
+        """ADD/SUB/MUL nasledovane JUMP"""
+        opcodes = self.__opcodes(i, 2)
+        if opcodes and opcodes[0] in ('ADD', 'SUB', 'MUL') and opcodes[1] == 'JUMP':
+            return 2
+        return 0
+
+    def __stack_operation(self, i) -> int:
+        """PUSHS, PUSHS a zasobnikova operace se dvema operandy"""
+        opcodes = self.__opcodes(i, 3)
+        if opcodes and opcodes[0] == 'PUSHS' and opcodes[1] == 'PUSHS' and opcodes[2] in STACK_OPERATIONS:
+            return 3
+        return 0
+
+    def __defvar_move(self, i) -> int:
+        """DEFVAR <var> nasledovane MOVE do stejne promenne"""
+        opcodes = self.__opcodes(i, 2)
+        if opcodes == ['DEFVAR', 'MOVE'] and \
+                self.same_var(self.instructions[i].args['arg1'], self.instructions[i + 1].args['arg1']):
+            return 2
+        return 0
@@ -0,0 +1,233 @@
+"""
+FIT VUT IPP 2023
+Projekt 2 - Interpret XML reprezentace jazyka IPPcode23
+Autor: Jaroslav Streit (xstrei06)
+Soubor: inliner.py
+"""
+
+from instruction import Instruction, DEST_OPCODES
+from operand import Operand
+from type_inference import returns, successors
+
+# Skoky, ktere mohou byt uvnitr vkladane funkce (pouze dopredu na navesti ve funkci)
+LOCAL_JUMPS = {'JUMP', 'JUMPIFEQ', 'JUMPIFNEQ', 'JUMPIFEQS', 'JUMPIFNEQS'}
+
+# Instrukce, ktere vkladana funkce nesmi obsahovat (prace s ramci a zasobnikem volani, vypis stavu)
+FORBIDDEN = {'CALL', 'CREATEFRAME', 'PUSHFRAME', 'POPFRAME', 'BREAK'}
+
+# Instrukce, za kterymi se po volani jiz neprejmenovavaji promenne TF (konec primeho useku)
+EPILOGUE_END = LOCAL_JUMPS | FORBIDDEN | {'LABEL', 'RETURN', 'EXIT'}
+
+
+class Inliner:
+    """Trida pro vlozeni tela kratkych funkci do mist volani (--inline-threshold=N)
+    Vklada se volani ve tvaru CREATEFRAME, DEFVAR/MOVE TF@..., PUSHFRAME, CALL, POPFRAME
+    funkce s nejvyse N instrukcemi do prvniho RETURN. Promenne docasneho a lokalniho ramce
+    se prejmenuji na nove promenne GF (jmeno.n), jejich DEFVAR se presune na zacatek programu.
+    Navesti ve funkci se prejmenuji stejne. Cteni TF@ za POPFRAME (navratova hodnota)
+    se prejmenuje az po prvni skok, navesti nebo praci s ramci.
+
+    Volani se vlozi pouze pokud:
+    - funkce neobsahuje CALL (neni rekurzivni), praci s ramci, BREAK ani promenne TF
+      a skace pouze dopredu na vlastni navesti,
+    - kazda lokalni promenna ma nejvyse jeden DEFVAR, ktery predchazi kazdemu pouziti,
+      a kazdemu cteni predchazi zapis na vsech cestach (hodnota z predchoziho volani se
+      nikdy neprecte, chyby 52, 54 a 56 tak nemohou nastat ani puvodne),
+    - za vlozenym usekem se docasny ramec nepouzije pred dalsim CREATEFRAME.
+    Vlozena volani se ve statistikach projevi: CALL, RETURN a instrukce prace s ramci se
+    neprovadi, pocitaji se presunute DEFVAR a nove promenne GF (--vars)."""
+    def __init__(self, instructions, slots, threshold):
+        self.instructions = instructions
+        self.slots = slots  # sloty promennych globalniho ramce (doplni se nove promenne)
+        self.threshold = threshold  # nejvetsi pocet instrukci vkladane funkce
+        self.labels = {ins.args['arg1'].val: i for i, ins in enumerate(instructions) if ins.opcode == 'LABEL'}
+        self.bodies = {}  # telo funkce podle navesti (None, pokud ji nelze vlozit)
+        self.live = None  # pro kazdou instrukci, zda muze byt pred ni dale pouzit docasny ramec
+        self.hoisted = []  # presunute instrukce DEFVAR
+        self.count = 0  # pocet vlozenych volani
+
+    def inline(self) -> list:
+        """Metoda pro vlozeni vsech vhodnych volani, vraci novy seznam instrukci"""
+        result = []
+        i = 0
+        end = len(self.instructions)
+        while i < end:
+            site = self.__call_site(i)
+            if site is None:
+                result.append(self.instructions[i])
+                i += 1
+                continue
+            call, epilogue_end = site
+            result += self.__expand(i, call, epilogue_end)
+            i = epilogue_end
+        if not self.count:
+            return self.instructions
+        return self.hoisted + result
+
+    # Vyhledani vhodnych volani a funkci
+    def __call_site(self, start):
+        """Metoda pro rozpoznani vkladaneho volani zacinajiciho instrukci start (CREATEFRAME)
+        Vraci index instrukce CALL a index prvni instrukce za usekem cteni TF@ po POPFRAME"""
+        instructions = self.instructions
+        size = len(instructions)
+        if instructions[start].opcode != 'CREATEFRAME':
+            return None
+        i = start + 1
+        while i < size and instructions[i].opcode in ('DEFVAR', 'MOVE') and instructions[i].args['arg1'].frame == 'TF':
+            i += 1
+        if i + 2 >= size or instructions[i].opcode != 'PUSHFRAME' or instructions[i + 1].opcode != 'CALL' or \
+                instructions[i + 2].opcode != 'POPFRAME':
+            return None
+        call = i + 1
+        body = self.__body(instructions[call].args['arg1'].val)
+        if body is None:
+            return None
+        # Primy usek za POPFRAME po posledni instrukci pracujici s TF (cteni navratove hodnoty)
+        end = call + 2
+        while end < size and instructions[end].opcode not in EPILOGUE_END and instructions[end].opcode != 'DEFVAR':
+            end += 1
+        while end > call + 2 and not self.__uses_tf(instructions[end - 1]):
+            end -= 1
+        if end < size and self.__tf_live(end):
+            return None
+        sequence = [(ins, 'TF') for ins in instructions[start + 1:call - 1]] + [(ins, 'LF') for ins in body] + \
+                   [(ins, 'TF') for ins in instructions[call + 2:end]]
+        if not self.__safe_locals(sequence, len(instructions[start + 1:call - 1]) + len(body)):
+            return None
+        return call, end
+
+    def __body(self, label):
+        """Metoda vracejici instrukce funkce od navesti po prvni RETURN (bez nej), pokud ji lze vlozit"""
+        if label in self.bodies:
+            return self.bodies[label]
+        self.bodies[label] = None
+        if label not in self.labels:
+            return None
+        body = []
+        defined = set()  # navesti ve funkci
+        i = self.labels[label] + 1
+        while i < len(self.instructions) and self.instructions[i].opcode != 'RETURN':
+            ins = self.instructions[i]
+            if ins.opcode in FORBIDDEN or len(body) >= self.threshold:
+                return None
+            if any(arg.type == 'var' and arg.frame == 'TF' for arg in ins.args.values()):
+                return None
+            if ins.opcode == 'LABEL':
+                defined.add(ins.args['arg1'].val)
+            elif ins.opcode in LOCAL_JUMPS and ins.args['arg1'].val in defined:
+                return None  # skok zpet
+            body.append(ins)
+            i += 1
+        if i >= len(self.instructions):
+            return None
+        if any(ins.opcode in LOCAL_JUMPS and ins.args['arg1'].val not in defined for ins in body):
+            return None  # skok mimo funkci
+        self.bodies[label] = body
+        return body
+
+    def __tf_live(self, index) -> bool:
+        """Metoda pro zjisteni, zda muze byt docasny ramec pouzit pred dalsim CREATEFRAME
+        (analyza zivosti nad grafem toku rizeni celeho programu, provede se jednou)"""
+        if self.live is None:
+            instructions = self.instructions
+            return_points = returns(instructions)
+            predecessors = [[] for _ in instructions]
+            for i in range(len(instructions)):
+                for succ in successors(instructions, i, return_points):
+                    predecessors[succ].append(i)
+            self.live = [self.__uses_tf(ins) for ins in instructions]
+            work = [i for i, live in enumerate(self.live) if live]
+            while work:
+                i = work.pop()
+                for pred in predecessors[i]:
+                    if not self.live[pred] and instructions[pred].opcode not in ('CREATEFRAME', 'POPFRAME'):
+                        self.live[pred] = True
+                        work.append(pred)
+        return self.live[index]
+
+    @staticmethod
+    def __uses_tf(ins) -> bool:
+        if ins.opcode in ('PUSHFRAME', 'BREAK'):
+            return True
+        return any(arg.type == 'var' and arg.frame == 'TF' for arg in ins.args.values())
+
+    @staticmethod
+    def __safe_locals(sequence, returned) -> bool:
+        """Metoda pro kontrolu lokalnich promennych vkladaneho useku (dvojice instrukce a ramec lokalnich
+        promennych), returned je index prvni instrukce za RETURN. Kazdemu pouziti musi na vsech cestach
+        predchazet DEFVAR a kazdemu cteni zapis, kazda promenna ma nejvyse jeden DEFVAR."""
+        declared = set()
+        state = (frozenset(), frozenset())  # (definovane, zapsane) promenne, None - nedosazitelne misto
+        incoming = {}  # stav na navesti podle skoku, ktere na nej vedou
+
+        def merge(first, second):
+            if first is None or second is None:
+                return first or second
+            return first[0] & second[0], first[1] & second[1]
+
+        for i, (ins, frame) in enumerate(sequence):
+            if i == returned and state is None:
+                return True  # funkce se nikdy nevrati, zbytek useku se neprovede
+            if ins.opcode == 'LABEL':
+                state = merge(state, incoming.get(ins.args['arg1'].val))
+                continue
+            if state is None:
+                continue
+            defined, assigned = state
+            dest = None  # zapisovana promenna, zaznamena se az po kontrole vsech ctenych operandu
+            for tag, arg in ins.args.items():
+                if arg.type != 'var' or arg.frame != frame:
+                    continue
+                if ins.opcode == 'DEFVAR':
+                    if arg.var in declared:
+                        return False
+                    declared.add(arg.var)
+                    defined = defined | {arg.var}
+                elif tag == 'arg1' and ins.opcode in DEST_OPCODES and ins.opcode != 'SETCHAR':
+                    if arg.var not in defined:
+                        return False
+                    dest = arg.var
+                elif arg.var not in assigned:
+                    return False
+            if dest is not None:
+                assigned = assigned | {dest}
+            state = (defined, assigned)
+            if ins.opcode in LOCAL_JUMPS:
+                label = ins.args['arg1'].val
+                incoming[label] = merge(incoming[label], state) if label in incoming else state
+                if ins.opcode == 'JUMP':
+                    state = None
+            elif ins.opcode == 'EXIT':
+                state = None
+        return True
+
+    # Vlozeni funkce
+    def __expand(self, start, call, end) -> list:
+        """Metoda vracejici instrukce vlozeneho volani (bez CREATEFRAME, PUSHFRAME, CALL, RETURN a POPFRAME)"""
+        self.count += 1
+        names = {}  # nova jmena lokalnich promennych a navesti
+        order = self.instructions[call].order_orig
+        result = []
+        for ins in self.instructions[start + 1:call - 1]:
+            result += self.__rename(ins, 'TF', names, order)
+        for ins in self.bodies[self.instructions[call].args['arg1'].val]:
+            result += self.__rename(ins, 'LF', names, order)
+        for ins in self.instructions[call + 2:end]:
+            result += self.__rename(ins, 'TF', names, order)
+        return result
+
+    def __rename(self, ins, frame, names, order) -> list:
+        """Metoda pro prejmenovani lokalnich promennych (ramec frame) a navesti jedne instrukce"""
+        args = {}
+        for tag, arg in ins.args.items():
+            if arg.type == 'var' and arg.frame == frame:
+                if arg.var not in names:
+                    names[arg.var] = Operand.variable('GF', f"{arg.var}.{self.count}", self.slots)
+                    self.hoisted.append(Instruction('DEFVAR', {'arg1': names[arg.var]}, 0, order, {}))
+                arg = names[arg.var]
+            elif arg.type == 'label' and frame == 'LF':
+                arg = Operand('label', f"{arg.val}.{self.count}")
+            args[tag] = arg
+        if ins.opcode == 'DEFVAR' and ins.args['arg1'].frame == frame:
+            return []
+        return [Instruction(ins.opcode, args, ins.order, ins.order_orig, {})]
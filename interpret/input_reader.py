@@ -0,0 +1,49 @@
+"""
+FIT VUT IPP 2023
+Projekt 2 - Interpret XML reprezentace jazyka IPPcode23
+Autor: Jaroslav Streit (xstrei06)
+Soubor: input_reader.py
+"""
+
+import sys
+from nil_type import Nil
+
+
+class InputReader:
+    """Trida pro postupne cteni uzivatelskeho vstupu instrukci READ
+    Radky se ctou az v okamziku potreby, vstup ze souboru i ze standardniho vstupu
+    se zpracovava stejne (okrajove bile znaky se odstrani, chybejici radek je nil)"""
+    def __init__(self, filename=None, stream=None):
+        if stream is not None:
+            self.stream = stream
+        else:
+            self.stream = sys.stdin if filename is None else open(filename, "r")
+
+    def readline(self):
+        """Metoda pro nacteni dalsiho radku, na konci vstupu vraci None"""
+        line = self.stream.readline()
+        if line == "":
+            return None
+        return line.strip()
+
+    def read(self, value_type):
+        """Metoda pro nacteni hodnoty zadaneho typu, pri chybe nebo konci vstupu vraci nil"""
+        line = self.readline()
+        if line is None:
+            return Nil()
+        if value_type == 'int':
+            try:
+                return int(line, 0)
+            except ValueError:
+                return Nil()
+        elif value_type == 'bool':
+            return line.lower() == 'true'
+        elif value_type == 'float':
+            try:
+                return float(line)
+            except ValueError:
+                try:
+                    return float.fromhex(line)
+                except ValueError:
+                    return Nil()
+        return line
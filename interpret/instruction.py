@@ -6,525 +6,490 @@ Soubor: instruction.py
 """
 
 import sys
-import re
-from frame import Frame
+from frame import Frame, UNDEFINED
 from nil_type import Nil
+from string_buffer import StringBuffer
+from fusion import Fusion
+from errors import (BadValueError, MissingFrameError, MissingValueError, OperandTypeError, SemanticError,
+                    StringError, UndefinedVariableError, XMLStructureError)
+
+# Instrukce, jejichz prvni argument je cilova promenna
+DEST_OPCODES = {'MOVE', 'DEFVAR', 'POPS', 'ADD', 'SUB', 'MUL', 'IDIV', 'LT', 'GT', 'EQ', 'AND', 'OR', 'NOT',
+                'INT2CHAR', 'STRI2INT', 'READ', 'CONCAT', 'STRLEN', 'GETCHAR', 'SETCHAR', 'TYPE',
+                'INT2FLOAT', 'FLOAT2INT', 'DIV'}
+
+# Instrukce, ktere se po opakovanem provedeni se stejnymi typy operandu nahradi specializovanou variantou
+ADAPTIVE_OPCODES = {'ADD', 'LT', 'CONCAT', 'JUMPIFEQ', 'JUMPIFNEQ'}
+QUICKEN_AFTER = 8  # pocet po sobe jdoucich provedeni se stejnymi typy operandu pred specializaci
 
 
 class Instruction:
-    def __init__(self, instruction):
-        self.opcode = instruction.attrib["opcode"]
-        self.instruction = instruction
-        self.args = {}
-        self.order = int(instruction.attrib["order"])
-        self.order_orig = int(instruction.attrib["order_orig"])
-        self.invoke_method = {  # slovnik pro volani odpovidajici metody podle opcode instrukce
-            'MOVE': self.__move,
-            'CREATEFRAME': self.__createframe,
-            'PUSHFRAME': self.__pushframe,
-            'POPFRAME': self.__popframe,
-            'DEFVAR': self.__defvar,
-            'CALL': self.__call,
-            'RETURN': self.__return,
-            'PUSHS': self.__pushs,
-            'POPS': self.__pops,
-            'ADD': self.__add,
-            'SUB': self.__sub,
-            'MUL': self.__mul,
-            'IDIV': self.__idiv,
-            'LT': self.__lt,
-            'GT': self.__gt,
-            'EQ': self.__eq,
-            'AND': self.__and,
-            'OR': self.__or,
-            'NOT': self.__not,
-            'INT2CHAR': self.__int2char,
-            'STRI2INT': self.__stri2int,
-            'READ': self.__read,
-            'WRITE': self.__write,
-            'CONCAT': self.__concat,
-            'STRLEN': self.__strlen,
-            'GETCHAR': self.__getchar,
-            'SETCHAR': self.__setchar,
-            'TYPE': self.__type,
-            'LABEL': self.__label,
-            'JUMP': self.__jump,
-            'JUMPIFEQ': self.__jumpifeq,
-            'JUMPIFNEQ': self.__jumpifneq,
-            'EXIT': self.__exit,
-            'DPRINT': self.__dprint,
-            'BREAK': self.__break,
-            'CLEARS': self.__clears,
-            'ADDS': self.__adds,
-            'SUBS': self.__subs,
-            'MULS': self.__muls,
-            'IDIVS': self.__idivs,
-            'LTS': self.__lts,
-            'GTS': self.__gts,
-            'EQS': self.__eqs,
-            'ANDS': self.__ands,
-            'ORS': self.__ors,
-            'NOTS': self.__nots,
-            'INT2CHARS': self.__int2chars,
-            'STRI2INTS': self.__stri2ints,
-            'JUMPIFEQS': self.__jumpifeqs,
-            'JUMPIFNEQS': self.__jumpifneqs,
-            'INT2FLOAT': self.__int2float,
-            'FLOAT2INT': self.__float2int,
-            'DIV': self.__div,
-        }
-        if self.opcode not in self.invoke_method:
-            sys.exit(32)
-        self.hot = 0
-
-    def __set_args(self, inst, glob_frame, temp_frame, local_frame) -> None:
-        """Metoda pro nastaveni argumentu instrukce"""
-        for i in inst:
-            if i.attrib["type"] == "var":
-                if re.match(r'^(LF|GF|TF)@[a-zA-Z_$&%*!?-][a-zA-Z_$&%*!?0-9-]*$', i.text) is None:
-                    sys.exit(32)
-                self.args[i.tag] = {'var': i.text[3:],
-                                    'frame': self.__get_frame(i.text, glob_frame, temp_frame, local_frame),
-                                    'type': 'var'}
-                self.__check_var(i.tag)
-                if self.opcode == 'DEFVAR':
-                    self.args[i.tag]['val'] = None
-                else:
-                    self.args[i.tag]['val'] = self.__get_frame(i.text, glob_frame, temp_frame,
-                                                               local_frame).get_var(i.text[3:])
-                    if i.tag == 'arg1' and self.args[i.tag]['val'] is None and \
-                            (self.opcode == 'PUSHS' or self.opcode == 'WRITE' or
-                             self.opcode == 'DPRINT' or self.opcode == 'EXIT'):
-                        sys.exit(56)
-                    elif i.tag != 'arg1' and self.args[i.tag]['val'] is None and self.opcode != 'TYPE':
-                        sys.exit(56)
-            elif i.attrib["type"] == "int":
-                try:
-                    self.args[i.tag] = {'val': int(i.text, 0), 'type': 'int'}
-                except ValueError:
-                    sys.exit(32)
-            elif i.attrib["type"] == "float":
-                try:
-                    self.args[i.tag] = {'val': float(i.text), 'type': 'float'}
-                except ValueError:
-                    try:
-                        self.args[i.tag] = {'val': float.fromhex(i.text), 'type': 'float'}
-                    except ValueError:
-                        sys.exit(32)
-            elif i.attrib["type"] == "bool":
-                if i.text == "true":
-                    self.args[i.tag] = {'val': True, 'type': 'bool'}
-                elif i.text == "false":
-                    self.args[i.tag] = {'val': False, 'type': 'bool'}
-                else:
-                    sys.exit(32)
-            elif i.attrib["type"] == "string":
-                self.args[i.tag] = {'val': i.text, 'type': 'string'}
-            elif i.attrib["type"] == "label":
-                if re.match('^[a-zA-Z_$&%*!?-][a-zA-Z_$&%*!?0-9-]*$', i.text) is None:
-                    sys.exit(32)
-                self.args[i.tag] = {'val': i.text, 'type': 'label'}
-            elif i.attrib["type"] == "type":
-                if re.match('^(int|float|string|bool|nil)$', i.text) is None:
-                    sys.exit(32)
-                self.args[i.tag] = {'val': i.text, 'type': 'type'}
-            elif i.attrib["type"] == "nil":
-                if i.text != "nil":
-                    sys.exit(32)
-                self.args[i.tag] = {'val': Nil(), 'type': 'nil'}
+    """Trida pro reprezentaci a provedeni jedne instrukce
+    Operandy instrukce jsou dekodovany a zkontrolovany jiz pri vytvoreni objektu"""
+    __slots__ = ('opcode', 'args', 'order', 'order_orig', 'handler', 'target', 'vals', 'var_args', 'dest',
+                 'dest_key', 'buffers', 'seen', 'counter')
+
+    def __init__(self, opcode, args, order, order_orig, labels):
+        self.opcode = opcode
+        self.args = args  # slovnik predzpracovanych operandu (Operand) podle oznaceni argumentu
+        self.order = order
+        self.order_orig = order_orig
+        self.handler = self.invoke_method.get(opcode)  # metoda provadejici instrukci
+        if self.handler is None:
+            raise XMLStructureError()
+        if opcode in ADAPTIVE_OPCODES:
+            self.handler = Instruction.__adaptive
+        self.seen = None  # typ operandu pri poslednich provedenich (None - operandy ruznych typu)
+        self.counter = 0  # pocet po sobe jdoucich provedeni s typem seen
+        if self.opcode in DEST_OPCODES and self.args['arg1'].type != 'var':
+            raise XMLStructureError()
+        if self.opcode == 'READ' and self.args['arg2'].val not in ['int', 'bool', 'string', 'float']:
+            raise XMLStructureError()
+
+        # Navesti je prelozeno na index instrukce uz pri nacteni (None pro neexistujici navesti)
+        self.target = None
+        if 'arg1' in self.args and self.args['arg1'].type == 'label':
+            self.target = labels.get(self.args['arg1'].val)
+
+        # Hodnoty literalu jsou pripraveny predem, pri provadeni se dohledavaji pouze promenne
+        self.vals = {tag: arg.val for tag, arg in self.args.items() if arg.type != 'var'}
+        # (oznaceni, ramec, klic, prace s StringBuffer - None, 'value' pro prevod na retezec, 'keep' pro ponechani)
+        self.var_args = [(tag, self.args[tag].frame, self.args[tag].key, None)
+                         for tag in sorted(self.args) if self.args[tag].type == 'var']
+        self.dest = None  # ramec ciloveho argumentu arg1
+        self.dest_key = self.args['arg1'].key if 'arg1' in self.args else None  # klic cilove promenne v ramci
+        self.buffers = False  # instrukce pracuje primo s StringBuffer (viz bind_buffers)
+
+    def bind_buffers(self, names) -> None:
+        """Metoda pro nastaveni prace s promennymi, ktere mohou obsahovat StringBuffer (jmena names)
+        SETCHAR (cil), CONCAT do stejne promenne (arg2), STRLEN a GETCHAR (arg2) pracuji primo
+        s bufferem, ostatni cteni techto promennych buffer prevadi na retezec"""
+        kept = None
+        if self.opcode == 'SETCHAR':
+            kept = 'arg1'
+        elif self.opcode == 'CONCAT' and Fusion.same_var(self.args['arg1'], self.args['arg2']):
+            kept = 'arg2'
+        elif self.opcode in ('STRLEN', 'GETCHAR'):
+            kept = 'arg2'
+        var_args = []
+        for tag, frame, key, _ in self.var_args:
+            mode = None
+            if self.args[tag].var in names and (tag != 'arg1' or tag == kept or self.opcode not in DEST_OPCODES):
+                mode = 'keep' if tag == kept else 'value'
+                self.buffers = self.buffers or tag == kept
+            var_args.append((tag, frame, key, mode))
+        self.var_args = var_args
+
+    def __load_args(self, m) -> None:
+        """Metoda pro nacteni hodnot promennych z ramcu"""
+        for tag, frame, key, buffered in self.var_args:
+            frame = self.__get_frame(frame, m)
+            if frame is None:
+                raise MissingFrameError()
+            if self.opcode == 'DEFVAR':
+                self.dest = frame
+                continue
+            if frame is m.global_frame:  # globalni ramec - primy pristup do slotu
+                val = frame.values[key]
+                if val is UNDEFINED:
+                    raise UndefinedVariableError()
             else:
-                sys.exit(32)
-
-    def __get_frame(self, var, glob_frame, temp_frame, local_frame) -> Frame:
+                if key not in frame.frame:
+                    raise UndefinedVariableError()
+                val = frame.frame[key]
+            if buffered == 'value' and type(val) is StringBuffer:
+                val = val.value()
+            if tag == 'arg1':
+                self.dest = frame
+                if val is None and self.opcode in ('PUSHS', 'WRITE', 'DPRINT', 'EXIT'):
+                    raise MissingValueError()
+            elif val is None and self.opcode != 'TYPE':
+                raise MissingValueError()
+            self.vals[tag] = val
+
+    @staticmethod
+    def __get_frame(frame, m) -> Frame:
         """Metoda pro ziskani ramce promenne"""
-        if var.startswith("GF@"):
-            return glob_frame
-        elif var.startswith("TF@"):
-            return temp_frame
-        elif var.startswith("LF@"):
-            return local_frame
-        else:
-            sys.exit(32)
-
-    def execute(self, m) -> None:
-        """Metoda pro provedeni instrukce
-        Metoda take sbira nektere statistiky"""
-        self.__set_args(self.instruction, m.global_frame, m.temporary_frame, m.frame_stack[0])
-        self.invoke_method[self.opcode](m)
-        if self.opcode != "LABEL" and self.opcode != 'BREAK' and self.opcode != 'DPRINT':
-            m.insts += 1
-        self.hot += 1
-        if self.hot > m.hot:
-            m.hot = self.hot
-            m.hot_order = self.order_orig
-        elif self.hot == m.hot:
-            if self.order_orig < m.hot_order:
-                m.hot_order = self.order_orig
-        m.stats.frequent[self.opcode] += 1
+        if frame == "GF":
+            return m.global_frame
+        elif frame == "TF":
+            return m.temporary_frame
+        return m.frame_stack[-1]
+
+    def perform(self, m) -> None:
+        """Metoda pro provedeni instrukce (statistiky sbira volajici podle indexu instrukce)"""
+        self.__load_args(m)
+        self.handler(self, m)
+
+    # Zrychleni (quickening) instrukci podle typu operandu
+    # Instrukce z ADAPTIVE_OPCODES se provadi obecnou metodou a sleduji typy operandu. Pokud maji oba
+    # operandy QUICKEN_AFTER-krat po sobe stejny typ, nahradi se metoda specializovanou variantou
+    # (specialize_method), ktera kontroluje pouze typy operandu. Pri jinem typu se instrukce vrati
+    # k obecne metode (deoptimalizace) a sledovani zacina znovu.
+    def __adaptive(self, m) -> None:
+        self.invoke_method[self.opcode](self, m)  # pri chybe se typy nezaznamenaji
+        seen = type(self.vals['arg2'])
+        if seen is not type(self.vals['arg3']):
+            seen = None
+        if seen is not self.seen:
+            self.seen = seen
+            self.counter = 1
+            return
+        self.counter += 1
+        if self.counter >= QUICKEN_AFTER and not self.buffers and (self.opcode, seen) in self.specialize_method:
+            self.handler = self.specialize_method[(self.opcode, seen)]
+
+    def __deoptimize(self, m) -> None:
+        """Metoda pro navrat k obecne metode po selhani kontroly typu ve specializovane variante"""
+        self.handler = Instruction.__adaptive
+        self.seen = None
+        self.counter = 0
+        self.handler(self, m)
+
+    def __add_int(self, m) -> None:
+        a = self.vals['arg2']
+        b = self.vals['arg3']
+        if type(a) is not int or type(b) is not int:
+            self.__deoptimize(m)
+            return
+        self.dest.change_var(self.dest_key, a + b)
+
+    def __add_float(self, m) -> None:
+        a = self.vals['arg2']
+        b = self.vals['arg3']
+        if type(a) is not float or type(b) is not float:
+            self.__deoptimize(m)
+            return
+        self.dest.change_var(self.dest_key, a + b)
+
+    def __lt_int(self, m) -> None:
+        a = self.vals['arg2']
+        b = self.vals['arg3']
+        if type(a) is not int or type(b) is not int:
+            self.__deoptimize(m)
+            return
+        self.dest.change_var(self.dest_key, a < b)
+
+    def __lt_str(self, m) -> None:
+        a = self.vals['arg2']
+        b = self.vals['arg3']
+        if type(a) is not str or type(b) is not str:
+            self.__deoptimize(m)
+            return
+        self.dest.change_var(self.dest_key, a < b)
+
+    def __concat_str(self, m) -> None:
+        a = self.vals['arg2']
+        b = self.vals['arg3']
+        if type(a) is not str or type(b) is not str:
+            self.__deoptimize(m)
+            return
+        self.dest.change_var(self.dest_key, a + b)
+
+    def __jumpifeq_same(self, m) -> None:
+        """Specializovany JUMPIFEQ pro operandy typu self.seen (int, bool nebo string)"""
+        a = self.vals['arg2']
+        b = self.vals['arg3']
+        if type(a) is not self.seen or type(b) is not self.seen:
+            self.__deoptimize(m)
+            return
+        if a == b:
+            m.ins_pointer = self.target - 1
+
+    def __jumpifneq_same(self, m) -> None:
+        """Specializovany JUMPIFNEQ pro operandy typu self.seen (int, bool nebo string)"""
+        a = self.vals['arg2']
+        b = self.vals['arg3']
+        if type(a) is not self.seen or type(b) is not self.seen:
+            self.__deoptimize(m)
+            return
+        if a != b:
+            m.ins_pointer = self.target - 1
 
     # Nasleduji metody pro provedeni jednotlivych instrukci
     # Zakladni instrukce
     def __move(self, m) -> None:
-        self.__check_dest_var()
-        self.args['arg1']['frame'].change_var(self.args['arg1']['var'], self.args['arg2']['val'])
+        self.dest.change_var(self.dest_key, self.vals['arg2'])
 
     def __createframe(self, m) -> None:
         m.temporary_frame = Frame()
 
     def __pushframe(self, m) -> None:
         if m.temporary_frame is None:
-            sys.exit(55)
-        m.frame_stack.insert(0, m.temporary_frame)
+            raise MissingFrameError()
+        m.frame_stack.append(m.temporary_frame)
         m.temporary_frame = None
 
     def __popframe(self, m) -> None:
-        if m.frame_stack[0] is None:
-            sys.exit(55)
-        m.temporary_frame = m.frame_stack.pop(0)
-        m.count_available_vars()
+        if m.frame_stack[-1] is None:
+            raise MissingFrameError()
+        m.temporary_frame = m.frame_stack.pop()
+        if m.stats.vars:
+            m.count_available_vars()
 
     def __defvar(self, m) -> None:
-        self.__check_dest_var()
-        if self.args['arg1']['frame'] is None:
-            sys.exit(55)
-        self.args['arg1']['frame'].add_var(self.args['arg1']['var'])
-        m.count_available_vars()
+        self.dest.add_var(self.dest_key)
+        if m.stats.vars:
+            m.count_available_vars()
 
     def __call(self, m) -> None:
-        if self.args['arg1']['val'] not in m.xml_parser.labels:
-            sys.exit(52)
-        m.call_stack.insert(0, m.ins_pointer)
-        m.ins_pointer = m.xml_parser.labels[self.args['arg1']['val']] - 1
+        if self.target is None:
+            raise SemanticError()
+        m.call_stack.append(m.ins_pointer)
+        m.ins_pointer = self.target - 1
 
     def __return(self, m) -> None:
-        if m.call_stack[0] is None:
-            sys.exit(56)
-        m.ins_pointer = m.call_stack.pop(0)
+        if m.call_stack[-1] is None:
+            raise MissingValueError()
+        m.ins_pointer = m.call_stack.pop()
 
     def __pushs(self, m) -> None:
-        m.data_stack.insert(0, self.args['arg1'])
+        m.data_stack.append(self.vals['arg1'])
 
     def __pops(self, m) -> None:
-        self.__check_dest_var()
         if not m.data_stack:
-            sys.exit(56)
-        self.args['arg1']['frame'].change_var(self.args['arg1']['var'], m.data_stack.pop(0)['val'])
+            raise MissingValueError()
+        self.dest.change_var(self.dest_key, m.data_stack.pop())
 
     def __add(self, m) -> None:
-        self.__check_dest_var()
-        if not ((type(self.args['arg2']['val']) == int and type(self.args['arg3']['val']) == int) or
-                (type(self.args['arg2']['val']) == float and type(self.args['arg3']['val']) == float)):
-            sys.exit(53)
-        self.args['arg1']['frame'].change_var(self.args['arg1']['var'],
-                                              self.args['arg2']['val'] + self.args['arg3']['val'])
+        if not ((type(self.vals['arg2']) == int and type(self.vals['arg3']) == int) or
+                (type(self.vals['arg2']) == float and type(self.vals['arg3']) == float)):
+            raise OperandTypeError()
+        self.dest.change_var(self.dest_key, self.vals['arg2'] + self.vals['arg3'])
 
     def __sub(self, m) -> None:
-        self.__check_dest_var()
-        if not ((type(self.args['arg2']['val']) == int and type(self.args['arg3']['val']) == int) or
-                (type(self.args['arg2']['val']) == float and type(self.args['arg3']['val']) == float)):
-            sys.exit(53)
-        self.args['arg1']['frame'].change_var(self.args['arg1']['var'],
-                                              self.args['arg2']['val'] - self.args['arg3']['val'])
+        if not ((type(self.vals['arg2']) == int and type(self.vals['arg3']) == int) or
+                (type(self.vals['arg2']) == float and type(self.vals['arg3']) == float)):
+            raise OperandTypeError()
+        self.dest.change_var(self.dest_key, self.vals['arg2'] - self.vals['arg3'])
 
     def __mul(self, m) -> None:
-        self.__check_dest_var()
-        if not ((type(self.args['arg2']['val']) == int and type(self.args['arg3']['val']) == int) or
-                (type(self.args['arg2']['val']) == float and type(self.args['arg3']['val']) == float)):
-            sys.exit(53)
-        self.args['arg1']['frame'].change_var(self.args['arg1']['var'],
-                                              self.args['arg2']['val'] * self.args['arg3']['val'])
+        if not ((type(self.vals['arg2']) == int and type(self.vals['arg3']) == int) or
+                (type(self.vals['arg2']) == float and type(self.vals['arg3']) == float)):
+            raise OperandTypeError()
+        self.dest.change_var(self.dest_key, self.vals['arg2'] * self.vals['arg3'])
 
     def __idiv(self, m) -> None:
-        self.__check_dest_var()
-        if type(self.args['arg2']['val']) != int or type(self.args['arg3']['val']) != int:
-            sys.exit(53)
-        if self.args['arg3']['val'] == 0:
-            sys.exit(57)
-        self.args['arg1']['frame'].change_var(self.args['arg1']['var'],
-                                                  self.args['arg2']['val'] // self.args['arg3']['val'])
+        if type(self.vals['arg2']) != int or type(self.vals['arg3']) != int:
+            raise OperandTypeError()
+        if self.vals['arg3'] == 0:
+            raise BadValueError()
+        self.dest.change_var(self.dest_key, self.vals['arg2'] // self.vals['arg3'])
 
     def __lt(self, m) -> None:
-        self.__check_dest_var()
-        if not (isinstance(self.args['arg2']['val'], type(self.args['arg3']['val']))
-                and isinstance(self.args['arg3']['val'], type(self.args['arg2']['val']))):
-            sys.exit(53)
-        if type(self.args['arg2']['val']) is Nil or type(self.args['arg3']['val']) is Nil:
-            sys.exit(53)
+        if not (isinstance(self.vals['arg2'], type(self.vals['arg3']))
+                and isinstance(self.vals['arg3'], type(self.vals['arg2']))):
+            raise OperandTypeError()
+        if type(self.vals['arg2']) is Nil or type(self.vals['arg3']) is Nil:
+            raise OperandTypeError()
         else:
-            if self.args['arg2']['val'] < self.args['arg3']['val']:
-                self.args['arg1']['frame'].change_var(self.args['arg1']['var'], True)
+            if self.vals['arg2'] < self.vals['arg3']:
+                self.dest.change_var(self.dest_key, True)
             else:
-                self.args['arg1']['frame'].change_var(self.args['arg1']['var'], False)
+                self.dest.change_var(self.dest_key, False)
 
     def __gt(self, m) -> None:
-        self.__check_dest_var()
-        if not (isinstance(self.args['arg2']['val'], type(self.args['arg3']['val']))
-                and isinstance(self.args['arg3']['val'], type(self.args['arg2']['val']))):
-            sys.exit(53)
-        if type(self.args['arg2']['val']) is Nil or type(self.args['arg3']['val']) is Nil:
-            sys.exit(53)
+        if not (isinstance(self.vals['arg2'], type(self.vals['arg3']))
+                and isinstance(self.vals['arg3'], type(self.vals['arg2']))):
+            raise OperandTypeError()
+        if type(self.vals['arg2']) is Nil or type(self.vals['arg3']) is Nil:
+            raise OperandTypeError()
         else:
-            if self.args['arg2']['val'] > self.args['arg3']['val']:
-                self.args['arg1']['frame'].change_var(self.args['arg1']['var'], True)
+            if self.vals['arg2'] > self.vals['arg3']:
+                self.dest.change_var(self.dest_key, True)
             else:
-                self.args['arg1']['frame'].change_var(self.args['arg1']['var'], False)
+                self.dest.change_var(self.dest_key, False)
 
     def __eq(self, m) -> None:
-        self.__check_dest_var()
-        if not (isinstance(self.args['arg2']['val'], type(self.args['arg3']['val']))
-                and isinstance(self.args['arg3']['val'], type(self.args['arg2']['val']))) \
-                and (type(self.args['arg2']['val']) is not Nil and type(self.args['arg3']['val']) is not Nil):
-            sys.exit(53)
+        if not (isinstance(self.vals['arg2'], type(self.vals['arg3']))
+                and isinstance(self.vals['arg3'], type(self.vals['arg2']))) \
+                and (type(self.vals['arg2']) is not Nil and type(self.vals['arg3']) is not Nil):
+            raise OperandTypeError()
         else:
-            if self.args['arg2']['val'] == self.args['arg3']['val']:
-                self.args['arg1']['frame'].change_var(self.args['arg1']['var'], True)
-            elif type(self.args['arg2']['val']) is Nil and type(self.args['arg3']['val']) is Nil:
-                self.args['arg1']['frame'].change_var(self.args['arg1']['var'], True)
+            if self.vals['arg2'] == self.vals['arg3']:
+                self.dest.change_var(self.dest_key, True)
+            elif type(self.vals['arg2']) is Nil and type(self.vals['arg3']) is Nil:
+                self.dest.change_var(self.dest_key, True)
             else:
-                self.args['arg1']['frame'].change_var(self.args['arg1']['var'], False)
+                self.dest.change_var(self.dest_key, False)
 
     def __and(self, m) -> None:
-        self.__check_dest_var()
-        if type(self.args['arg2']['val']) != bool or type(self.args['arg3']['val']) != bool:
-            sys.exit(53)
+        if type(self.vals['arg2']) != bool or type(self.vals['arg3']) != bool:
+            raise OperandTypeError()
         else:
-            if self.args['arg2']['val'] is True and self.args['arg3']['val'] is True:
-                self.args['arg1']['frame'].change_var(self.args['arg1']['var'], True)
+            if self.vals['arg2'] is True and self.vals['arg3'] is True:
+                self.dest.change_var(self.dest_key, True)
             else:
-                self.args['arg1']['frame'].change_var(self.args['arg1']['var'], False)
+                self.dest.change_var(self.dest_key, False)
 
     def __or(self, m) -> None:
-        self.__check_dest_var()
-        if type(self.args['arg2']['val']) != bool or type(self.args['arg3']['val']) != bool:
-            sys.exit(53)
+        if type(self.vals['arg2']) != bool or type(self.vals['arg3']) != bool:
+            raise OperandTypeError()
         else:
-            if self.args['arg2']['val'] is True or self.args['arg3']['val'] is True:
-                self.args['arg1']['frame'].change_var(self.args['arg1']['var'], True)
+            if self.vals['arg2'] is True or self.vals['arg3'] is True:
+                self.dest.change_var(self.dest_key, True)
             else:
-                self.args['arg1']['frame'].change_var(self.args['arg1']['var'], False)
+                self.dest.change_var(self.dest_key, False)
 
     def __not(self, m) -> None:
-        self.__check_dest_var()
-        if type(self.args['arg2']['val']) != bool:
-            sys.exit(53)
+        if type(self.vals['arg2']) != bool:
+            raise OperandTypeError()
         else:
-            if self.args['arg2']['val'] is True:
-                self.args['arg1']['frame'].change_var(self.args['arg1']['var'], False)
+            if self.vals['arg2'] is True:
+                self.dest.change_var(self.dest_key, False)
             else:
-                self.args['arg1']['frame'].change_var(self.args['arg1']['var'], True)
+                self.dest.change_var(self.dest_key, True)
 
     def __int2char(self, m) -> None:
-        self.__check_dest_var()
-        if type(self.args['arg2']['val']) != int:
-            sys.exit(53)
-        if self.args['arg2']['val'] < 0 or self.args['arg2']['val'] > 1114111:
-            sys.exit(58)
-        self.args['arg1']['frame'].change_var(self.args['arg1']['var'], chr(self.args['arg2']['val']))
+        if type(self.vals['arg2']) != int:
+            raise OperandTypeError()
+        if self.vals['arg2'] < 0 or self.vals['arg2'] > 1114111:
+            raise StringError()
+        self.dest.change_var(self.dest_key, chr(self.vals['arg2']))
 
     def __stri2int(self, m) -> None:
-        self.__check_dest_var()
-        if type(self.args['arg2']['val']) != str or type(self.args['arg3']['val']) != int:
-            sys.exit(53)
-        if self.args['arg3']['val'] < 0 or self.args['arg3']['val'] >= len(self.args['arg2']['val']):
-            sys.exit(58)
-        self.args['arg1']['frame'].change_var(self.args['arg1']['var'],
-                                              ord(self.args['arg2']['val'][self.args['arg3']['val']]))
+        if type(self.vals['arg2']) != str or type(self.vals['arg3']) != int:
+            raise OperandTypeError()
+        if self.vals['arg3'] < 0 or self.vals['arg3'] >= len(self.vals['arg2']):
+            raise StringError()
+        self.dest.change_var(self.dest_key, ord(self.vals['arg2'][self.vals['arg3']]))
 
     def __read(self, m) -> None:
-        self.__check_dest_var()
-        if self.args['arg2']['val'] not in ['int', 'bool', 'string', 'float']:
-            sys.exit(32)
-        if m.input_in == 'stdin':  # nacitani ze standardniho vstupu
-            try:
-                read_in = input()
-                if read_in == '':
-                    self.args['arg1']['frame'].change_var(self.args['arg1']['var'], Nil())
-                else:
-                    if self.args['arg2']['val'] == 'int':
-                        try:
-                            self.args['arg1']['frame'].change_var(self.args['arg1']['var'], int(read_in, 0))
-                        except ValueError:
-                            self.args['arg1']['frame'].change_var(self.args['arg1']['var'], Nil())
-                    elif self.args['arg2']['val'] == 'bool':
-                        text = input()
-                        if text.lower() == 'true':
-                            self.args['arg1']['frame'].change_var(self.args['arg1']['var'], True)
-                        else:
-                            self.args['arg1']['frame'].change_var(self.args['arg1']['var'], False)
-                    elif self.args['arg2']['val'] == 'string':
-                        self.args['arg1']['frame'].change_var(self.args['arg1']['var'], read_in)
-                    elif self.args['arg2']['val'] == 'float':
-                        try:
-                            self.args['arg1']['frame'].change_var(self.args['arg1']['var'], float(read_in))
-                        except ValueError:
-                            try:
-                                self.args['arg1']['frame'].change_var(self.args['arg1']['var'], float.fromhex(read_in))
-                            except ValueError:
-                                self.args['arg1']['frame'].change_var(self.args['arg1']['var'], Nil())
-                    else:
-                        sys.exit(32)
-            except EOFError:
-                self.args['arg1']['frame'].change_var(self.args['arg1']['var'], Nil())
-        else:  # nacitani ze souboru
-            if len(m.input_in) == 0:
-                self.args['arg1']['frame'].change_var(self.args['arg1']['var'], Nil())
-            else:
-                try:
-                    if self.args['arg2']['val'] == 'int':
-                        try:
-                            self.args['arg1']['frame'].change_var(self.args['arg1']['var'], int(m.input_in[0], 0))
-                        except ValueError:
-                            self.args['arg1']['frame'].change_var(self.args['arg1']['var'], Nil())
-                    elif self.args['arg2']['val'] == 'bool':
-                        text = m.input_in[0]
-                        if text.lower() == 'true':
-                            self.args['arg1']['frame'].change_var(self.args['arg1']['var'], True)
-                        else:
-                            self.args['arg1']['frame'].change_var(self.args['arg1']['var'], False)
-                    elif self.args['arg2']['val'] == 'string':
-                        self.args['arg1']['frame'].change_var(self.args['arg1']['var'], m.input_in[0])
-                    elif self.args['arg2']['val'] == 'float':
-                        value = m.input_in[0]
-                        try:
-                            self.args['arg1']['frame'].change_var(self.args['arg1']['var'], float(value))
-                        except ValueError:
-                            try:
-                                self.args['arg1']['frame'].change_var(self.args['arg1']['var'], float.fromhex(value))
-                            except ValueError:
-                                self.args['arg1']['frame'].change_var(self.args['arg1']['var'], Nil())
-                    else:
-                        sys.exit(32)
-                except EOFError:
-                    self.args['arg1']['frame'].change_var(self.args['arg1']['var'], Nil())
-                except IndexError:
-                    self.args['arg1']['frame'].change_var(self.args['arg1']['var'], Nil())
-                m.input_in.pop(0)
+        self.dest.change_var(self.dest_key, m.input_in.read(self.vals['arg2']))
 
     def __write(self, m) -> None:
-        if type(self.args['arg1']['val']) is Nil:
-            print("", end="")
-        elif self.args['arg1']['val'] is None:
-            sys.exit(56)
-        elif self.args['arg1']['val'] is True:
-            print("true", end="")
-        elif self.args['arg1']['val'] is False:
-            print("false", end="")
-        elif type(self.args['arg1']['val']) == float:
-            print(float.hex(self.args['arg1']['val']), end="")
+        if type(self.vals['arg1']) is Nil:
+            pass
+        elif self.vals['arg1'] is None:
+            raise MissingValueError()
+        elif self.vals['arg1'] is True:
+            m.output.write("true")
+        elif self.vals['arg1'] is False:
+            m.output.write("false")
+        elif type(self.vals['arg1']) == float:
+            m.output.write(float.hex(self.vals['arg1']))
         else:
-            print(self.args['arg1']['val'], end="")
+            m.output.write(str(self.vals['arg1']))
 
     def __concat(self, m) -> None:
-        self.__check_dest_var()
-        if type(self.args['arg2']['val']) != str or type(self.args['arg3']['val']) != str:
-            sys.exit(53)
+        if type(self.vals['arg2']) is StringBuffer:  # pripojeni k bufferu v cilove promenne
+            if type(self.vals['arg3']) != str:
+                raise OperandTypeError()
+            self.vals['arg2'].append(self.vals['arg3'])
+        elif type(self.vals['arg2']) != str or type(self.vals['arg3']) != str:
+            raise OperandTypeError()
+        elif self.buffers:  # CONCAT do stejne promenne, dalsi pripojeni uz budou do bufferu
+            string = StringBuffer(self.vals['arg2'])
+            string.append(self.vals['arg3'])
+            self.dest.change_var(self.dest_key, string)
         else:
-            self.args['arg1']['frame'].change_var(self.args['arg1']['var'],
-                                                  self.args['arg2']['val'] + self.args['arg3']['val'])
+            self.dest.change_var(self.dest_key, self.vals['arg2'] + self.vals['arg3'])
 
     def __strlen(self, m) -> None:
-        self.__check_dest_var()
-        if type(self.args['arg2']['val']) != str:
-            sys.exit(53)
+        if type(self.vals['arg2']) != str and type(self.vals['arg2']) is not StringBuffer:
+            raise OperandTypeError()
         else:
-            self.args['arg1']['frame'].change_var(self.args['arg1']['var'], len(self.args['arg2']['val']))
+            self.dest.change_var(self.dest_key, len(self.vals['arg2']))
 
     def __getchar(self, m) -> None:
-        self.__check_dest_var()
-        if type(self.args['arg2']['val']) != str or type(self.args['arg3']['val']) != int:
-            sys.exit(53)
-        if self.args['arg3']['val'] < 0 or self.args['arg3']['val'] >= len(self.args['arg2']['val']):
-            sys.exit(58)
-        self.args['arg1']['frame'].change_var(self.args['arg1']['var'],
-                                              self.args['arg2']['val'][self.args['arg3']['val']])
+        if (type(self.vals['arg2']) != str and type(self.vals['arg2']) is not StringBuffer) or \
+                type(self.vals['arg3']) != int:
+            raise OperandTypeError()
+        if self.vals['arg3'] < 0 or self.vals['arg3'] >= len(self.vals['arg2']):
+            raise StringError()
+        self.dest.change_var(self.dest_key, self.vals['arg2'][self.vals['arg3']])
 
     def __setchar(self, m) -> None:
-        self.__check_dest_var()
-        if self.args['arg1']['val'] is None:
-            sys.exit(56)
-        if type(self.args['arg1']['val']) != str:
-            sys.exit(53)
-        if type(self.args['arg2']['val']) != int:
-            sys.exit(53)
-        if type(self.args['arg3']['val']) != str:
-            sys.exit(53)
-        if self.args['arg2']['val'] >= len(self.args['arg1']['val']) or self.args['arg2']['val'] < 0\
-                or len(self.args['arg3']['val']) == 0:
-            sys.exit(58)
-        first = self.args['arg1']['val'][:self.args['arg2']['val']]
-        second = self.args['arg1']['val'][self.args['arg2']['val'] + 1:]
-        self.args['arg1']['frame'].change_var(self.args['arg1']['var'],
-                                              first + self.args['arg3']['val'][0] + second)
+        if self.vals['arg1'] is None:
+            raise MissingValueError()
+        if type(self.vals['arg1']) != str and type(self.vals['arg1']) is not StringBuffer:
+            raise OperandTypeError()
+        if type(self.vals['arg2']) != int:
+            raise OperandTypeError()
+        if type(self.vals['arg3']) != str:
+            raise OperandTypeError()
+        if self.vals['arg2'] >= len(self.vals['arg1']) or self.vals['arg2'] < 0\
+                or len(self.vals['arg3']) == 0:
+            raise StringError()
+        string = self.vals['arg1']
+        if type(string) is str:  # promenna od ted obsahuje buffer, dalsi SETCHAR jsou O(1)
+            string = StringBuffer(string)
+            self.dest.change_var(self.dest_key, string)
+        string.setchar(self.vals['arg2'], self.vals['arg3'][0])
 
     def __type(self, m) -> None:
-        self.__check_dest_var()
-        if type(self.args['arg2']['val']) == int:
-            self.args['arg1']['frame'].change_var(self.args['arg1']['var'], 'int')
-        elif type(self.args['arg2']['val']) == float:
-            self.args['arg1']['frame'].change_var(self.args['arg1']['var'], 'float')
-        elif type(self.args['arg2']['val']) == str:
-            self.args['arg1']['frame'].change_var(self.args['arg1']['var'], 'string')
-        elif type(self.args['arg2']['val']) == bool:
-            self.args['arg1']['frame'].change_var(self.args['arg1']['var'], 'bool')
-        elif type(self.args['arg2']['val']) == Nil:
-            self.args['arg1']['frame'].change_var(self.args['arg1']['var'], 'nil')
-        elif self.args['arg2']['type'] == 'var' and self.args['arg2']['val'] is None:
-            self.args['arg1']['frame'].change_var(self.args['arg1']['var'], '')
+        if type(self.vals['arg2']) == int:
+            self.dest.change_var(self.dest_key, 'int')
+        elif type(self.vals['arg2']) == float:
+            self.dest.change_var(self.dest_key, 'float')
+        elif type(self.vals['arg2']) == str:
+            self.dest.change_var(self.dest_key, 'string')
+        elif type(self.vals['arg2']) == bool:
+            self.dest.change_var(self.dest_key, 'bool')
+        elif type(self.vals['arg2']) == Nil:
+            self.dest.change_var(self.dest_key, 'nil')
+        elif self.args['arg2'].type == 'var' and self.vals['arg2'] is None:
+            self.dest.change_var(self.dest_key, '')
         else:
-            sys.exit(53)
+            raise OperandTypeError()
 
     def __label(self, m) -> None:
         pass
 
     def __jump(self, m) -> None:
-        if self.args['arg1']['val'] not in m.xml_parser.labels:
-            sys.exit(52)
-        m.ins_pointer = m.xml_parser.labels[self.args['arg1']['val']] - 1
+        if self.target is None:
+            raise SemanticError()
+        m.ins_pointer = self.target - 1
 
     def __jumpifeq(self, m) -> None:
-        if self.args['arg1']['val'] not in m.xml_parser.labels:
-            sys.exit(52)
-        if (isinstance(self.args['arg2']['val'], type(self.args['arg3']['val']))
-            and isinstance(self.args['arg3']['val'], type(self.args['arg2']['val']))) or \
-                type(self.args['arg2']['val']) is Nil or type(self.args['arg3']['val']) is Nil:
-            if self.args['arg2']['val'] == self.args['arg3']['val']:
-                m.ins_pointer = m.xml_parser.labels[self.args['arg1']['val']] - 1
-            elif type(self.args['arg2']['val']) is Nil and type(self.args['arg3']['val']) is Nil:
-                m.ins_pointer = m.xml_parser.labels[self.args['arg1']['val']] - 1
+        if self.target is None:
+            raise SemanticError()
+        if (isinstance(self.vals['arg2'], type(self.vals['arg3']))
+            and isinstance(self.vals['arg3'], type(self.vals['arg2']))) or \
+                type(self.vals['arg2']) is Nil or type(self.vals['arg3']) is Nil:
+            if self.vals['arg2'] == self.vals['arg3']:
+                m.ins_pointer = self.target - 1
+            elif type(self.vals['arg2']) is Nil and type(self.vals['arg3']) is Nil:
+                m.ins_pointer = self.target - 1
         else:
-            sys.exit(53)
+            raise OperandTypeError()
 
     def __jumpifneq(self, m) -> None:
-        if self.args['arg1']['val'] not in m.xml_parser.labels:
-            sys.exit(52)
-        if (isinstance(self.args['arg2']['val'], type(self.args['arg3']['val']))
-                and isinstance(self.args['arg3']['val'], type(self.args['arg2']['val']))) or \
-                type(self.args['arg2']['val']) is Nil or type(self.args['arg3']['val']) is Nil:
-            if type(self.args['arg2']['val']) is Nil and type(self.args['arg3']['val']) is Nil:
+        if self.target is None:
+            raise SemanticError()
+        if (isinstance(self.vals['arg2'], type(self.vals['arg3']))
+                and isinstance(self.vals['arg3'], type(self.vals['arg2']))) or \
+                type(self.vals['arg2']) is Nil or type(self.vals['arg3']) is Nil:
+            if type(self.vals['arg2']) is Nil and type(self.vals['arg3']) is Nil:
                 pass
-            elif self.args['arg2']['val'] != self.args['arg3']['val']:
-                m.ins_pointer = m.xml_parser.labels[self.args['arg1']['val']] - 1
+            elif self.vals['arg2'] != self.vals['arg3']:
+                m.ins_pointer = self.target - 1
         else:
-            sys.exit(53)
+            raise OperandTypeError()
 
     def __exit(self, m) -> None:
-        if type(self.args['arg1']['val']) != int:
-            sys.exit(53)
-        elif self.args['arg1']['val'] < 0 or self.args['arg1']['val'] > 49:
-            sys.exit(57)
+        if type(self.vals['arg1']) != int:
+            raise OperandTypeError()
+        elif self.vals['arg1'] < 0 or self.vals['arg1'] > 49:
+            raise BadValueError()
         else:
-            m.ins_pointer = len(m.xml_parser.instructions) + 1
-            m.exit_code = self.args['arg1']['val']
+            m.ins_pointer = len(m.instructions) + 1
+            m.exit_code = self.vals['arg1']
+            m.output.flush()
 
     def __dprint(self, m) -> None:
-        print(str(self.args['arg1']['val']), file=sys.stderr)
+        m.output.flush()
+        print(str(self.vals['arg1']), file=sys.stderr)
 
     def __break(self, m) -> None:
+        m.output.flush()
+        m.insts = m.stats.executed(m.instructions)
+        # zasobniky maji vrchol na konci seznamu, vypisuji se od vrcholu
         print(f"Pozice vykonavane instrukce: {m.ins_pointer}", file=sys.stderr)
-        print(f"Zasobnik volani: {m.call_stack}", file=sys.stderr)
-        print(f"Zasobnik ramcu: {m.frame_stack}", file=sys.stderr)
-        print(f"Zasobnik dat: {m.data_stack}", file=sys.stderr)
-        print(f"Obsah lokalniho ramce: {m.frame_stack[0].frame}", file=sys.stderr)
+        print(f"Zasobnik volani: {m.call_stack[::-1]}", file=sys.stderr)
+        print(f"Zasobnik ramcu: {m.frame_stack[::-1]}", file=sys.stderr)
+        print(f"Zasobnik dat: {m.data_stack[::-1]}", file=sys.stderr)
+        print(f"Obsah lokalniho ramce: {m.frame_stack[-1].frame}", file=sys.stderr)
         print(f"Obsah docasneho ramce: {m.temporary_frame.frame}", file=sys.stderr)
         print(f"Obsah globalniho ramce: {m.global_frame.frame}", file=sys.stderr)
         print(f"Pocet vykonanych instrukci: {m.insts}", file=sys.stderr)
@@ -535,195 +500,242 @@ class Instruction:
 
     def __adds(self, m) -> None:
         self.__check_stack_two_operands(m)
-        if not ((type(self.args['arg2']['val']) == int and type(self.args['arg3']['val']) == int) or
-                (type(self.args['arg2']['val']) == float and type(self.args['arg3']['val']) == float)):
-            sys.exit(53)
-        elif type(self.args['arg2']['val']) == float:
-            m.data_stack.insert(0, {'type': 'float', 'val': self.args['arg2']['val'] + self.args['arg3']['val']})
-        else:
-            m.data_stack.insert(0, {'type': 'int', 'val': self.args['arg2']['val'] + self.args['arg3']['val']})
+        if not ((type(self.vals['arg2']) == int and type(self.vals['arg3']) == int) or
+                (type(self.vals['arg2']) == float and type(self.vals['arg3']) == float)):
+            raise OperandTypeError()
+        m.data_stack.append(self.vals['arg2'] + self.vals['arg3'])
 
     def __subs(self, m) -> None:
         self.__check_stack_two_operands(m)
-        if not ((type(self.args['arg2']['val']) == int and type(self.args['arg3']['val']) == int) or
-                (type(self.args['arg2']['val']) == float and type(self.args['arg3']['val']) == float)):
-            sys.exit(53)
-        elif type(self.args['arg2']['val']) == float:
-            m.data_stack.insert(0, {'type': 'float', 'val': self.args['arg2']['val'] - self.args['arg3']['val']})
-        else:
-            m.data_stack.insert(0, {'type': 'int', 'val': self.args['arg2']['val'] - self.args['arg3']['val']})
+        if not ((type(self.vals['arg2']) == int and type(self.vals['arg3']) == int) or
+                (type(self.vals['arg2']) == float and type(self.vals['arg3']) == float)):
+            raise OperandTypeError()
+        m.data_stack.append(self.vals['arg2'] - self.vals['arg3'])
 
     def __muls(self, m) -> None:
         self.__check_stack_two_operands(m)
-        if not ((type(self.args['arg2']['val']) == int and type(self.args['arg3']['val']) == int) or
-                (type(self.args['arg2']['val']) == float and type(self.args['arg3']['val']) == float)):
-            sys.exit(53)
-        elif type(self.args['arg2']['val']) == float:
-            m.data_stack.insert(0, {'type': 'float', 'val': self.args['arg2']['val'] * self.args['arg3']['val']})
-        else:
-            m.data_stack.insert(0, {'type': 'int', 'val': self.args['arg2']['val'] * self.args['arg3']['val']})
+        if not ((type(self.vals['arg2']) == int and type(self.vals['arg3']) == int) or
+                (type(self.vals['arg2']) == float and type(self.vals['arg3']) == float)):
+            raise OperandTypeError()
+        m.data_stack.append(self.vals['arg2'] * self.vals['arg3'])
 
     def __idivs(self, m) -> None:
         self.__check_stack_two_operands(m)
-        if type(self.args['arg2']['val']) != int or type(self.args['arg3']['val']) != int:
-            sys.exit(53)
-        if self.args['arg3']['val'] == 0:
-            sys.exit(57)
-        m.data_stack.insert(0, {'type': 'int', 'val': self.args['arg2']['val'] // self.args['arg3']['val']})
+        if type(self.vals['arg2']) != int or type(self.vals['arg3']) != int:
+            raise OperandTypeError()
+        if self.vals['arg3'] == 0:
+            raise BadValueError()
+        m.data_stack.append(self.vals['arg2'] // self.vals['arg3'])
 
     def __lts(self, m) -> None:
         self.__check_stack_two_operands(m)
-        if not (isinstance(self.args['arg2']['val'], type(self.args['arg3']['val']))
-                and isinstance(self.args['arg3']['val'], type(self.args['arg2']['val']))):
-            sys.exit(53)
-        if type(self.args['arg2']['val']) is Nil or type(self.args['arg3']['val']) is Nil:
-            sys.exit(53)
-        if self.args['arg2']['val'] < self.args['arg3']['val']:
-            m.data_stack.insert(0, {'type': 'bool', 'val': True})
+        if not (isinstance(self.vals['arg2'], type(self.vals['arg3']))
+                and isinstance(self.vals['arg3'], type(self.vals['arg2']))):
+            raise OperandTypeError()
+        if type(self.vals['arg2']) is Nil or type(self.vals['arg3']) is Nil:
+            raise OperandTypeError()
+        if self.vals['arg2'] < self.vals['arg3']:
+            m.data_stack.append(True)
         else:
-            m.data_stack.insert(0, {'type': 'bool', 'val': False})
+            m.data_stack.append(False)
 
     def __gts(self, m) -> None:
         self.__check_stack_two_operands(m)
-        if not (isinstance(self.args['arg2']['val'], type(self.args['arg3']['val']))
-                and isinstance(self.args['arg3']['val'], type(self.args['arg2']['val']))):
-            sys.exit(53)
-        if type(self.args['arg2']['val']) is Nil or type(self.args['arg3']['val']) is Nil:
-            sys.exit(53)
-        if self.args['arg2']['val'] > self.args['arg3']['val']:
-            m.data_stack.insert(0, {'type': 'bool', 'val': True})
+        if not (isinstance(self.vals['arg2'], type(self.vals['arg3']))
+                and isinstance(self.vals['arg3'], type(self.vals['arg2']))):
+            raise OperandTypeError()
+        if type(self.vals['arg2']) is Nil or type(self.vals['arg3']) is Nil:
+            raise OperandTypeError()
+        if self.vals['arg2'] > self.vals['arg3']:
+            m.data_stack.append(True)
         else:
-            m.data_stack.insert(0, {'type': 'bool', 'val': False})
+            m.data_stack.append(False)
 
     def __eqs(self, m) -> None:
         self.__check_stack_two_operands(m)
-        if not (isinstance(self.args['arg2']['val'], type(self.args['arg3']['val']))
-                and isinstance(self.args['arg3']['val'], type(self.args['arg2']['val']))) \
-                and (type(self.args['arg2']['val']) is not Nil and type(self.args['arg3']['val']) is not Nil):
-            sys.exit(53)
-        if self.args['arg2']['val'] == self.args['arg3']['val']:
-            m.data_stack.insert(0, {'type': 'bool', 'val': True})
-        elif type(self.args['arg2']['val']) is Nil and type(self.args['arg3']['val']) is Nil:
-            m.data_stack.insert(0, {'type': 'bool', 'val': True})
+        if not (isinstance(self.vals['arg2'], type(self.vals['arg3']))
+                and isinstance(self.vals['arg3'], type(self.vals['arg2']))) \
+                and (type(self.vals['arg2']) is not Nil and type(self.vals['arg3']) is not Nil):
+            raise OperandTypeError()
+        if self.vals['arg2'] == self.vals['arg3']:
+            m.data_stack.append(True)
+        elif type(self.vals['arg2']) is Nil and type(self.vals['arg3']) is Nil:
+            m.data_stack.append(True)
         else:
-            m.data_stack.insert(0, {'type': 'bool', 'val': False})
+            m.data_stack.append(False)
 
     def __ands(self, m) -> None:
         self.__check_stack_two_operands(m)
-        if type(self.args['arg2']['val']) != bool or type(self.args['arg3']['val']) != bool:
-            sys.exit(53)
-        if self.args['arg2']['val'] and self.args['arg3']['val']:
-            m.data_stack.insert(0, {'type': 'bool', 'val': True})
+        if type(self.vals['arg2']) != bool or type(self.vals['arg3']) != bool:
+            raise OperandTypeError()
+        if self.vals['arg2'] and self.vals['arg3']:
+            m.data_stack.append(True)
         else:
-            m.data_stack.insert(0, {'type': 'bool', 'val': False})
+            m.data_stack.append(False)
 
     def __ors(self, m) -> None:
         self.__check_stack_two_operands(m)
-        if type(self.args['arg2']['val']) != bool or type(self.args['arg3']['val']) != bool:
-            sys.exit(53)
-        if self.args['arg2']['val'] or self.args['arg3']['val']:
-            m.data_stack.insert(0, {'type': 'bool', 'val': True})
+        if type(self.vals['arg2']) != bool or type(self.vals['arg3']) != bool:
+            raise OperandTypeError()
+        if self.vals['arg2'] or self.vals['arg3']:
+            m.data_stack.append(True)
         else:
-            m.data_stack.insert(0, {'type': 'bool', 'val': False})
+            m.data_stack.append(False)
 
     def __nots(self, m) -> None:
         if len(m.data_stack) < 1:
-            sys.exit(56)
-        self.args['arg1'] = m.data_stack.pop()
-        if type(self.args['arg1']['val']) != bool:
-            sys.exit(53)
-        if self.args['arg1']['val']:
-            m.data_stack.insert(0, {'type': 'bool', 'val': False})
+            raise MissingValueError()
+        self.vals['arg1'] = m.data_stack.pop()
+        if type(self.vals['arg1']) != bool:
+            raise OperandTypeError()
+        if self.vals['arg1']:
+            m.data_stack.append(False)
         else:
-            m.data_stack.insert(0, {'type': 'bool', 'val': True})
+            m.data_stack.append(True)
 
     def __int2chars(self, m) -> None:
         if len(m.data_stack) < 1:
-            sys.exit(56)
-        self.args['arg1'] = m.data_stack.pop()
-        if type(self.args['arg1']['val']) != int:
-            sys.exit(53)
-        if self.args['arg1']['val'] < 0 or self.args['arg1']['val'] > 1114111:
-            sys.exit(58)
-        m.data_stack.insert(0, {'type': 'string', 'val': chr(self.args['arg1']['val'])})
+            raise MissingValueError()
+        self.vals['arg1'] = m.data_stack.pop()
+        if type(self.vals['arg1']) != int:
+            raise OperandTypeError()
+        if self.vals['arg1'] < 0 or self.vals['arg1'] > 1114111:
+            raise StringError()
+        m.data_stack.append(chr(self.vals['arg1']))
 
     def __stri2ints(self, m) -> None:
         self.__check_stack_two_operands(m)
-        if type(self.args['arg2']['val']) != str or type(self.args['arg3']['val']) != int:
-            sys.exit(53)
-        if self.args['arg3']['val'] < 0 or self.args['arg3']['val'] >= len(self.args['arg2']['val']):
-            sys.exit(58)
-        m.data_stack.insert(0, {'type': 'int', 'val': ord(self.args['arg2']['val'][self.args['arg3']['val']])})
+        if type(self.vals['arg2']) != str or type(self.vals['arg3']) != int:
+            raise OperandTypeError()
+        if self.vals['arg3'] < 0 or self.vals['arg3'] >= len(self.vals['arg2']):
+            raise StringError()
+        m.data_stack.append(ord(self.vals['arg2'][self.vals['arg3']]))
 
     def __jumpifeqs(self, m) -> None:
         self.__check_stack_two_operands(m)
-        if self.args['arg1']['val'] not in m.xml_parser.labels:
-            sys.exit(52)
-        if (isinstance(self.args['arg2']['val'], type(self.args['arg3']['val']))
-            and isinstance(self.args['arg3']['val'], type(self.args['arg2']['val']))) or \
-                type(self.args['arg2']['val']) is Nil or type(self.args['arg3']['val']) is Nil:
-            if self.args['arg2']['val'] == self.args['arg3']['val']:
-                m.ins_pointer = m.xml_parser.labels[self.args['arg1']['val']] - 1
-            elif type(self.args['arg2']['val']) is Nil and type(self.args['arg3']['val']) is Nil:
-                m.ins_pointer = m.xml_parser.labels[self.args['arg1']['val']] - 1
+        if self.target is None:
+            raise SemanticError()
+        if (isinstance(self.vals['arg2'], type(self.vals['arg3']))
+            and isinstance(self.vals['arg3'], type(self.vals['arg2']))) or \
+                type(self.vals['arg2']) is Nil or type(self.vals['arg3']) is Nil:
+            if self.vals['arg2'] == self.vals['arg3']:
+                m.ins_pointer = self.target - 1
+            elif type(self.vals['arg2']) is Nil and type(self.vals['arg3']) is Nil:
+                m.ins_pointer = self.target - 1
         else:
-            sys.exit(53)
+            raise OperandTypeError()
 
     def __jumpifneqs(self, m) -> None:
         self.__check_stack_two_operands(m)
-        if self.args['arg1']['val'] not in m.xml_parser.labels:
-            sys.exit(52)
-        if (isinstance(self.args['arg2']['val'], type(self.args['arg3']['val']))
-            and isinstance(self.args['arg3']['val'], type(self.args['arg2']['val']))) or \
-                type(self.args['arg2']['val']) is Nil or type(self.args['arg3']['val']) is Nil:
-            if type(self.args['arg2']['val']) is Nil and type(self.args['arg3']['val']) is Nil:
+        if self.target is None:
+            raise SemanticError()
+        if (isinstance(self.vals['arg2'], type(self.vals['arg3']))
+            and isinstance(self.vals['arg3'], type(self.vals['arg2']))) or \
+                type(self.vals['arg2']) is Nil or type(self.vals['arg3']) is Nil:
+            if type(self.vals['arg2']) is Nil and type(self.vals['arg3']) is Nil:
                 pass
-            elif self.args['arg2']['val'] != self.args['arg3']['val']:
-                m.ins_pointer = m.xml_parser.labels[self.args['arg1']['val']] - 1
+            elif self.vals['arg2'] != self.vals['arg3']:
+                m.ins_pointer = self.target - 1
         else:
-            sys.exit(53)
+            raise OperandTypeError()
 
     # Instrukce specificke pro rozsireni FLOAT
     def __int2float(self, m) -> None:
-        self.__check_dest_var()
-        if self.args['arg2']['val'] is None:
-            sys.exit(56)
-        if type(self.args['arg2']['val']) != int:
-            sys.exit(53)
-        self.args['arg1']['frame'].change_var(self.args['arg1']['var'], float(self.args['arg2']['val']))
+        if self.vals['arg2'] is None:
+            raise MissingValueError()
+        if type(self.vals['arg2']) != int:
+            raise OperandTypeError()
+        self.dest.change_var(self.dest_key, float(self.vals['arg2']))
 
     def __float2int(self, m) -> None:
-        self.__check_dest_var()
-        if self.args['arg2']['val'] is None:
-            sys.exit(56)
-        if type(self.args['arg2']['val']) != float:
-            sys.exit(53)
-        self.args['arg1']['frame'].change_var(self.args['arg1']['var'], int(self.args['arg2']['val']))
+        if self.vals['arg2'] is None:
+            raise MissingValueError()
+        if type(self.vals['arg2']) != float:
+            raise OperandTypeError()
+        self.dest.change_var(self.dest_key, int(self.vals['arg2']))
 
     def __div(self, m) -> None:
-        self.__check_dest_var()
-        if type(self.args['arg2']['val']) != float or type(self.args['arg3']['val']) != float:
-            sys.exit(53)
-        if self.args['arg3']['val'] == 0:
-            sys.exit(57)
-        self.args['arg1']['frame'].change_var(self.args['arg1']['var'],
-                                              self.args['arg2']['val'] / self.args['arg3']['val'])
-
-    def __check_dest_var(self) -> None:
-        """Metoda pro kontrolu cilove promenne"""
-        if self.args['arg1']['type'] != 'var':
-            sys.exit(32)
-
-    def __check_var(self, key) -> None:
-        """Kontrola existence promenne"""
-        if self.args[key]['frame'] is None:
-            sys.exit(55)
-        if self.args[key]['var'] not in self.args[key]['frame'].frame and self.opcode != 'DEFVAR':
-            sys.exit(54)
+        if type(self.vals['arg2']) != float or type(self.vals['arg3']) != float:
+            raise OperandTypeError()
+        if self.vals['arg3'] == 0:
+            raise BadValueError()
+        self.dest.change_var(self.dest_key, self.vals['arg2'] / self.vals['arg3'])
 
     def __check_stack_two_operands(self, m) -> None:
         """Nacteni operandu zasobnikovych instrukci pro instrukce se dvema operandy"""
         if len(m.data_stack) < 2:
-            sys.exit(56)
-        self.args['arg3'] = m.data_stack.pop(0)
-        self.args['arg2'] = m.data_stack.pop(0)
+            raise MissingValueError()
+        self.vals['arg3'] = m.data_stack.pop()
+        self.vals['arg2'] = m.data_stack.pop()
+
+    # Slovnik metod pro provedeni instrukce podle opcode, sestaveny jednou pro celou tridu
+    invoke_method = {
+        'MOVE': __move,
+        'CREATEFRAME': __createframe,
+        'PUSHFRAME': __pushframe,
+        'POPFRAME': __popframe,
+        'DEFVAR': __defvar,
+        'CALL': __call,
+        'RETURN': __return,
+        'PUSHS': __pushs,
+        'POPS': __pops,
+        'ADD': __add,
+        'SUB': __sub,
+        'MUL': __mul,
+        'IDIV': __idiv,
+        'LT': __lt,
+        'GT': __gt,
+        'EQ': __eq,
+        'AND': __and,
+        'OR': __or,
+        'NOT': __not,
+        'INT2CHAR': __int2char,
+        'STRI2INT': __stri2int,
+        'READ': __read,
+        'WRITE': __write,
+        'CONCAT': __concat,
+        'STRLEN': __strlen,
+        'GETCHAR': __getchar,
+        'SETCHAR': __setchar,
+        'TYPE': __type,
+        'LABEL': __label,
+        'JUMP': __jump,
+        'JUMPIFEQ': __jumpifeq,
+        'JUMPIFNEQ': __jumpifneq,
+        'EXIT': __exit,
+        'DPRINT': __dprint,
+        'BREAK': __break,
+        'CLEARS': __clears,
+        'ADDS': __adds,
+        'SUBS': __subs,
+        'MULS': __muls,
+        'IDIVS': __idivs,
+        'LTS': __lts,
+        'GTS': __gts,
+        'EQS': __eqs,
+        'ANDS': __ands,
+        'ORS': __ors,
+        'NOTS': __nots,
+        'INT2CHARS': __int2chars,
+        'STRI2INTS': __stri2ints,
+        'JUMPIFEQS': __jumpifeqs,
+        'JUMPIFNEQS': __jumpifneqs,
+        'INT2FLOAT': __int2float,
+        'FLOAT2INT': __float2int,
+        'DIV': __div,
+    }
+
+    # Slovnik specializovanych variant instrukci podle opcode a typu obou operandu
+    specialize_method = {
+        ('ADD', int): __add_int,
+        ('ADD', float): __add_float,
+        ('LT', int): __lt_int,
+        ('LT', str): __lt_str,
+        ('CONCAT', str): __concat_str,
+        ('JUMPIFEQ', int): __jumpifeq_same,
+        ('JUMPIFEQ', bool): __jumpifeq_same,
+        ('JUMPIFEQ', str): __jumpifeq_same,
+        ('JUMPIFNEQ', int): __jumpifneq_same,
+        ('JUMPIFNEQ', bool): __jumpifneq_same,
+        ('JUMPIFNEQ', str): __jumpifneq_same,
+    }
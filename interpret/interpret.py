@@ -6,75 +6,89 @@ Soubor: interpret.py
 """
 
 import sys
-from instruction import Instruction
-from frame import Frame
-from xmlparser import XMLParser
 from argumentparser import ArgumentParser
 from statistics import Statistics
+from output import Output
+from timings import Timings
+from program import load_program
+from errors import IPPError
+from server import Server
 
 
 class Main:
-    """Trida pro hlavni beh programu"""
+    """Trida pro hlavni beh programu z prikazove radky
+    Program se nacte funkci load_program a provede objektem Runtime (viz modul program)"""
     def __init__(self):
+        self.timings = Timings()  # doba trvani fazi behu interpretu
 
         # Zpracovani argumentu a nacteni obsahu vstupnich souboru
-        self.parser = ArgumentParser()
-        self.parser.set_parser()
-        self.parser.parse()
-        source = self.parser.read_source()
-        self.input_in = self.parser.read_input()
+        with self.timings.phase("startup"):
+            self.parser = ArgumentParser()
+            self.parser.set_parser()
+            self.parser.parse()
+            if self.parser.serve is None:
+                source = self.parser.open_source()
+                input_in = self.parser.read_input()
+        if self.parser.timings == "memory":
+            self.timings.trace_memory()
+
+        # Rezim opakovaneho provadeni programu (--serve)
+        self.server = None
+        if self.parser.serve is not None:
+            self.server = Server(self.parser.serve, self.parser.engine, self.parser.optimize, self.parser.cache_dir,
+                                 self.parser.inline_threshold)
+            return
 
         # Zpracovani vstupniho XML
-        self.xml_parser = XMLParser()
-        self.xml_parser.parse_xml(source)
-        self.instructions = self.__get_instruction_objects()
-
-        # Nastaveni statistik
-        self.stats = Statistics(self.parser.stats_file, self.parser.stats)
-        self.insts = 0
-        self.hot = 0
-        self.hot_order = 0
-        self.vars = 0
-
-        self.exit_code = 0  # navratova hodnota po skonceni interpetace programu
-
-        # Inicializace ramcu, zasobniku a ukazatele na instrukci
-        self.global_frame = Frame()
-        self.temporary_frame = None
-        self.frame_stack = [None]
-        self.call_stack = [None]
-        self.data_stack = []
-        self.ins_pointer = -1
-
-    def __get_instruction_objects(self) -> list:
-        """Metoda pro vytvoreni objektu tridy Instruction z elementu ziskanych z XML"""
-        instructions = []
-        for instruction in self.xml_parser.get_instructions():
-            instructions.append(Instruction(instruction))
-        return instructions
-
-    def count_available_vars(self) -> None:
-        """Metoda pro spocitani vsech aktualne dostupnych promennych"""
-        count = len(self.global_frame.frame)
-        if self.frame_stack[0] is not None:
-            count += len(self.frame_stack[0].frame)
-        if self.temporary_frame is not None:
-            count += len(self.temporary_frame.frame)
-        if self.vars < count:
-            self.vars = count
+        self.program = load_program(source, self.parser.optimize, self.parser.cache_dir, self.timings,
+                                    self.parser.inline_threshold)
+
+        # Nastaveni statistik a vystupu
+        self.stats = Statistics(self.parser.stats_file, self.parser.stats, self.parser.profile, self.parser.sample,
+                                self.parser.sample_every, self.parser.sample_timer, self.parser.stats_format)
+        self.runtime = self.program.runtime(input_in, Output(self.parser.output), self.stats, self.parser.engine,
+                                            self.timings)
+
+    def run(self) -> None:
+        """Metoda pro provedeni programu"""
+        self.runtime.run()
+
+    def finish(self) -> None:
+        """Metoda pro vypsani vystupu, profilu a casu fazi (i pri ukonceni interpretace chybou)"""
+        self.runtime.output.flush()
+        if self.stats.profiler is not None:
+            self.stats.profiler.report(self.runtime)
+        if self.stats.sampler is not None:
+            self.stats.sampler.report()
+        if self.parser.timings is not None:
+            self.timings.report()
 
 
 if __name__ == "__main__":
 
-    main = Main()
-
-    while True:  # iterace pres pole instrukci
-        main.ins_pointer += 1  # posun na dalsi instrukci
-        if main.ins_pointer >= len(main.instructions):
-            break
-        main.instructions[main.ins_pointer].execute(main)  # provedeni instrukce
+    try:
+        main = Main()
+    except IPPError as error:
+        sys.exit(error.code)
+
+    if main.server is not None:
+        main.server.serve()
+        sys.exit(0)
+
+    code = None  # navratovy kod pri ukonceni interpretace chybou
+    try:
+        main.run()
+    except IPPError as error:
+        code = error.code
+    finally:
+        try:
+            main.finish()
+        except IPPError as error:  # chyba zapisu vystupu, profilu nebo vzorku, predchozi chyba ma prednost
+            code = error.code if code is None else code
+    if code is not None:
+        sys.exit(code)
 
     if main.stats.stats_file is not None:  # vypis statistik
-        main.stats.print_stats(main)
+        main.stats.print_stats(main.runtime)
 
-    sys.exit(main.exit_code)
+    sys.exit(main.runtime.exit_code)
@@ -7,6 +7,13 @@ Soubor: nil_type.py
 
 
 class Nil:
-    """Trida pro reprezentaci typu nil@nil"""
-    def __init__(self):
-        self.val = 'Nil'
+    """Trida pro reprezentaci typu nil@nil
+    Trida ma jedinou instanci, Nil() vzdy vraci stejny objekt"""
+    __slots__ = ('val',)
+    instance = None
+
+    def __new__(cls):
+        if cls.instance is None:
+            cls.instance = super().__new__(cls)
+            cls.instance.val = 'Nil'
+        return cls.instance
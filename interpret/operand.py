@@ -0,0 +1,90 @@
+"""
+FIT VUT IPP 2023
+Projekt 2 - Interpret XML reprezentace jazyka IPPcode23
+Autor: Jaroslav Streit (xstrei06)
+Soubor: operand.py
+"""
+
+import re
+from nil_type import Nil
+from errors import XMLStructureError
+
+# Regularni vyrazy pro lexikalni kontrolu operandu (prekladaji se pouze jednou)
+VAR_RE = re.compile(r'^(LF|GF|TF)@[a-zA-Z_$&%*!?-][a-zA-Z_$&%*!?0-9-]*$')
+LABEL_RE = re.compile(r'^[a-zA-Z_$&%*!?-][a-zA-Z_$&%*!?0-9-]*$')
+TYPE_RE = re.compile(r'^(int|float|string|bool|nil)$')
+
+
+class Operand:
+    """Trida pro reprezentaci predzpracovaneho operandu instrukce
+    Operand se vytvori jednou pri nacitani programu a behem interpretace se jiz nemeni"""
+    __slots__ = ('type', 'val', 'frame', 'var', 'slot')
+
+    def __init__(self, type, val=None, frame=None, var=None, slot=None):
+        self.type = type  # typ operandu (var, int, float, bool, string, label, type, nil)
+        self.val = val  # hodnota literalu, jmeno navesti nebo typu
+        self.frame = frame  # oznaceni ramce promenne (GF, LF, TF)
+        self.var = var  # jmeno promenne bez oznaceni ramce
+        self.slot = slot  # index promenne v globalnim ramci (pouze GF)
+
+    def __repr__(self) -> str:
+        if self.type == 'var':
+            return f"{self.frame}@{self.var}"
+        return f"{self.type}@{self.val}"
+
+    @property
+    def key(self):
+        """Klic promenne v jejim ramci (slot pro GF, jinak jmeno promenne)"""
+        return self.slot if self.frame == 'GF' else self.var
+
+    @staticmethod
+    def variable(frame, var, slots) -> 'Operand':
+        """Metoda pro vytvoreni operandu promenne"""
+        if frame == 'GF':
+            return Operand('var', frame=frame, var=var, slot=slots.setdefault(var, len(slots)))
+        return Operand('var', frame=frame, var=var)
+
+    @staticmethod
+    def from_xml(arg, slots) -> 'Operand':
+        """Metoda pro lexikalni kontrolu a prevod XML argumentu na operand
+        Promennym globalniho ramce se prideli slot ze slovniku slots"""
+        arg_type = arg.attrib["type"]
+        text = arg.text if arg.text is not None else ""
+        if arg_type == "var":
+            if VAR_RE.match(text) is None:
+                raise XMLStructureError()
+            return Operand.variable(text[:2], text[3:], slots)
+        elif arg_type == "int":
+            try:
+                return Operand('int', int(text, 0))
+            except ValueError:
+                raise XMLStructureError()
+        elif arg_type == "float":
+            try:
+                return Operand('float', float(text))
+            except ValueError:
+                try:
+                    return Operand('float', float.fromhex(text))
+                except ValueError:
+                    raise XMLStructureError()
+        elif arg_type == "bool":
+            if text == "true":
+                return Operand('bool', True)
+            elif text == "false":
+                return Operand('bool', False)
+            raise XMLStructureError()
+        elif arg_type == "string":
+            return Operand('string', text)
+        elif arg_type == "label":
+            if LABEL_RE.match(text) is None:
+                raise XMLStructureError()
+            return Operand('label', text)
+        elif arg_type == "type":
+            if TYPE_RE.match(text) is None:
+                raise XMLStructureError()
+            return Operand('type', text)
+        elif arg_type == "nil":
+            if text != "nil":
+                raise XMLStructureError()
+            return Operand('nil', Nil())
+        raise XMLStructureError()
@@ -0,0 +1,142 @@
+"""
+FIT VUT IPP 2023
+Projekt 2 - Interpret XML reprezentace jazyka IPPcode23
+Autor: Jaroslav Streit (xstrei06)
+Soubor: optimizer.py
+"""
+
+from instruction import Instruction
+from operand import Operand
+from inliner import Inliner
+from compiler import OPERATIONS
+from errors import IPPError
+
+# Instrukce, ktere skaci na navesti v prvnim argumentu
+JUMP_OPCODES = {'JUMP', 'JUMPIFEQ', 'JUMPIFNEQ', 'CALL', 'JUMPIFEQS', 'JUMPIFNEQS'}
+
+# Instrukce, za kterymi program nikdy nepokracuje na nasledujici instrukci
+UNCONDITIONAL = {'JUMP', 'EXIT', 'RETURN'}
+
+# Typy operandu podle typu hodnoty v jazyce Python
+OPERAND_TYPES = {int: 'int', float: 'float', str: 'string', bool: 'bool'}
+
+
+class Optimizer:
+    """Trida pro optimalizaci dekodovaneho programu pred jeho provedenim (--optimize=N)
+    Uroven 1: skladani konstant a zkraceni retezcu skoku
+    Uroven 2: navic odstraneni nedosazitelneho kodu a nepouzitych navesti
+    Nezavisle na urovni vlozeni kratkych funkci do mist volani (inline_threshold, viz Inliner)
+    Statistiky (--insts, --hot, --frequent) se pocitaji pro optimalizovany program,
+    poradi instrukci (--hot) odpovida puvodnimu XML"""
+    def __init__(self, instructions, level, slots=None, inline_threshold=0):
+        self.instructions = instructions
+        self.level = level
+        self.slots = slots  # sloty promennych globalniho ramce (vkladani funkci pridava promenne)
+        self.inline_threshold = inline_threshold
+        self.labels = self.__label_table()
+
+    def optimize(self) -> tuple:
+        """Metoda pro provedeni optimalizaci, vraci novy seznam instrukci a tabulku navesti"""
+        if self.inline_threshold:
+            self.__inline_calls()
+        if self.level >= 1:
+            self.__fold_constants()
+            self.__collapse_jumps()
+        if self.level >= 2:
+            self.__remove_unreachable()
+            self.__remove_unused_labels()
+        return self.instructions, self.labels
+
+    def __label_table(self) -> dict:
+        return {ins.args['arg1'].val: i for i, ins in enumerate(self.instructions) if ins.opcode == 'LABEL'}
+
+    def __relink(self) -> None:
+        """Metoda pro preindexovani instrukci a opetovne prelozeni navesti po zmene programu"""
+        self.labels = self.__label_table()
+        self.instructions = [self.rebuild(ins, ins.args, i) for i, ins in enumerate(self.instructions)]
+
+    def rebuild(self, ins, args, order=None, opcode=None) -> Instruction:
+        """Metoda pro vytvoreni upravene instrukce se zachovanim puvodniho poradi z XML"""
+        return Instruction(opcode or ins.opcode, args, ins.order if order is None else order,
+                           ins.order_orig, self.labels)
+
+    def __referenced(self) -> set:
+        """Metoda vracejici mnozinu navesti, na ktera nektera instrukce skace"""
+        return {ins.args['arg1'].val for ins in self.instructions if ins.opcode in JUMP_OPCODES}
+
+    def __inline_calls(self) -> None:
+        """Vlozeni tela kratkych funkci do mist volani"""
+        instructions = Inliner(self.instructions, self.slots, self.inline_threshold).inline()
+        if instructions is not self.instructions:
+            self.instructions = instructions
+            self.__relink()
+
+    def __fold_constants(self) -> None:
+        """Instrukce, jejichz vsechny zdrojove operandy jsou literaly, se nahradi instrukci MOVE
+        s vypocitanou hodnotou. Pokud by vypocet skoncil chybou, instrukce se ponecha."""
+        for i, ins in enumerate(self.instructions):
+            if ins.opcode not in OPERATIONS:
+                continue
+            sources = [ins.args[tag] for tag in ('arg2', 'arg3') if tag in ins.args]
+            if any(arg.type == 'var' for arg in sources):
+                continue
+            try:
+                value = OPERATIONS[ins.opcode](*[arg.val for arg in sources])
+            except (IPPError, ArithmeticError, ValueError):  # chybu ohlasi az provedeni instrukce
+                continue
+            if type(value) not in OPERAND_TYPES:
+                continue
+            args = {'arg1': ins.args['arg1'], 'arg2': Operand(OPERAND_TYPES[type(value)], value)}
+            self.instructions[i] = self.rebuild(ins, args, opcode='MOVE')
+
+    def __final_label(self, label) -> str:
+        """Metoda pro nalezeni konecneho navesti retezce skoku (navesti, za kterym nasleduje JUMP)"""
+        visited = {label}
+        while label in self.labels:
+            i = self.labels[label]
+            while i < len(self.instructions) and self.instructions[i].opcode == 'LABEL':
+                i += 1
+            if i >= len(self.instructions) or self.instructions[i].opcode != 'JUMP':
+                break
+            following = self.instructions[i].args['arg1'].val
+            if following in visited or following not in self.labels:
+                break
+            visited.add(following)
+            label = following
+        return label
+
+    def __collapse_jumps(self) -> None:
+        """Skoky na navesti, za kterym nasleduje nepodmineny skok, se presmeruji primo na jeho cil"""
+        for i, ins in enumerate(self.instructions):
+            if ins.opcode not in JUMP_OPCODES or ins.args['arg1'].val not in self.labels:
+                continue
+            label = self.__final_label(ins.args['arg1'].val)
+            if label != ins.args['arg1'].val:
+                args = dict(ins.args)
+                args['arg1'] = Operand('label', label)
+                self.instructions[i] = self.rebuild(ins, args)
+
+    def __remove_unreachable(self) -> None:
+        """Odstraneni instrukci za JUMP, EXIT a RETURN az po nasledujici pouzite navesti"""
+        referenced = self.__referenced()
+        result = []
+        reachable = True
+        for ins in self.instructions:
+            if ins.opcode == 'LABEL' and ins.args['arg1'].val in referenced:
+                reachable = True
+            if reachable:
+                result.append(ins)
+            if ins.opcode in UNCONDITIONAL:
+                reachable = False
+        if len(result) != len(self.instructions):
+            self.instructions = result
+            self.__relink()
+
+    def __remove_unused_labels(self) -> None:
+        """Odstraneni navesti, na ktera zadna instrukce neskace"""
+        referenced = self.__referenced()
+        result = [ins for ins in self.instructions
+                  if ins.opcode != 'LABEL' or ins.args['arg1'].val in referenced]
+        if len(result) != len(self.instructions):
+            self.instructions = result
+            self.__relink()
@@ -0,0 +1,45 @@
+"""
+FIT VUT IPP 2023
+Projekt 2 - Interpret XML reprezentace jazyka IPPcode23
+Autor: Jaroslav Streit (xstrei06)
+Soubor: output.py
+"""
+
+import sys
+from errors import OutputFileError
+
+THRESHOLD = 1 << 16  # pocet znaku, po jehoz dosazeni se vyrovnavaci pamet vypise
+
+
+class Output:
+    """Trida pro vypis instrukce WRITE pres vyrovnavaci pamet
+    Vystup se vypisuje po dosazeni velikosti THRESHOLD, pri EXIT, na konci interpretace
+    (i chybovem) a pred vypisem DPRINT a BREAK na standardni chybovy vystup"""
+    def __init__(self, filename=None, threshold=THRESHOLD, stream=None):
+        if stream is not None:
+            self.stream = stream
+        elif filename is None:
+            self.stream = sys.stdout
+        else:
+            try:
+                self.stream = open(filename, "w")
+            except OSError:
+                raise OutputFileError()
+        self.threshold = threshold
+        self.buffer = []
+        self.size = 0
+
+    def write(self, text) -> None:
+        """Metoda pro zapis retezce do vyrovnavaci pameti"""
+        self.buffer.append(text)
+        self.size += len(text)
+        if self.size >= self.threshold:
+            self.flush()
+
+    def flush(self) -> None:
+        """Metoda pro vypis obsahu vyrovnavaci pameti"""
+        if self.buffer:
+            self.stream.write("".join(self.buffer))
+            self.buffer.clear()
+            self.size = 0
+        self.stream.flush()
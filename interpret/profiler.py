@@ -0,0 +1,107 @@
+"""
+FIT VUT IPP 2023
+Projekt 2 - Interpret XML reprezentace jazyka IPPcode23
+Autor: Jaroslav Streit (xstrei06)
+Soubor: profiler.py
+"""
+
+import json
+import time
+from errors import OutputFileError
+
+MAIN = "<main>"  # jmeno pro kod mimo funkce (volane instrukci CALL)
+
+
+class Profiler:
+    """Trida pro profilovani interpretovaneho programu (--profile=file)
+    Pro kazdou instrukci se meri pocet provedeni a celkovy cas, pro kazde navesti volane
+    instrukci CALL pocet volani, inkluzivni cas (vcetne vnorenych volani) a exkluzivni cas.
+    Do souboru file se zapise textovy prehled, do file.json stejna data ve formatu JSON."""
+    def __init__(self, file):
+        self.file = file
+        self.times = []  # celkovy cas provadeni podle indexu instrukce
+        self.functions = {}  # navesti: [pocet volani, inkluzivni cas, exkluzivni cas]
+        self.stack = []  # zasobnik aktivnich volani [navesti, cas zacatku, cas vnorenych volani]
+        self.active = {}  # pocet aktivnich volani navesti (pro rekurzi)
+
+    def run(self, m) -> None:
+        """Metoda pro provedeni programu po jednotlivych instrukcich s merenim casu"""
+        instructions = m.instructions
+        end = len(instructions)
+        counts = m.stats.start(instructions)
+        if counts is None:
+            counts = m.stats.counts = [0] * end
+        times = self.times = [0.0] * end
+        clock = time.perf_counter
+        self.__enter(MAIN, clock())
+        try:
+            while True:
+                m.ins_pointer += 1
+                ip = m.ins_pointer
+                if ip >= end:
+                    break
+                ins = instructions[ip]
+                counts[ip] += 1
+                start = clock()
+                ins.perform(m)
+                now = clock()
+                times[ip] += now - start
+                if ins.opcode == 'CALL':
+                    self.__enter(ins.args['arg1'].val, now)
+                elif ins.opcode == 'RETURN':
+                    self.__leave(now)
+        finally:  # volani aktivni pri EXIT, konci programu nebo chybe
+            now = clock()
+            while self.stack:
+                self.__leave(now)
+        m.stats.update(m)
+
+    def __enter(self, label, now) -> None:
+        self.stack.append([label, now, 0.0])
+        self.active[label] = self.active.get(label, 0) + 1
+
+    def __leave(self, now) -> None:
+        label, start, nested = self.stack.pop()
+        self.active[label] -= 1
+        elapsed = now - start
+        record = self.functions.setdefault(label, [0, 0.0, 0.0])
+        record[0] += 1
+        if self.active[label] == 0:  # u rekurze se inkluzivni cas pocita pouze pro vnejsi volani
+            record[1] += elapsed
+        record[2] += elapsed - nested
+        if self.stack:
+            self.stack[-1][2] += elapsed
+
+    def __instruction_rows(self, m) -> list:
+        rows = [{'order': ins.order_orig, 'opcode': ins.opcode, 'count': count, 'time': spent}
+                for ins, count, spent in zip(m.instructions, m.stats.counts, self.times) if count > 0]
+        return sorted(rows, key=lambda row: (-row['time'], row['order']))
+
+    def __function_rows(self) -> list:
+        rows = [{'label': label, 'calls': calls if label != MAIN else 0, 'inclusive': inclusive,
+                 'exclusive': exclusive} for label, (calls, inclusive, exclusive) in self.functions.items()]
+        return sorted(rows, key=lambda row: (-row['inclusive'], row['label']))
+
+    def report(self, m) -> None:
+        """Metoda pro zapis textoveho prehledu a souboru JSON"""
+        if m.stats.counts is None:  # program nebyl spusten
+            return
+        instructions = self.__instruction_rows(m)
+        functions = self.__function_rows()
+        try:
+            with open(self.file, "w") as file:
+                print("Instructions (by total time):", file=file)
+                print(f"{'order':>8} {'opcode':<12} {'count':>10} {'total[ms]':>12} {'avg[us]':>10}", file=file)
+                for row in instructions:
+                    print(f"{row['order']:>8} {row['opcode']:<12} {row['count']:>10} "
+                          f"{row['time'] * 1e3:>12.3f} {row['time'] * 1e6 / row['count']:>10.3f}", file=file)
+                print(file=file)
+                print("Functions (by inclusive time):", file=file)
+                print(f"{'label':<24} {'calls':>10} {'incl[ms]':>12} {'excl[ms]':>12}", file=file)
+                for row in functions:
+                    print(f"{row['label']:<24} {row['calls']:>10} {row['inclusive'] * 1e3:>12.3f} "
+                          f"{row['exclusive'] * 1e3:>12.3f}", file=file)
+            with open(self.file + ".json", "w") as file:
+                json.dump({'instructions': instructions, 'functions': functions}, file, indent=1)
+        except OSError:
+            raise OutputFileError()
@@ -0,0 +1,113 @@
+"""
+FIT VUT IPP 2023
+Projekt 2 - Interpret XML reprezentace jazyka IPPcode23
+Autor: Jaroslav Streit (xstrei06)
+Soubor: program.py
+"""
+
+import io
+from instruction import Instruction
+from string_buffer import StringBuffer
+from type_inference import TypeInference
+from xmlparser import XMLParser
+from optimizer import Optimizer
+from cache import ProgramCache
+from statistics import Statistics
+from output import Output
+from input_reader import InputReader
+from runtime import Runtime
+from timings import Timings
+
+
+class Result:
+    """Trida pro vysledek jednoho behu programu"""
+    __slots__ = ('exit_code', 'stats', 'output')
+
+    def __init__(self, exit_code, stats=None, output=None):
+        self.exit_code = exit_code  # navratova hodnota programu (instrukce EXIT, jinak 0)
+        self.stats = stats  # slovnik statistik, pokud byly pozadovany
+        self.output = output  # vystup programu, pokud nebyl zadan vlastni vystupni proud
+
+    def __repr__(self) -> str:
+        return f"Result(exit_code={self.exit_code}, stats={self.stats}, output={self.output!r})"
+
+
+class Program:
+    """Trida pro zkontrolovany a dekodovany program, ktery lze opakovane spoustet
+    Chyby se hlasi vyjimkami odvozenymi od IPPError (modul errors), atribut code obsahuje
+    navratovy kod podle zadani. Jeden objekt nelze spoustet soucasne z vice vlaken."""
+    def __init__(self, instructions, labels, global_slots, buffered=frozenset()):
+        self.instructions = instructions  # seznam objektu Instruction
+        self.labels = labels  # tabulka navesti (jmeno: index instrukce)
+        self.global_slots = global_slots  # sloty promennych globalniho ramce podle jmena
+        self.buffered = buffered  # jmena promennych, ktere mohou obsahovat StringBuffer
+        self.inference = None  # odvozene typy promennych GF (TypeInference), vytvori se az pri prekladu
+
+    @staticmethod
+    def from_parser(xml_parser, optimize=0, inline_threshold=0) -> 'Program':
+        """Metoda pro vytvoreni objektu tridy Instruction z dekodovanych instrukci ziskanych z XML"""
+        labels = xml_parser.labels
+        slots = xml_parser.global_slots
+        instructions = []
+        for i, (order, opcode, args) in enumerate(xml_parser.get_instructions()):
+            instructions.append(Instruction(opcode, args, i, order, labels))
+        if optimize or inline_threshold:
+            optimizer = Optimizer(instructions, optimize, dict(slots), inline_threshold)
+            instructions, labels = optimizer.optimize()
+            slots = optimizer.slots
+        buffered = StringBuffer.names(instructions)
+        if buffered:
+            for ins in instructions:
+                ins.bind_buffers(buffered)
+        return Program(instructions, labels, slots, buffered)
+
+    def types(self) -> TypeInference:
+        """Metoda vracejici odvozene typy promennych globalniho ramce (analyza se provede jednou)"""
+        if self.inference is None:
+            self.inference = TypeInference(self.instructions, len(self.global_slots)).infer()
+        return self.inference
+
+    def runtime(self, input_in, output, stats, engine="interpreted", timings=None) -> Runtime:
+        """Metoda pro pripravu jednoho behu programu s danym vstupem, vystupem a statistikami"""
+        return Runtime(self, input_in, output, stats, engine, timings)
+
+    def run(self, input=None, output=None, engine="interpreted", stats=False) -> Result:
+        """Metoda pro provedeni programu
+        input je text vstupu nebo textovy proud (None - prazdny vstup), output je textovy proud
+        (None - vystup se vrati v Result.output), pri stats=True obsahuje Result.stats statistiky"""
+        if input is None or isinstance(input, str):
+            input = io.StringIO(input or "")
+        stream = io.StringIO() if output is None else output
+        runtime = self.runtime(InputReader(stream=input), Output(stream=stream), Statistics(None, [], collect=stats),
+                               engine)
+        try:
+            runtime.run()
+        finally:
+            runtime.output.flush()
+        return Result(runtime.exit_code, runtime.stats.metrics(runtime) if stats else None,
+                      stream.getvalue() if output is None else None)
+
+
+def load_program(xml, optimize=0, cache_dir=None, timings=None, inline_threshold=0) -> Program:
+    """Funkce pro nacteni, kontrolu a dekodovani programu
+    xml je text XML (str nebo bytes) nebo binarni proud, optimize je uroven optimalizace (0-2),
+    inline_threshold nejvetsi delka vkladanych funkci (0 - bez vkladani), cache_dir adresar cache
+    dekodovanych programu. Pri chybe vyvola XMLFormatError, XMLStructureError
+    nebo SemanticError."""
+    if isinstance(xml, str):
+        xml = xml.encode()
+    if isinstance(xml, bytes):
+        xml = io.BytesIO(xml)
+    timings = timings if timings is not None else Timings()
+    with timings.phase("parse"):
+        xml_parser = XMLParser()
+        if cache_dir is None:
+            xml_parser.parse_xml(xml)
+        else:
+            cache = ProgramCache(cache_dir)
+            xml = cache.key(xml)
+            if not cache.load(xml_parser):
+                xml_parser.parse_xml(xml)
+                cache.store(xml_parser)
+    with timings.phase("decode"):
+        return Program.from_parser(xml_parser, optimize, inline_threshold)
@@ -0,0 +1,122 @@
+"""
+FIT VUT IPP 2023
+Projekt 2 - Interpret XML reprezentace jazyka IPPcode23
+Autor: Jaroslav Streit (xstrei06)
+Soubor: runtime.py
+"""
+
+from frame import SlotFrame
+from compiler import Compiler
+from codegen import BlockCompiler
+from tracer import Tracer
+from timings import Timings
+
+
+class Runtime:
+    """Trida pro stav jednoho behu programu (ramce, zasobniky, vstup, vystup a statistiky)
+    a jeho provedeni zvolenym zpusobem. Pro kazde spusteni programu se vytvori novy objekt."""
+    def __init__(self, program, input_in, output, stats, engine="interpreted", timings=None):
+        self.program = program
+        self.instructions = program.instructions
+        self.labels = program.labels  # tabulka navesti (jmeno: index instrukce)
+        self.buffered = program.buffered  # jmena promennych, ktere mohou obsahovat StringBuffer
+        self.engine = engine  # zpusob provadeni (interpreted, compiled, blocks, tracing)
+        self.input_in = input_in  # vstup instrukce READ (InputReader)
+        self.output = output  # vystup instrukce WRITE (Output)
+        self.timings = timings if timings is not None else Timings()
+
+        # Nastaveni statistik
+        self.stats = stats
+        self.insts = 0
+        self.hot = 0
+        self.hot_order = 0
+        self.vars = 0
+
+        self.exit_code = 0  # navratova hodnota po skonceni interpetace programu
+
+        # Inicializace ramcu, zasobniku (vrchol na konci seznamu) a ukazatele na instrukci
+        self.global_frame = SlotFrame(list(program.global_slots))
+        self.temporary_frame = None
+        self.frame_stack = [None]
+        self.call_stack = [None]
+        self.data_stack = []
+        self.ins_pointer = -1
+
+    def run(self) -> None:
+        """Metoda pro provedeni programu zvolenym zpusobem s merenim casu provadeni"""
+        with self.timings.phase("execute"):
+            self.__run()
+
+    def __run(self) -> None:
+        if self.stats.profiler is not None:
+            self.stats.profiler.run(self)
+            return
+        sampler = self.stats.sampler
+        if sampler is not None and sampler.timer is None:
+            sampler.run(self)
+            return
+        if sampler is not None:
+            sampler.start(self)
+        try:
+            self.__execute()
+        finally:
+            if sampler is not None:
+                sampler.stop()
+
+    def __execute(self) -> None:
+        """Metoda pro provedeni programu zvolenym zpusobem provadeni (--engine)"""
+        if self.stats.detailed:
+            self.__execute_tracked()
+            return
+        if self.engine == "compiled":
+            Compiler(self).run()
+            return
+        if self.engine == "blocks":
+            BlockCompiler(self).run()
+            return
+        if self.engine == "tracing":
+            Tracer(self).run()
+            return
+        instructions = self.instructions
+        end = len(instructions)
+        counts = self.stats.start(instructions)
+        if counts is None:
+            while True:  # iterace pres pole instrukci
+                self.ins_pointer += 1  # posun na dalsi instrukci
+                if self.ins_pointer >= end:
+                    break
+                instructions[self.ins_pointer].perform(self)  # provedeni instrukce
+            return
+        # Pocitani provedenych instrukci pro statistiky a instrukci BREAK
+        while True:
+            self.ins_pointer += 1
+            if self.ins_pointer >= end:
+                break
+            counts[self.ins_pointer] += 1
+            instructions[self.ins_pointer].perform(self)
+        self.stats.update(self)
+
+    def __execute_tracked(self) -> None:
+        """Metoda pro provedeni programu po instrukcich se sledovanim zasobniku a retezcu"""
+        instructions = self.instructions
+        end = len(instructions)
+        counts = self.stats.start(instructions)
+        while True:
+            self.ins_pointer += 1
+            if self.ins_pointer >= end:
+                break
+            counts[self.ins_pointer] += 1
+            instruction = instructions[self.ins_pointer]
+            instruction.perform(self)
+            self.stats.track(self, instruction)
+        self.stats.update(self)
+
+    def count_available_vars(self) -> None:
+        """Metoda pro spocitani vsech aktualne dostupnych promennych"""
+        count = len(self.global_frame)
+        if self.frame_stack[-1] is not None:
+            count += len(self.frame_stack[-1])
+        if self.temporary_frame is not None:
+            count += len(self.temporary_frame)
+        if self.vars < count:
+            self.vars = count
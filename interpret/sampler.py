@@ -0,0 +1,92 @@
+"""
+FIT VUT IPP 2023
+Projekt 2 - Interpret XML reprezentace jazyka IPPcode23
+Autor: Jaroslav Streit (xstrei06)
+Soubor: sampler.py
+"""
+
+import signal
+from errors import OutputFileError
+
+MAIN = "<main>"  # jmeno pro kod mimo funkce (volane instrukci CALL)
+
+
+class Sampler:
+    """Trida pro vzorkovani zasobniku volani programu (--sample=file)
+    Vzorek se odebere kazdych every provedenych instrukci, nebo pri zadani timer
+    kazdych timer milisekund signalem casovace. Vzorek je retezec navesti volanych funkci
+    (ze zasobniku volani) doplneny o navesti, ve kterem lezi provadena instrukce.
+    Vystup je ve formatu 'ramec;ramec;... pocet' pro nastroje na tvorbu flame grafu."""
+    def __init__(self, file, every=1000, timer=None):
+        self.file = file
+        self.every = every
+        self.timer = timer
+        self.samples = {}  # pocet vzorku podle zasobniku (n-tice jmen ramcu)
+        self.enclosing = []  # navesti, ve kterem lezi instrukce, podle jejiho indexu
+        self.leaf = True  # zda je znama provadena instrukce (ins_pointer)
+        self.handler = None
+
+    def prepare(self, m) -> None:
+        """Metoda pro prirazeni navesti jednotlivym instrukcim podle tabulky navesti"""
+        starts = {i: label for label, i in m.labels.items()}
+        label = None
+        self.enclosing = []
+        for i in range(len(m.instructions)):
+            label = starts.get(i, label)
+            self.enclosing.append(label)
+
+    def sample(self, m) -> None:
+        """Metoda pro odebrani jednoho vzorku zasobniku volani"""
+        frames = [MAIN]
+        for i in m.call_stack[1:]:
+            frames.append(m.instructions[i].args['arg1'].val)
+        if self.leaf and 0 <= m.ins_pointer < len(self.enclosing):
+            label = self.enclosing[m.ins_pointer]
+            if label is not None and label != frames[-1]:
+                frames.append(label)
+        key = tuple(frames)
+        self.samples[key] = self.samples.get(key, 0) + 1
+
+    def run(self, m) -> None:
+        """Metoda pro provedeni programu po jednotlivych instrukcich se vzorkovanim po every instrukcich"""
+        self.prepare(m)
+        instructions = m.instructions
+        end = len(instructions)
+        counts = m.stats.start(instructions)
+        every = self.every
+        countdown = every
+        while True:
+            m.ins_pointer += 1
+            if m.ins_pointer >= end:
+                break
+            if counts is not None:
+                counts[m.ins_pointer] += 1
+            countdown -= 1
+            if countdown == 0:
+                countdown = every
+                self.sample(m)
+            instructions[m.ins_pointer].perform(m)
+        m.stats.update(m)
+
+    def start(self, m) -> None:
+        """Metoda pro spusteni vzorkovani casovacem (pro libovolny zpusob provadeni programu)
+        Provadena instrukce je znama pouze pri interpretaci po instrukcich"""
+        self.prepare(m)
+        self.leaf = m.engine == "interpreted"
+        self.handler = signal.signal(signal.SIGPROF, lambda signum, frame: self.sample(m))
+        interval = self.timer / 1000
+        signal.setitimer(signal.ITIMER_PROF, interval, interval)
+
+    def stop(self) -> None:
+        """Metoda pro zastaveni casovace"""
+        signal.setitimer(signal.ITIMER_PROF, 0)
+        signal.signal(signal.SIGPROF, self.handler)
+
+    def report(self) -> None:
+        """Metoda pro zapis vzorku ve formatu folded stacks"""
+        try:
+            with open(self.file, "w") as file:
+                for frames, count in sorted(self.samples.items()):
+                    print(f"{';'.join(frames)} {count}", file=file)
+        except OSError:
+            raise OutputFileError()
@@ -0,0 +1,103 @@
+"""
+FIT VUT IPP 2023
+Projekt 2 - Interpret XML reprezentace jazyka IPPcode23
+Autor: Jaroslav Streit (xstrei06)
+Soubor: server.py
+"""
+
+import hashlib
+import io
+import json
+import os
+import socketserver
+import sys
+from program import load_program
+from errors import IPPError
+
+PROGRAMS = 64  # pocet naposledy pouzitych programu uchovavanych v pameti
+
+
+class Server:
+    """Trida pro opakovane provadeni programu v jednom procesu (--serve)
+    Pozadavky i odpovedi jsou objekty JSON, kazdy na jednom radku. Pozadavek obsahuje
+    "source" (XML program) a volitelne "input" (text vstupu), "engine", "optimize" a "stats".
+    Odpoved obsahuje "exit_code", "stdout", pri "stats": true "stats" a pri chybe "error".
+    Bez zadane cesty se cte standardni vstup, jinak se naslouchani na Unix socketu;
+    pozadavky se zpracovavaji postupne, dekodovane programy se uchovavaji podle hashe."""
+    def __init__(self, path, engine="interpreted", optimize=0, cache_dir=None, inline_threshold=0):
+        self.path = path  # cesta k Unix socketu, prazdny retezec pro standardni vstup
+        self.engine = engine
+        self.optimize = optimize
+        self.cache_dir = cache_dir
+        self.inline_threshold = inline_threshold  # vkladani funkci pro vsechny pozadavky (--inline-threshold)
+        self.programs = {}  # dekodovane programy podle hashe zdroje a urovne optimalizace
+
+    def serve(self) -> None:
+        """Metoda pro zpracovani pozadavku az do konce vstupu (nebo ukonceni serveru)"""
+        if not self.path:
+            self.serve_stream(sys.stdin, sys.stdout)
+            return
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                reader = io.TextIOWrapper(self.rfile, encoding="utf-8")
+                writer = io.TextIOWrapper(self.wfile, encoding="utf-8", write_through=True)
+                server.serve_stream(reader, writer)
+
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        with socketserver.UnixStreamServer(self.path, Handler) as unix_server:
+            try:
+                unix_server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+            finally:
+                os.unlink(self.path)
+
+    def serve_stream(self, reader, writer) -> None:
+        """Metoda pro zpracovani pozadavku z jednoho proudu"""
+        for line in reader:
+            if not line.strip():
+                continue
+            writer.write(json.dumps(self.handle(line)) + "\n")
+            writer.flush()
+
+    def handle(self, line) -> dict:
+        """Metoda pro zpracovani jednoho pozadavku"""
+        try:
+            request = json.loads(line)
+            source = request["source"]
+            engine = request.get("engine", self.engine)
+            optimize = request.get("optimize", self.optimize)
+            stats = request.get("stats", False)
+            text = request.get("input") or ""
+            if not isinstance(source, str) or not isinstance(text, str) or not isinstance(stats, bool) or \
+                    engine not in ("interpreted", "compiled", "blocks", "tracing") or \
+                    not isinstance(optimize, int) or isinstance(optimize, bool) or optimize not in (0, 1, 2):
+                raise ValueError
+        except (ValueError, KeyError, TypeError):
+            return {'exit_code': 99, 'stdout': "", 'error': "Invalid request."}
+        output = io.StringIO()
+        try:
+            program = self.__program(source, optimize)
+            result = program.run(text, output, engine, stats)
+        except IPPError as error:
+            return {'exit_code': error.code, 'stdout': output.getvalue(), 'error': str(error)}
+        except Exception as error:  # vnitrni chyba interpretu, server obsluhuje dalsi pozadavky
+            return {'exit_code': 99, 'stdout': output.getvalue(), 'error': f"{type(error).__name__}: {error}"}
+        response = {'exit_code': result.exit_code, 'stdout': output.getvalue()}
+        if stats:
+            response['stats'] = result.stats
+        return response
+
+    def __program(self, source, optimize):
+        """Metoda pro ziskani dekodovaneho programu, naposledy pouzite programy se nenacitaji znovu"""
+        key = (hashlib.sha256(source.encode()).hexdigest(), optimize)
+        program = self.programs.pop(key, None)
+        if program is None:
+            program = load_program(source, optimize, self.cache_dir, inline_threshold=self.inline_threshold)
+            if len(self.programs) >= PROGRAMS:
+                del self.programs[next(iter(self.programs))]
+        self.programs[key] = program  # presun na konec (naposledy pouzity)
+        return program
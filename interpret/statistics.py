@@ -5,13 +5,34 @@ Autor: Jaroslav Streit (xstrei06)
 Soubor: statistics.py
 """
 
+import json
+from instruction import DEST_OPCODES
+from string_buffer import StringBuffer
+from profiler import Profiler
+from sampler import Sampler
+
 
 class Statistics:
-    """Trida zpracovani a vypis statistik"""
-    def __init__(self, file, stats):
+    """Trida zpracovani a vypis statistik
+    Pokud statistiky nejsou pozadovany (a program neobsahuje BREAK), interpretace nic nepocita.
+    Jinak se pocita pouze provedeni jednotlivych instrukci a ostatni statistiky (--insts, --hot,
+    --frequent) se z techto poctu spocitaji az na konci metodou update"""
+    def __init__(self, file, stats, profile=None, sample=None, sample_every=1000, sample_timer=None,
+                 stats_format="text", collect=False):
         self.stats = []
         self.stats_file = file
         self.stats = stats
+        self.collect = collect  # sber statistik bez souboru (pro Program.run)
+        self.detailed = stats_format == "json"  # sledovani zasobniku a retezcu po kazde instrukci
+        self.max_data_stack = 0
+        self.max_call_stack = 0
+        self.max_frame_stack = 0
+        self.max_string = 0  # delka nejdelsiho retezce ulozeneho do promenne nebo na zasobnik
+        self.profiler = Profiler(profile) if profile is not None else None  # profilovani (--profile)
+        self.sampler = Sampler(sample, sample_every, sample_timer) if sample is not None else None  # --sample
+        # pocitani dostupnych promennych (--vars)
+        self.vars = self.detailed or collect or any(stat['arg'] == 'vars' for stat in stats)
+        self.counts = None  # pocty provedeni instrukci podle jejich indexu
         self.frequent = {  # slovnik pro pocet vyskytu instrukci podle opcode
             'MOVE': 0,
             'CREATEFRAME': 0,
@@ -68,8 +89,49 @@ class Statistics:
             'DIV': 0,
         }
 
+    def start(self, instructions):
+        """Metoda pro zapnuti pocitani provedenych instrukci, pokud jsou statistiky potreba
+        Vraci seznam poctu provedeni podle indexu instrukce nebo None"""
+        if self.stats_file is not None or self.collect or any(ins.opcode == 'BREAK' for ins in instructions):
+            self.counts = [0] * len(instructions)
+        return self.counts
+
+    def executed(self, instructions) -> int:
+        """Metoda pro zjisteni poctu dosud vykonanych instrukci (bez LABEL, DPRINT a BREAK)"""
+        return sum(count for ins, count in zip(instructions, self.counts)
+                   if ins.opcode not in ('LABEL', 'DPRINT', 'BREAK'))
+
+    def update(self, m) -> None:
+        """Metoda pro prevod poctu provedeni jednotlivych instrukci na statistiky"""
+        if self.counts is None:
+            return
+        m.insts = self.executed(m.instructions)
+        for ins, count in zip(m.instructions, self.counts):
+            self.frequent[ins.opcode] += count
+            if count > m.hot or (count == m.hot and count > 0 and ins.order_orig < m.hot_order):
+                m.hot = count
+                m.hot_order = ins.order_orig
+
+    def track(self, m, ins) -> None:
+        """Metoda pro sledovani hloubky zasobniku a delky retezcu po provedeni instrukce (--stats-format=json)"""
+        if len(m.data_stack) > self.max_data_stack:
+            self.max_data_stack = len(m.data_stack)
+        if len(m.call_stack) - 1 > self.max_call_stack:  # bez zarazky na dne zasobniku
+            self.max_call_stack = len(m.call_stack) - 1
+        if len(m.frame_stack) - 1 > self.max_frame_stack:
+            self.max_frame_stack = len(m.frame_stack) - 1
+        if ins.opcode in DEST_OPCODES:
+            value = ins.dest.get_var(ins.dest_key)
+        else:
+            value = m.data_stack[-1] if m.data_stack else None
+        if (type(value) is str or type(value) is StringBuffer) and len(value) > self.max_string:
+            self.max_string = len(value)
+
     def print_stats(self, m) -> None:
         """Metoda pro vypis nasbiranych statistik"""
+        if self.detailed:
+            self.print_json(m)
+            return
         file = open(self.stats_file, "w")
         for stat in self.stats:
             if stat['arg'] == 'insts':
@@ -95,3 +157,29 @@ class Statistics:
             elif stat['arg'] == 'eol':
                 print(file=file)
         file.close()
+
+    def metrics(self, m) -> dict:
+        """Metoda vracejici vsechny nasbirane statistiky ve tvaru slovniku"""
+        metrics = {
+            'insts': m.insts,
+            'hot': m.hot_order,
+            'vars': m.vars,
+            'frequent': dict(self.frequent),
+        }
+        if self.detailed:
+            metrics.update({
+                'max_data_stack': self.max_data_stack,
+                'max_call_stack': self.max_call_stack,
+                'max_frame_stack': self.max_frame_stack,
+                'max_string_length': self.max_string,
+            })
+        metrics['time'] = dict(m.timings.phases, total=m.timings.total())
+        if m.timings.peaks:
+            metrics['memory_peak'] = m.timings.peaks
+        return metrics
+
+    def print_json(self, m) -> None:
+        """Metoda pro vypis vsech nasbiranych statistik ve formatu JSON (--stats-format=json)"""
+        with open(self.stats_file, "w") as file:
+            json.dump(self.metrics(m), file, indent=1)
+            print(file=file)
@@ -0,0 +1,57 @@
+"""
+FIT VUT IPP 2023
+Projekt 2 - Interpret XML reprezentace jazyka IPPcode23
+Autor: Jaroslav Streit (xstrei06)
+Soubor: string_buffer.py
+"""
+
+from fusion import Fusion
+
+
+class StringBuffer:
+    """Trida pro menitelny retezec ulozeny v promenne
+    Vytvori se pri SETCHAR nebo CONCAT do stejne promenne, ze ktere se cte prvni operand,
+    SETCHAR je pak O(1) a opakovany CONCAT amortizovane linearni. STRLEN a GETCHAR pracuji
+    primo s bufferem, ostatni instrukce ctou retezec (value), ktery se sestavi az pri cteni.
+    Buffer muze obsahovat pouze promenna se jmenem z mnoziny names(), cteni ostatnich
+    promennych tak zadnou kontrolu nepotrebuje."""
+    __slots__ = ('chars', 'text')
+
+    def __init__(self, text):
+        self.chars = list(text)  # jednotlive znaky retezce
+        self.text = text  # sestaveny retezec nebo None po zmene
+
+    def value(self) -> str:
+        """Metoda vracejici obsah bufferu jako retezec"""
+        if self.text is None:
+            self.text = "".join(self.chars)
+        return self.text
+
+    def setchar(self, index, char) -> None:
+        self.chars[index] = char
+        self.text = None
+
+    def append(self, text) -> None:
+        self.chars.extend(text)
+        self.text = None
+
+    def __len__(self) -> int:
+        return len(self.chars)
+
+    def __getitem__(self, index) -> str:
+        return self.chars[index]
+
+    def __repr__(self) -> str:
+        return repr(self.value())
+
+    @staticmethod
+    def names(instructions) -> frozenset:
+        """Metoda vracejici jmena promennych, ktere mohou obsahovat buffer
+        (cil SETCHAR a cil CONCAT, jehoz prvni operand je stejna promenna). Promenna muze pri
+        POPFRAME a PUSHFRAME zmenit ramec, proto se porovnavaji pouze jmena."""
+        names = set()
+        for ins in instructions:
+            if ins.opcode == 'SETCHAR' or \
+                    (ins.opcode == 'CONCAT' and Fusion.same_var(ins.args['arg1'], ins.args['arg2'])):
+                names.add(ins.args['arg1'].var)
+        return frozenset(names)
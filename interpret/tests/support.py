@@ -0,0 +1,61 @@
+"""
+FIT VUT IPP 2023
+Projekt 2 - Interpret XML reprezentace jazyka IPPcode23
+Autor: Jaroslav Streit (xstrei06)
+Soubor: tests/support.py
+"""
+
+import os
+import re
+import subprocess
+import sys
+import tempfile
+from xml.sax.saxutils import escape
+
+DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # adresar interpretu
+sys.path.insert(0, DIRECTORY)
+
+ENGINES = ("interpreted", "compiled", "blocks", "tracing")
+
+# Instrukce, jejichz prvni operand je navesti
+LABEL_OPCODES = {'LABEL', 'JUMP', 'JUMPIFEQ', 'JUMPIFNEQ', 'CALL', 'JUMPIFEQS', 'JUMPIFNEQS'}
+
+
+def xml(source) -> str:
+    """Funkce pro preklad textoveho zapisu IPPcode23 (instrukce po radcich, bez hlavicky) do XML"""
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>', '<program language="IPPcode23">']
+    order = 0
+    for line in source.splitlines():
+        parts = line.split('#')[0].split()
+        if not parts:
+            continue
+        order += 1
+        opcode = parts[0].upper()
+        lines.append(f'<instruction order="{order}" opcode="{opcode}">')
+        for i, arg in enumerate(parts[1:], 1):
+            if opcode in LABEL_OPCODES and i == 1:
+                kind, value = 'label', arg
+            elif opcode == 'READ' and i == 2:
+                kind, value = 'type', arg
+            elif re.match(r'^(GF|LF|TF)@', arg):
+                kind, value = 'var', arg
+            else:
+                kind, value = arg.split('@', 1)
+            lines.append(f'<arg{i} type="{kind}">{escape(value)}</arg{i}>')
+        lines.append('</instruction>')
+    lines.append('</program>')
+    return "\n".join(lines) + "\n"
+
+
+def run(source, engine="interpreted", optimize=0, text="", options=()) -> tuple:
+    """Funkce pro provedeni programu interpretem z prikazove radky, vraci dvojici (navratovy kod, vystup)
+    options jsou dalsi argumenty interpretu"""
+    with tempfile.TemporaryDirectory() as directory:
+        paths = [os.path.join(directory, name) for name in ("program.xml", "input.txt")]
+        for path, content in zip(paths, (xml(source), text)):
+            with open(path, "w") as file:
+                file.write(content)
+        process = subprocess.run([sys.executable, os.path.join(DIRECTORY, "interpret.py"), f"--source={paths[0]}",
+                                  f"--input={paths[1]}", f"--engine={engine}", f"--optimize={optimize}", *options],
+                                 stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    return process.returncode, process.stdout
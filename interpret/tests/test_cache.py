@@ -0,0 +1,70 @@
+"""
+FIT VUT IPP 2023
+Projekt 2 - Interpret XML reprezentace jazyka IPPcode23
+Autor: Jaroslav Streit (xstrei06)
+Soubor: tests/test_cache.py
+"""
+
+import io
+import os
+import pickle
+import tempfile
+import unittest
+from types import SimpleNamespace
+from support import run, xml
+from cache import ProgramCache, MAGIC
+
+PROGRAM = """
+DEFVAR GF@x
+MOVE GF@x int@41
+ADD GF@x GF@x int@1
+WRITE GF@x
+"""
+
+
+class Marker:
+    """Objekt, jehoz nacteni (pickle) vytvori soubor"""
+    def __init__(self, path):
+        self.path = path
+
+    def __reduce__(self):
+        return open, (self.path, "w")
+
+
+class CacheTest(unittest.TestCase):
+    """Testy ukladani dekodovanych programu (--cache-dir)"""
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        os.chmod(self.directory, 0o700)
+        self.cache = ProgramCache(self.directory)
+        self.cache.key(io.BytesIO(xml(PROGRAM).encode()))
+
+    def tearDown(self):
+        for name in os.listdir(self.directory):
+            os.unlink(os.path.join(self.directory, name))
+        os.rmdir(self.directory)
+
+    def test_reuse(self):
+        for _ in range(2):
+            self.assertEqual(run(PROGRAM, options=[f"--cache-dir={self.directory}"]), (0, "42"))
+        self.assertEqual(os.listdir(self.directory), [os.path.basename(self.cache.path())])
+
+    def test_untrusted_directory(self):
+        marker = os.path.join(self.directory, "loaded")
+        with open(self.cache.path(), "wb") as file:
+            file.write(MAGIC)
+            pickle.dump(Marker(marker), file)
+        os.chmod(self.directory, 0o777)
+        self.assertFalse(self.cache.load(SimpleNamespace()))
+        self.assertFalse(os.path.exists(marker))
+        os.chmod(self.directory, 0o700)
+        self.assertFalse(self.cache.load(SimpleNamespace()))  # duveryhodny soubor se nacte (neplatny obsah)
+        self.assertTrue(os.path.exists(marker))
+
+    def test_failed_store(self):
+        self.cache.store(SimpleNamespace(instructions=[lambda: None], labels={}, global_slots={}))
+        self.assertEqual(os.listdir(self.directory), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
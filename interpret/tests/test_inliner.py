@@ -0,0 +1,88 @@
+"""
+FIT VUT IPP 2023
+Projekt 2 - Interpret XML reprezentace jazyka IPPcode23
+Autor: Jaroslav Streit (xstrei06)
+Soubor: tests/test_inliner.py
+"""
+
+import unittest
+from support import ENGINES, run
+
+# Funkce cte LF@x, ktera pri druhem pruchodu smyckou nema hodnotu (chyba 56)
+MAYBE_UNSET = """
+DEFVAR GF@r
+DEFVAR GF@c
+MOVE GF@c bool@true
+LABEL loop
+CREATEFRAME
+PUSHFRAME
+CALL f
+POPFRAME
+WRITE GF@r
+WRITE string@\\010
+JUMPIFEQ end GF@c bool@false
+MOVE GF@c bool@false
+JUMP loop
+LABEL end
+EXIT int@0
+LABEL f
+DEFVAR LF@x
+JUMPIFEQ skip GF@c bool@false
+MOVE LF@x int@1
+LABEL skip
+ADD LF@x LF@x int@1
+MOVE GF@r LF@x
+RETURN
+"""
+
+# Kratka funkce s parametrem a navratovou hodnotou volana ve smycce
+LOOP = """
+DEFVAR GF@i
+DEFVAR GF@s
+MOVE GF@i int@0
+MOVE GF@s int@0
+LABEL loop
+CREATEFRAME
+DEFVAR TF@n
+MOVE TF@n GF@i
+PUSHFRAME
+CALL twice
+POPFRAME
+ADD GF@s GF@s TF@r
+ADD GF@i GF@i int@1
+JUMPIFNEQ loop GF@i int@100
+WRITE GF@s
+EXIT int@0
+LABEL twice
+DEFVAR LF@r
+JUMPIFEQ zero LF@n int@0
+MUL LF@r LF@n int@2
+JUMP done
+LABEL zero
+MOVE LF@r int@0
+LABEL done
+RETURN
+"""
+
+
+class InlinerTest(unittest.TestCase):
+    """Testy vkladani funkci (--inline-threshold)"""
+    def test_read_before_write_in_same_instruction(self):
+        expected = (56, "2\n")
+        self.assertEqual(run(MAYBE_UNSET), expected)
+        for engine in ENGINES:
+            with self.subTest(engine=engine):
+                self.assertEqual(run(MAYBE_UNSET, engine, options=["--inline-threshold=10"]), expected)
+
+    def test_inlined_call_in_loop(self):
+        for engine in ENGINES:
+            for optimize in (0, 1, 2):
+                with self.subTest(engine=engine, optimize=optimize):
+                    self.assertEqual(run(LOOP, engine, optimize, options=["--inline-threshold=10"]), (0, "9900"))
+
+    def test_threshold_too_small(self):
+        self.assertEqual(run(LOOP, options=["--inline-threshold=1"]), (0, "9900"))
+
+
+if __name__ == "__main__":
+    unittest.main()
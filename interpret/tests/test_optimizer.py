@@ -0,0 +1,54 @@
+"""
+FIT VUT IPP 2023
+Projekt 2 - Interpret XML reprezentace jazyka IPPcode23
+Autor: Jaroslav Streit (xstrei06)
+Soubor: tests/test_optimizer.py
+"""
+
+import unittest
+from support import ENGINES, run
+
+# Nedosazitelne instrukce, jejichz vypocet by pri skladani konstant vyvolal vyjimku jazyka Python
+UNFOLDABLE = """
+DEFVAR GF@x
+WRITE string@ok
+EXIT int@0
+FLOAT2INT GF@x float@inf
+FLOAT2INT GF@x float@nan
+INT2FLOAT GF@x int@{big}
+""".format(big=10 ** 400)
+
+# Instrukce s literaly, ktere lze slozit, a skoky pres navesti
+FOLDABLE = """
+DEFVAR GF@x
+DEFVAR GF@y
+ADD GF@x int@2 int@3
+MUL GF@y GF@x int@4
+JUMP a
+LABEL b
+WRITE GF@y
+EXIT int@3
+LABEL a
+CONCAT GF@x string@a string@b
+WRITE GF@x
+JUMP b
+WRITE string@unreachable
+"""
+
+
+class OptimizerTest(unittest.TestCase):
+    """Testy optimalizaci (--optimize)"""
+    def test_unfoldable_constants(self):
+        for optimize in (0, 1, 2):
+            with self.subTest(optimize=optimize):
+                self.assertEqual(run(UNFOLDABLE, optimize=optimize), (0, "ok"))
+
+    def test_optimization_levels(self):
+        for engine in ENGINES:
+            for optimize in (0, 1, 2):
+                with self.subTest(engine=engine, optimize=optimize):
+                    self.assertEqual(run(FOLDABLE, engine, optimize), (3, "ab20"))
+
+
+if __name__ == "__main__":
+    unittest.main()
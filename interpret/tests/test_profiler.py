@@ -0,0 +1,47 @@
+"""
+FIT VUT IPP 2023
+Projekt 2 - Interpret XML reprezentace jazyka IPPcode23
+Autor: Jaroslav Streit (xstrei06)
+Soubor: tests/test_profiler.py
+"""
+
+import os
+import tempfile
+import unittest
+from support import run
+
+CALLS = """
+DEFVAR GF@i
+MOVE GF@i int@0
+LABEL loop
+CALL inc
+JUMPIFNEQ loop GF@i int@10
+WRITE GF@i
+EXIT int@0
+LABEL inc
+ADD GF@i GF@i int@1
+RETURN
+"""
+
+MISSING = os.path.join(tempfile.gettempdir(), "missing-directory", "profile")  # soubor nelze vytvorit
+
+
+class ProfilerTest(unittest.TestCase):
+    """Testy profilovani instrukci a funkci (--profile)"""
+    def test_report(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "profile")
+            self.assertEqual(run(CALLS, options=[f"--profile={path}"]), (0, "10"))
+            with open(path) as file:
+                report = file.read()
+            self.assertIn("Instructions (by total time):", report)
+            self.assertIn("inc", report)
+            self.assertTrue(os.path.exists(path + ".json"))
+
+    def test_unwritable_report(self):
+        self.assertEqual(run(CALLS, options=[f"--profile={MISSING}"]), (12, "10"))
+        self.assertEqual(run("WRITE int@1\nWRITE GF@x", options=[f"--profile={MISSING}"]), (54, "1"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+"""
+FIT VUT IPP 2023
+Projekt 2 - Interpret XML reprezentace jazyka IPPcode23
+Autor: Jaroslav Streit (xstrei06)
+Soubor: tests/test_quickening.py
+"""
+
+import unittest
+from support import ENGINES, run, xml
+from program import load_program
+
+# Operandy maji 20 pruchodu typ int, potom typ float (specializace a deoptimalizace)
+RETYPE = """
+DEFVAR GF@i
+DEFVAR GF@v
+DEFVAR GF@t
+DEFVAR GF@b
+DEFVAR GF@w
+MOVE GF@i int@0
+MOVE GF@v int@1
+MOVE GF@w string@a
+LABEL loop
+ADD GF@t GF@v GF@v
+LT GF@b GF@v GF@t
+CONCAT GF@w GF@w string@b
+JUMPIFEQ skip GF@v nil@nil
+ADD GF@i GF@i int@1
+LABEL skip
+JUMPIFNEQ same GF@i int@20
+MOVE GF@v float@0x1.8p+1
+LABEL same
+JUMPIFNEQ loop GF@i int@30
+WRITE GF@t
+WRITE GF@b
+STRLEN GF@i GF@w
+WRITE GF@i
+"""
+
+# Po specializaci JUMPIFEQ se porovnaji operandy ruznych typu (chyba 53)
+MISMATCH = """
+DEFVAR GF@i
+DEFVAR GF@v
+MOVE GF@i int@0
+MOVE GF@v int@0
+LABEL loop
+JUMPIFEQ end GF@v int@-1
+ADD GF@i GF@i int@1
+JUMPIFNEQ loop GF@i int@{iterations}
+MOVE GF@v string@x
+JUMP loop
+LABEL end
+"""
+
+
+class QuickeningTest(unittest.TestCase):
+    """Testy specializace instrukci podle typu operandu (--engine=interpreted)"""
+    def test_specialize_and_deoptimize(self):
+        program = load_program(xml(RETYPE))
+        result = program.run("")
+        self.assertEqual((result.exit_code, result.output), (0, "0x1.8000000000000p+2true31"))
+        add = program.instructions[9]
+        self.assertIs(add.seen, float)
+        self.assertEqual(add.handler, add.specialize_method[('ADD', float)])
+
+    def test_engines(self):
+        for engine in ENGINES:
+            with self.subTest(engine=engine):
+                self.assertEqual(run(RETYPE, engine), (0, "0x1.8000000000000p+2true31"))
+
+    def test_type_error_after_specialization(self):
+        for iterations in (3, 50):
+            with self.subTest(iterations=iterations):
+                self.assertEqual(run(MISMATCH.format(iterations=iterations)), (53, ""))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+"""
+FIT VUT IPP 2023
+Projekt 2 - Interpret XML reprezentace jazyka IPPcode23
+Autor: Jaroslav Streit (xstrei06)
+Soubor: tests/test_sampler.py
+"""
+
+import os
+import tempfile
+import unittest
+from support import run
+
+CALLS = """
+DEFVAR GF@i
+MOVE GF@i int@0
+LABEL loop
+CALL inc
+JUMPIFNEQ loop GF@i int@100
+WRITE GF@i
+EXIT int@0
+LABEL inc
+ADD GF@i GF@i int@1
+RETURN
+"""
+
+MISSING = os.path.join(tempfile.gettempdir(), "missing-directory", "samples")  # soubor nelze vytvorit
+
+
+class SamplerTest(unittest.TestCase):
+    """Testy vzorkovani zasobniku volani (--sample)"""
+    def test_folded_stacks(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "samples")
+            self.assertEqual(run(CALLS, options=[f"--sample={path}", "--sample-every=10"]), (0, "100"))
+            with open(path) as file:
+                lines = file.read().splitlines()
+            self.assertTrue(lines)
+            self.assertTrue(any(line.startswith("<main>;inc ") for line in lines))
+
+    def test_unwritable_samples(self):
+        self.assertEqual(run(CALLS, options=[f"--sample={MISSING}"]), (12, "100"))
+        self.assertEqual(run("WRITE int@1\nWRITE GF@x", options=[f"--sample={MISSING}"]), (54, "1"))
+
+
+if __name__ == "__main__":
+    unittest.main()
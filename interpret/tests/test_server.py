@@ -0,0 +1,57 @@
+"""
+FIT VUT IPP 2023
+Projekt 2 - Interpret XML reprezentace jazyka IPPcode23
+Autor: Jaroslav Streit (xstrei06)
+Soubor: tests/test_server.py
+"""
+
+import io
+import json
+import unittest
+from support import xml
+from server import Server
+
+HELLO = """
+DEFVAR GF@x
+READ GF@x string
+WRITE GF@x
+"""
+
+# Chyba jazyka Python pri provadeni (prevod nekonecna na cele cislo)
+CRASH = """
+DEFVAR GF@x
+WRITE string@before
+FLOAT2INT GF@x float@inf
+"""
+
+
+class ServerTest(unittest.TestCase):
+    """Testy rezimu opakovaneho provadeni (--serve)"""
+    @staticmethod
+    def serve(*requests) -> list:
+        reader = io.StringIO("".join(json.dumps(request) + "\n" for request in requests))
+        writer = io.StringIO()
+        Server("").serve_stream(reader, writer)
+        return [json.loads(line) for line in writer.getvalue().splitlines()]
+
+    def test_requests(self):
+        responses = self.serve({'source': xml(HELLO), 'input': "hi\n"},
+                               {'source': xml("EXIT int@7"), 'engine': "blocks", 'optimize': 2},
+                               {'source': xml("WRITE GF@x")})
+        self.assertEqual([(r['exit_code'], r['stdout']) for r in responses], [(0, "hi"), (7, ""), (54, "")])
+
+    def test_internal_error_keeps_serving(self):
+        responses = self.serve({'source': xml(CRASH)}, {'source': xml(HELLO), 'input': "next\n"})
+        self.assertEqual(len(responses), 2)
+        self.assertEqual((responses[0]['exit_code'], responses[0]['stdout']), (99, "before"))
+        self.assertIn('error', responses[0])
+        self.assertEqual((responses[1]['exit_code'], responses[1]['stdout']), (0, "next"))
+
+    def test_invalid_request(self):
+        responses = self.serve({'input': "x"}, {'source': xml(HELLO), 'engine': "unknown"},
+                               {'source': xml(HELLO), 'optimize': True}, {'source': xml(HELLO), 'stats': 1})
+        self.assertEqual([(r['exit_code'], r.get('error')) for r in responses], [(99, "Invalid request.")] * 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
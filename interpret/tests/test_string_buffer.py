@@ -0,0 +1,74 @@
+"""
+FIT VUT IPP 2023
+Projekt 2 - Interpret XML reprezentace jazyka IPPcode23
+Autor: Jaroslav Streit (xstrei06)
+Soubor: tests/test_string_buffer.py
+"""
+
+import unittest
+from support import ENGINES, run
+from string_buffer import StringBuffer
+
+# Opakovany CONCAT a SETCHAR do stejne promenne, kopie bufferu se nesmi zmenit
+BUILD = """
+DEFVAR GF@s
+DEFVAR GF@copy
+DEFVAR GF@i
+DEFVAR GF@n
+DEFVAR GF@c
+MOVE GF@s string@
+MOVE GF@i int@0
+LABEL loop
+CONCAT GF@s GF@s string@ab
+ADD GF@i GF@i int@1
+JUMPIFNEQ loop GF@i int@60
+MOVE GF@copy GF@s
+SETCHAR GF@s int@0 string@X
+SETCHAR GF@s int@119 string@Y
+WRITE GF@copy
+STRLEN GF@n GF@s
+GETCHAR GF@c GF@s int@1
+PUSHS GF@s
+POPS GF@copy
+WRITE GF@n
+WRITE GF@c
+WRITE GF@copy
+TYPE GF@c GF@s
+WRITE GF@c
+"""
+
+# SETCHAR mimo retezec (chyba 58), vystup pred chybou se zachova
+OUT_OF_RANGE = """
+DEFVAR GF@s
+MOVE GF@s string@abc
+SETCHAR GF@s int@1 string@X
+WRITE GF@s
+SETCHAR GF@s int@3 string@Y
+"""
+
+
+class StringBufferTest(unittest.TestCase):
+    """Testy menitelnych retezcu (SETCHAR, CONCAT do stejne promenne)"""
+    def test_buffer(self):
+        buffer = StringBuffer("abc")
+        buffer.setchar(1, "X")
+        buffer.append("de")
+        self.assertEqual((len(buffer), buffer[1], buffer.value()), (5, "X", "aXcde"))
+        self.assertIs(buffer.value(), buffer.value())
+
+    def test_engines(self):
+        text = "ab" * 60
+        expected = (0, text + "120b" + "X" + text[1:-1] + "Y" + "string")
+        for engine in ENGINES:
+            for optimize in (0, 2):
+                with self.subTest(engine=engine, optimize=optimize):
+                    self.assertEqual(run(BUILD, engine, optimize), expected)
+
+    def test_out_of_range(self):
+        for engine in ENGINES:
+            with self.subTest(engine=engine):
+                self.assertEqual(run(OUT_OF_RANGE, engine), (58, "aXc"))
+
+
+if __name__ == "__main__":
+    unittest.main()
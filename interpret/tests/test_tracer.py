@@ -0,0 +1,100 @@
+"""
+FIT VUT IPP 2023
+Projekt 2 - Interpret XML reprezentace jazyka IPPcode23
+Autor: Jaroslav Streit (xstrei06)
+Soubor: tests/test_tracer.py
+"""
+
+import io
+import unittest
+from support import ENGINES, run, xml
+from program import load_program
+from input_reader import InputReader
+from output import Output
+from statistics import Statistics
+from tracer import Tracer, HOT_LOOP
+
+# Vnorene smycky, podminka ve vnitrni smycce se po polovine pruchodu rozhodne jinak (straz)
+NESTED = """
+DEFVAR GF@i
+DEFVAR GF@j
+DEFVAR GF@s
+MOVE GF@i int@0
+MOVE GF@s int@0
+LABEL outer
+MOVE GF@j int@0
+LABEL inner
+JUMPIFEQ small GF@i int@0
+LT GF@s GF@j int@60
+JUMPIFEQ small GF@s bool@true
+MOVE GF@s int@0
+LABEL small
+ADD GF@j GF@j int@1
+JUMPIFNEQ inner GF@j int@120
+ADD GF@i GF@i int@1
+JUMPIFNEQ outer GF@i int@80
+WRITE GF@i
+WRITE GF@s
+"""
+
+# Chyba typu operandu uvnitr prelozene stopy
+FAILING = """
+DEFVAR GF@i
+DEFVAR GF@v
+MOVE GF@i int@0
+MOVE GF@v int@1
+LABEL loop
+ADD GF@i GF@i GF@v
+JUMPIFNEQ next GF@i int@200
+MOVE GF@v string@x
+LABEL next
+JUMPIFNEQ loop GF@i int@300
+"""
+
+# Smycka s volanim funkce (stopa se nezaznamena)
+CALLS = """
+DEFVAR GF@i
+MOVE GF@i int@0
+LABEL loop
+CALL inc
+JUMPIFNEQ loop GF@i int@{n}
+WRITE GF@i
+EXIT int@0
+LABEL inc
+ADD GF@i GF@i int@1
+RETURN
+""".format(n=HOT_LOOP * 3)
+
+
+class TracerTest(unittest.TestCase):
+    """Testy prekladu horkych smycek (--engine=tracing)"""
+    def test_traces(self):
+        program = load_program(xml(NESTED))
+        runtime = program.runtime(InputReader(stream=io.StringIO()), Output(stream=io.StringIO()),
+                                  Statistics(None, []), "tracing")
+        tracer = Tracer(runtime)
+        tracer.run()
+        runtime.output.flush()
+        self.assertEqual(runtime.output.stream.getvalue(), "800")
+        self.assertEqual(len([trace for trace in tracer.traces if trace is not None]), 2)
+
+    def test_statistics(self):
+        for source in (NESTED, CALLS):
+            program = load_program(xml(source))
+            expected = program.run("", stats=True)
+            expected.stats.pop('time')
+            for engine in ENGINES:
+                with self.subTest(engine=engine):
+                    result = program.run("", engine=engine, stats=True)
+                    result.stats.pop('time')
+                    self.assertEqual((result.output, result.stats), (expected.output, expected.stats))
+
+    def test_error_in_trace(self):
+        for engine in ENGINES:
+            with self.subTest(engine=engine):
+                self.assertEqual(run(FAILING, engine), (53, ""))
+                self.assertEqual(run(CALLS, engine), (0, str(HOT_LOOP * 3)))
+
+
+if __name__ == "__main__":
+    unittest.main()
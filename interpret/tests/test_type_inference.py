@@ -0,0 +1,72 @@
+"""
+FIT VUT IPP 2023
+Projekt 2 - Interpret XML reprezentace jazyka IPPcode23
+Autor: Jaroslav Streit (xstrei06)
+Soubor: tests/test_type_inference.py
+"""
+
+import operator
+import unittest
+from support import ENGINES, run, xml
+from program import load_program
+
+# GF@x ma po vetveni typ int nebo string, GF@y je vzdy int, GF@z nemusi byt definovana
+BRANCH = """
+DEFVAR GF@x
+DEFVAR GF@y
+DEFVAR GF@c
+READ GF@c bool
+MOVE GF@y int@1
+MOVE GF@x int@2
+JUMPIFEQ next GF@c bool@false
+MOVE GF@x string@a
+DEFVAR GF@z
+LABEL next
+ADD GF@y GF@y int@1
+ADD GF@x GF@x GF@y
+WRITE GF@x
+"""
+
+# Cteni promenne bez hodnoty a nedefinovane promenne (chyby 56 a 54)
+UNSET = """
+DEFVAR GF@x
+DEFVAR GF@y
+JUMPIFEQ skip int@1 int@{skip}
+MOVE GF@x int@1
+LABEL skip
+ADD GF@y GF@x int@1
+WRITE GF@y
+"""
+
+
+class TypeInferenceTest(unittest.TestCase):
+    """Testy odvozeni typu promennych GF a prekladu bez kontrol typu"""
+    def test_types(self):
+        program = load_program(xml(BRANCH))
+        types = program.types()
+        instructions = program.instructions
+        add_y, add_x = instructions[10], instructions[11]
+        self.assertIs(types.type_of(add_y, add_y.args['arg2']), int)
+        self.assertIsNone(types.type_of(add_x, add_x.args['arg2']))
+        self.assertTrue(types.defined(add_x, add_x.args['arg2']))
+        self.assertIs(types.unchecked(add_y), operator.add)
+        self.assertIsNone(types.unchecked(add_x))
+        self.assertIsNone(types.type_of(instructions[0], add_x.args['arg2']))
+        self.assertFalse(types.defined(instructions[0], add_x.args['arg2']))
+
+    def test_engines(self):
+        for engine in ENGINES:
+            with self.subTest(engine=engine):
+                self.assertEqual(run(BRANCH, engine, text="false\n"), (0, "4"))
+                self.assertEqual(run(BRANCH, engine, text="true\n"), (53, ""))
+
+    def test_missing_value(self):
+        for engine in ENGINES:
+            with self.subTest(engine=engine):
+                self.assertEqual(run(UNSET.format(skip=2), engine), (0, "2"))
+                self.assertEqual(run(UNSET.format(skip=1), engine), (56, ""))
+                self.assertEqual(run("WRITE GF@x", engine), (54, ""))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+"""
+FIT VUT IPP 2023
+Projekt 2 - Interpret XML reprezentace jazyka IPPcode23
+Autor: Jaroslav Streit (xstrei06)
+Soubor: timings.py
+"""
+
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+class Timings:
+    """Trida pro mereni doby trvani jednotlivych fazi behu interpretu (--timings)
+    Faze: startup (zpracovani argumentu), parse (nacteni XML nebo cache), decode (vytvoreni
+    a optimalizace instrukci) a execute (provedeni programu). Pri --timings=memory se pro kazdou
+    fazi zaznamena i nejvyssi obsazena pamet podle tracemalloc."""
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.phases = {}  # doba trvani faze v sekundach podle jmena
+        self.peaks = {}  # nejvyssi obsazena pamet behem faze v bajtech
+        self.memory = False
+
+    def trace_memory(self) -> None:
+        """Metoda pro zapnuti mereni pameti (pro nasledujici faze)"""
+        self.memory = True
+        tracemalloc.start()
+
+    @contextmanager
+    def phase(self, name):
+        """Kontextovy manazer pro zmereni jedne faze"""
+        if self.memory:
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+            if self.memory:
+                self.peaks[name] = max(self.peaks.get(name, 0), tracemalloc.get_traced_memory()[1])
+
+    def total(self) -> float:
+        """Metoda vracejici dobu od spusteni interpretu"""
+        return time.perf_counter() - self.start
+
+    def report(self, file=sys.stderr) -> None:
+        """Metoda pro vypis namerenych fazi"""
+        for name, spent in self.phases.items():
+            line = f"{name:<8} {spent * 1e3:10.3f} ms"
+            if name in self.peaks:
+                line += f" {self.peaks[name] / 1024:12.1f} KiB peak"
+            print(line, file=file)
+        print(f"{'total':<8} {self.total() * 1e3:10.3f} ms", file=file)
@@ -0,0 +1,124 @@
+"""
+FIT VUT IPP 2023
+Projekt 2 - Interpret XML reprezentace jazyka IPPcode23
+Autor: Jaroslav Streit (xstrei06)
+Soubor: tracer.py
+"""
+
+from codegen import BlockCompiler
+
+# Skoky, jejichz provedeni zpet (na navesti pred skokem) se pocita jako pruchod smyckou
+LOOP_JUMPS = {'JUMP', 'JUMPIFEQ', 'JUMPIFNEQ'}
+
+# Instrukce, pri kterych se zaznam stopy prerusi (meni zasobnik volani, ukoncuji program nebo skaci podle zasobniku)
+UNTRACEABLE = {'CALL', 'RETURN', 'EXIT', 'BREAK', 'JUMPIFEQS', 'JUMPIFNEQS'}
+
+HOT_LOOP = 50  # pocet pruchodu smyckou pred zaznamem stopy
+MAX_TRACE = 1000  # nejvetsi delka stopy (pocet instrukci)
+
+
+class Tracer:
+    """Trida pro provadeni programu po instrukcich s prekladem horkych smycek (--engine=tracing)
+    Pri HOT_LOOP skocich zpet na stejne navesti se zaznamena posloupnost instrukci provedenych
+    pri dalsim pruchodu smyckou (stopa). Stopa se prelozi na funkci jazyka Python, ktera smycku
+    opakuje, dokud se podmineny skok rozhodne stejne jako pri zaznamu. Pri jinem rozhodnuti
+    (straz) funkce vrati index dalsi instrukce a pokracuje se po instrukcich. Kontroly typu
+    operandu zustavaji v generovanem kodu (stejne chyby jako pri interpretaci). Vnorena smycka
+    s hotovou stopou se ve stope vnejsi smycky vola jako celek."""
+    def __init__(self, m):
+        self.m = m
+        self.codegen = BlockCompiler(m)  # generovani kodu instrukci (sdilene s --engine=blocks)
+        self.code = None  # uzavery instrukci bez primeho prekladu (Compiler)
+        self.traces = [None] * len(m.instructions)  # prelozene stopy podle indexu zacatku smycky
+        self.hits = {}  # pocty skoku zpet podle indexu zacatku smycky
+        self.blocked = set()  # zacatky smycek, jejichz stopu nelze zaznamenat
+        self.head = None  # zacatek smycky, jejiz stopa se prave zaznamenava
+        self.path = None  # zaznamenana stopa - trojice (index, index dalsi instrukce, vnorena stopa)
+
+    def run(self) -> None:
+        """Metoda pro provedeni programu"""
+        m = self.m
+        instructions = m.instructions
+        end = len(instructions)
+        counts = m.stats.start(instructions)
+        self.codegen.compiler.counts = counts
+        self.codegen.counting = counts is not None
+        self.codegen.split_blocks()
+        self.code = self.codegen.compiler.compile()
+        traces = self.traces
+        while True:
+            m.ins_pointer += 1
+            ip = m.ins_pointer
+            if ip >= end:
+                break
+            if traces[ip] is not None:
+                m.ins_pointer = traces[ip]() - 1
+                if self.path is not None:
+                    self.__record(ip, m.ins_pointer + 1, True)
+                continue
+            if counts is not None:
+                counts[ip] += 1
+            ins = instructions[ip]
+            ins.perform(m)
+            if self.path is not None:
+                self.__record(ip, m.ins_pointer + 1, False)
+            elif m.ins_pointer < ip and ins.opcode in LOOP_JUMPS:
+                self.__back_edge(m.ins_pointer + 1)
+        m.stats.update(m)
+
+    def __back_edge(self, head) -> None:
+        """Metoda pro zapocitani skoku zpet, po HOT_LOOP skocich zacne zaznam stopy"""
+        if head in self.blocked or self.traces[head] is not None:
+            return
+        self.hits[head] = self.hits.get(head, 0) + 1
+        if self.hits[head] >= HOT_LOOP:
+            self.head = head
+            self.path = []
+
+    def __record(self, ip, nxt, nested) -> None:
+        """Metoda pro pridani provedene instrukce do stopy, po navratu na zacatek smycky se stopa prelozi"""
+        if nested and ip == self.head:  # zacatek smycky ma stopu (zaznam neni potreba)
+            self.head = self.path = None
+            return
+        if self.m.instructions[ip].opcode in UNTRACEABLE or len(self.path) >= MAX_TRACE:
+            self.blocked.add(self.head)
+            self.head = self.path = None
+            return
+        self.path.append((ip, nxt, nested))
+        if nxt == self.head:
+            self.traces[self.head] = self.__compile(self.head, self.path)
+            self.head = self.path = None
+
+    def __compile(self, head, path):
+        """Metoda pro preklad zaznamenane stopy na funkci, ktera vraci index dalsi instrukce"""
+        codegen = self.codegen
+        body = []
+        for ip, nxt, nested in path:
+            ins = self.m.instructions[ip]
+            if nested:  # vnorena smycka, pri jinem vystupu nez pri zaznamu se stopa opusti
+                body += [f"x = T[{ip}]()",
+                         f"if x != {nxt}:",
+                         "    return x"]
+                continue
+            if ins.opcode not in LOOP_JUMPS:
+                body += codegen.emit(ins, ip)
+                continue
+            if codegen.counting:
+                body.append(f"counts[{ip}] += 1")
+            if ins.opcode == 'JUMP':
+                continue
+            lines, expr = codegen.condition(ins)
+            body += lines
+            if ins.target == ip + 1:  # oba smery vedou na stejnou instrukci, pouze kontrola operandu
+                body.append(expr)
+            elif nxt == ins.target:  # straz - skok musi byt proveden stejne jako pri zaznamu
+                body += [f"if not ({expr}):",
+                         f"    return {ip + 1}"]
+            else:
+                body += [f"if {expr}:",
+                         f"    return {ins.target}"]
+        source = [f"def trace_{head}():", "    while True:"] + [f"        {line}" for line in body or ["pass"]]
+        namespace = codegen.namespace(self.code)
+        namespace['T'] = self.traces
+        exec(compile("\n".join(source) + "\n", f"<trace {head}>", "exec"), namespace)
+        return namespace[f"trace_{head}"]
@@ -0,0 +1,166 @@
+"""
+FIT VUT IPP 2023
+Projekt 2 - Interpret XML reprezentace jazyka IPPcode23
+Autor: Jaroslav Streit (xstrei06)
+Soubor: type_inference.py
+"""
+
+import operator
+from nil_type import Nil
+
+UNDEFINED = 'undefined'  # promenna jeste nebyla definovana (DEFVAR)
+UNSET = 'unset'  # promenna je definovana, ale nema hodnotu
+
+# Mozne typy hodnoty nactene ze zasobniku nebo neznameho operandu
+VALUES = frozenset({int, float, str, bool, Nil})
+
+# Typy vysledku instrukci, ktere nezavisi na typech operandu
+RESULT_TYPES = {
+    'IDIV': frozenset({int}), 'DIV': frozenset({float}), 'LT': frozenset({bool}), 'GT': frozenset({bool}),
+    'EQ': frozenset({bool}), 'AND': frozenset({bool}), 'OR': frozenset({bool}), 'NOT': frozenset({bool}),
+    'INT2CHAR': frozenset({str}), 'STRI2INT': frozenset({int}), 'CONCAT': frozenset({str}),
+    'STRLEN': frozenset({int}), 'GETCHAR': frozenset({str}), 'SETCHAR': frozenset({str}),
+    'TYPE': frozenset({str}), 'INT2FLOAT': frozenset({float}), 'FLOAT2INT': frozenset({int}),
+    'POPS': VALUES, 'DEFVAR': frozenset({UNSET}),
+}
+
+# Operace bez kontroly typu (opcode: funkce, povolene typy operandu), operandy musi mit stejny typ
+UNCHECKED = {
+    'ADD': (operator.add, (int, float)),
+    'SUB': (operator.sub, (int, float)),
+    'MUL': (operator.mul, (int, float)),
+    'LT': (operator.lt, (int, float, str, bool)),
+    'GT': (operator.gt, (int, float, str, bool)),
+    'EQ': (operator.eq, (int, float, str, bool, Nil)),
+    'AND': (operator.and_, (bool,)),
+    'OR': (operator.or_, (bool,)),
+    'NOT': (operator.not_, (bool,)),
+    'CONCAT': (operator.add, (str,)),
+    'STRLEN': (len, (str,)),
+    'INT2FLOAT': (float, (int,)),
+    'FLOAT2INT': (int, (float,)),
+}
+
+# Nejvetsi pocet dvojic (instrukce, promenna), pro ktery se analyza provadi
+LIMIT = 1 << 22
+
+
+def returns(instructions) -> list:
+    """Funkce vracejici indexy instrukci, na ktere se muze vratit RETURN (za kazdou instrukci CALL)"""
+    return [i + 1 for i, ins in enumerate(instructions) if ins.opcode == 'CALL' and i + 1 < len(instructions)]
+
+
+def successors(instructions, i, return_points) -> list:
+    """Funkce vracejici indexy instrukci, ktere mohou nasledovat po i-te instrukci (graf toku rizeni)
+    return_points jsou mozne cile RETURN (funkce returns)"""
+    ins = instructions[i]
+    end = len(instructions)
+    if ins.opcode == 'EXIT':
+        return []
+    if ins.opcode == 'RETURN':
+        return return_points
+    if ins.opcode in ('JUMP', 'CALL', 'JUMPIFEQ', 'JUMPIFNEQ', 'JUMPIFEQS', 'JUMPIFNEQS'):
+        if ins.target is None:  # skok na nedefinovane navesti vzdy skonci chybou
+            return []
+        if ins.opcode in ('JUMP', 'CALL'):
+            return [ins.target]
+        return [ins.target, i + 1] if i + 1 < end else [ins.target]
+    return [i + 1] if i + 1 < end else []
+
+
+class TypeInference:
+    """Trida pro odvozeni typu promennych globalniho ramce (analyza toku dat nad grafem toku rizeni)
+    Pro kazdou instrukci se urci mnozina moznych typu kazde promenne GF pred jejim provedenim.
+    Hrany grafu vedou na nasledujici instrukci, na cil skoku a volani a z RETURN za vsechna
+    volani. Promenne LF a TF se neanalyzuji (ramce se pri PUSHFRAME a POPFRAME meni).
+    Instrukce, ktera vzdy skonci chybou, do nasledujicich instrukci nic neprenasi."""
+    def __init__(self, instructions, slots):
+        self.instructions = instructions
+        self.slots = slots  # pocet promennych globalniho ramce
+        self.states = [None] * len(instructions)  # typy promennych pred instrukci (None - nedosazitelna)
+        self.returns = returns(instructions)
+
+    def infer(self) -> 'TypeInference':
+        """Metoda pro provedeni analyzy (pri prilis velkem programu se neprovede a zadne typy nejsou znamy)"""
+        if not self.instructions or len(self.instructions) * self.slots > LIMIT:
+            return self
+        self.states[0] = (frozenset({UNDEFINED}),) * self.slots
+        work = [0]
+        while work:
+            i = work.pop()
+            state = self.__transfer(self.instructions[i], self.states[i])
+            if state is None:
+                continue
+            for succ in successors(self.instructions, i, self.returns):
+                old = self.states[succ]
+                if old is None:
+                    self.states[succ] = state
+                elif old is not state:
+                    new = tuple(a | b for a, b in zip(old, state))
+                    if new == old:
+                        continue
+                    self.states[succ] = new
+                else:
+                    continue
+                work.append(succ)
+        return self
+
+    def __types(self, arg, state) -> frozenset:
+        """Metoda vracejici mnozinu moznych typu operandu"""
+        if arg.type != 'var':
+            return frozenset({type(arg.val)})
+        if arg.frame == 'GF':
+            return state[arg.slot]
+        return VALUES | {UNSET}
+
+    def __transfer(self, ins, state):
+        """Metoda vracejici typy promennych po provedeni instrukce (None, pokud vzdy skonci chybou)"""
+        if ins.opcode not in RESULT_TYPES and ins.opcode not in ('MOVE', 'ADD', 'SUB', 'MUL', 'READ'):
+            return state
+        dest = ins.args['arg1']
+        if dest.frame != 'GF':
+            return state
+        if ins.opcode == 'MOVE':
+            result = self.__types(ins.args['arg2'], state) & VALUES
+        elif ins.opcode in ('ADD', 'SUB', 'MUL'):
+            result = self.__types(ins.args['arg2'], state) & self.__types(ins.args['arg3'], state) & {int, float}
+        elif ins.opcode == 'READ':
+            result = frozenset({{'int': int, 'float': float, 'string': str, 'bool': bool}[ins.args['arg2'].val], Nil})
+        else:
+            result = RESULT_TYPES[ins.opcode]
+        if not result:
+            return None
+        new = list(state)
+        new[dest.slot] = result
+        return tuple(new)
+
+    def type_of(self, ins, arg):
+        """Metoda vracejici typ operandu pred provedenim instrukce, pokud je jednoznacny (jinak None)
+        Promenna se znamym typem je zarucene definovana a ma hodnotu"""
+        if arg.type != 'var':
+            return type(arg.val)
+        if arg.frame != 'GF' or self.states[ins.order] is None:
+            return None
+        types = self.states[ins.order][arg.slot]
+        if len(types) != 1:
+            return None
+        (known,) = types
+        return known if known in VALUES else None
+
+    def defined(self, ins, arg) -> bool:
+        """Metoda pro zjisteni, zda je promenna GF pred provedenim instrukce zarucene definovana"""
+        if arg.frame != 'GF' or self.states[ins.order] is None:
+            return False
+        return UNDEFINED not in self.states[ins.order][arg.slot]
+
+    def unchecked(self, ins):
+        """Metoda vracejici operaci bez kontroly typu, pokud maji operandy instrukce zarucene
+        stejny povoleny typ (jinak None)"""
+        if ins.opcode not in UNCHECKED or ins.buffers:
+            return None
+        operation, allowed = UNCHECKED[ins.opcode]
+        tags = ('arg2', 'arg3') if 'arg3' in ins.args else ('arg2',)
+        types = {self.type_of(ins, ins.args[tag]) for tag in tags}
+        if len(types) != 1 or types.pop() not in allowed:
+            return None
+        return operation
@@ -5,17 +5,21 @@ Autor: Jaroslav Streit (xstrei06)
 Soubor: xmlparser.py
 """
 
-import sys
 import xml.etree.ElementTree as ET
 import re
+from operand import Operand
+from errors import SemanticError, XMLFormatError, XMLStructureError
+
+ESCAPE_RE = re.compile(r'\\(\d{3})')
 
 
 class XMLParser:
     """Trida pro zpracovani XML vstupu"""
     def __init__(self):
-        self.root = None
-        self.instructions = []  # pole zparsovanych XML instrukci
+        self.instructions = []  # pole dekodovanych instrukci (poradi, opcode, operandy) serazene podle poradi
         self.labels = {}
+        self.global_slots = {}  # sloty promennych globalniho ramce podle jmena
+        self.error = None  # prvni nalezena chyba ve strukture XML
         self.instruction_args = {  # slovnik instrukci s poctem argumentu a jejich oznacenim pro kontrolu spravnosti
             'MOVE': [2, "arg1", "arg2"],
             'CREATEFRAME': [0],
@@ -72,85 +76,105 @@ class XMLParser:
             'DIV': [3, "arg1", "arg2", "arg3"],
         }
 
-    def parse_xml(self, xmlsource) -> None:
-        """Metoda pro zparsovani XML vstupu a kontrolu spravnosti"""
-        self.check_root(xmlsource)
-        self.check_instructions()
-        self.check_args()
+    def parse_xml(self, source) -> None:
+        """Metoda pro postupne zparsovani XML vstupu a kontrolu spravnosti
+        Kazda instrukce se zkontroluje a dekoduje hned po nacteni a jeji element se uvolni,
+        v pameti tak nezustava cely strom dokumentu. Pri chybe ve strukture (32) se dokument
+        docte do konce, aby mela prednost chyba ve formatu XML (31)."""
+        decoded = []
+        depth = 0
+        root = None
+        try:
+            for event, element in ET.iterparse(source, events=("start", "end")):
+                if event == "start":
+                    depth += 1
+                    if depth == 1:
+                        root = element
+                        self.__check(self.check_root, element)
+                    elif (depth == 2 and element.tag != "instruction") or (depth > 2 and element.tag == "instruction"):
+                        self.error = self.error or XMLStructureError()
+                    continue
+                depth -= 1
+                if depth == 1:
+                    if self.error is None:
+                        instruction = self.__check(self.check_instruction, element)
+                        if instruction is not None:
+                            decoded.append(instruction)
+                    root.clear()
+        except ET.ParseError:
+            raise XMLFormatError()
+        if self.error is not None:
+            raise self.error
+        self.check_order(decoded)
         self.check_labels()
 
-    def check_root(self, xmlsource) -> None:
-        """Metoda pro nacteni XML a kontrolu spravnosti hlavicky (korenoveho elementu)"""
+    def __check(self, check, element):
+        """Metoda pro provedeni kontroly, pripadna chyba se pouze zaznamena"""
         try:
-            self.root = ET.fromstring(xmlsource)
-        except ET.ParseError:
-            sys.exit(31)
-        for i in self.root.attrib:
+            return check(element)
+        except XMLStructureError as error:
+            self.error = self.error or error
+            return None
+
+    def check_root(self, root) -> None:
+        """Metoda pro kontrolu spravnosti hlavicky (korenoveho elementu)"""
+        for i in root.attrib:
             if i not in ["language", "name", "description"]:
-                sys.exit(32)
-        if self.root.tag != "program":
-            sys.exit(32)
-        if self.root.attrib["language"].upper() != "IPPCODE23":
-            sys.exit(32)
+                raise XMLStructureError()
+        if root.tag != "program":
+            raise XMLStructureError()
+        if root.attrib.get("language", "").upper() != "IPPCODE23":
+            raise XMLStructureError()
 
-    def check_instructions(self) -> None:
-        """Metoda pro kontrolu spravnosti instrukci a nacteni instrukci do pole"""
-        self.instructions = [i for i in self.root.iter("instruction")]
-        if len(self.instructions) != len(self.root):
-            sys.exit(32)
-        for i in self.instructions:
-            if 'order' not in i.attrib or 'opcode' not in i.attrib:
-                sys.exit(32)
+    def check_instruction(self, instruction) -> tuple:
+        """Metoda pro kontrolu spravnosti instrukce a jejich argumentu
+        Vraci dekodovanou instrukci ve tvaru (poradi, opcode, slovnik operandu)"""
+        if 'order' not in instruction.attrib or 'opcode' not in instruction.attrib:
+            raise XMLStructureError()
         try:
-            self.instructions.sort(key=lambda x: int(x.attrib["order"]))
+            order = int(instruction.attrib["order"])
         except ValueError:
-            sys.exit(32)
-        prev_order = 0
-        for i in self.instructions:
-            # Kontrola duplicit v poradi instrukci
-            if int(i.attrib["order"]) == prev_order:
-                sys.exit(32)
-            prev_order = int(i.attrib["order"])
-            if int(i.attrib["order"]) <= 0:
-                sys.exit(32)
-        for i in range(len(self.instructions)):
-            # Nastaveni nesouvisleho poradi instrukci na souvisle indexy pole
-            self.instructions[i].attrib["order_orig"] = self.instructions[i].attrib["order"]  # pro ucel statistik
-            self.instructions[i].attrib["order"] = i
-            self.instructions[i].attrib["opcode"] = self.instructions[i].attrib["opcode"].upper()
+            raise XMLStructureError()
+        if order <= 0:
+            raise XMLStructureError()
+        opcode = instruction.attrib["opcode"].upper()
+        if opcode not in self.instruction_args or len(instruction) != self.instruction_args[opcode][0]:
+            raise XMLStructureError()
+        args = {}
+        for arg in instruction:
+            if 'type' not in arg.attrib:
+                raise XMLStructureError()
+            if arg.tag not in self.instruction_args[opcode] or arg.tag in args:
+                raise XMLStructureError()
+            if arg.text is not None:
+                arg.text = arg.text.strip()
+            if arg.attrib["type"] == "string" and arg.text is not None:
+                # nahrazeni dekadickych escape sekvenci odpovidajicim znakem
+                arg.text = ESCAPE_RE.sub(lambda x: chr(int(x.group(1))), arg.text)
+            args[arg.tag] = Operand.from_xml(arg, self.global_slots)
+        return order, opcode, args
 
-    def check_args(self) -> None:
-        """Metoda pro kontrolu spravnosti argumentu instrukci"""
-        for instruction in self.instructions:
-            try:
-                if len(instruction) != self.instruction_args[instruction.attrib["opcode"]][0]:
-                    sys.exit(32)
-            except KeyError:
-                sys.exit(32)
-            for arg in instruction:
-                if 'type' not in arg.attrib:
-                    sys.exit(32)
-                if arg.text is not None:
-                    arg.text = arg.text.strip()
-                if arg.tag not in self.instruction_args[instruction.attrib["opcode"]]:
-                    sys.exit(32)
-                if arg.attrib["type"] == "string":  # parses escape sequences
-                    if arg.text is None:
-                        arg.text = ""
-                    arg.text = re.sub(r'\\(\d{3})', lambda x: chr(
-                        int(x.group(1))), arg.text)  # nahrazeni dekadickych escape sekvenci odpovidajicim znakem
+    def check_order(self, decoded) -> None:
+        """Metoda pro serazeni instrukci podle atributu order a kontrolu duplicit"""
+        decoded.sort(key=lambda x: x[0])
+        prev_order = 0
+        for order, _, _ in decoded:
+            if order == prev_order:
+                raise XMLStructureError()
+            prev_order = order
+        self.instructions = decoded
 
     def check_labels(self) -> None:
         """Metoda pro kontrolu duplicit labelu a nacteni labelu do slovniku s jejich poradim"""
         labels = []
-        for instruction in self.instructions:
-            if instruction.attrib["opcode"] == "LABEL":
-                if instruction[0].attrib["type"] != "label":
-                    sys.exit(32)
-                self.labels[instruction[0].text] = int(instruction.attrib["order"])
-                labels.append(instruction[0].text)
+        for i, (_, opcode, args) in enumerate(self.instructions):
+            if opcode == "LABEL":
+                if args["arg1"].type != "label":
+                    raise XMLStructureError()
+                self.labels[args["arg1"].val] = i
+                labels.append(args["arg1"].val)
         if len(labels) != len(set(labels)):
-            sys.exit(52)
+            raise SemanticError()
 
     def get_instructions(self) -> list:
         return self.instructions